@@ -1,190 +1,252 @@
 import os
-import pandas as pd
+import sys
+import queue
+import argparse
+import threading
+from collections import deque
+from multiprocessing import freeze_support
 from tkinter import (
     Tk, Label, Entry, Button, Text, Scrollbar, StringVar, IntVar,
     END, filedialog, messagebox, font, OptionMenu, Checkbutton
 )
 from tkinter import ttk
 from datetime import datetime
+from excel_reader import read_excel_sheets, sheet_presence
+from merge_checkpoint import checkpoint_path
+from merge_engine import MergeConfig, list_source_files, run_merge
+from merge_preflight import run_preflight
+from merge_watch import run_watch
 
 
-# Διαβάζει και επιστρέφει όλα τα ονόματα φύλλων από ένα αρχείο Excel
-# Επιστρέφει κενή λίστα σε περίπτωση αποτυχίας
+# Κάθε πόσα ms το GUI ελέγχει την ουρά μηνυμάτων του νήματος συγχώνευσης
+POLL_INTERVAL_MS = 50
+# Ελάχιστο διάστημα (ms) ανάμεσα σε δύο ενημερώσεις του log widget (~10 ενημερώσεις/δευτερόλεπτο)
+LOG_FLUSH_INTERVAL_MS = 100
+# Μέγιστο πλήθος γραμμών που κρατά το log widget· το πλήρες log υπάρχει στο αρχείο merge_log_*.txt
+MAX_LOG_LINES = 5000
 
-def read_excel_sheets(filepath):
+
+# Διαβάζει τα φύλλα του master και σε πόσα αρχεία του φακέλου υπάρχει το καθένα.
+# Δεν αγγίζει widgets, ώστε να εκτελείται σε νήμα εργασίας (βλ. SheetListUpdater).
+
+def scan_sheet_list(folder, master_filename, output_filename=None, recursive=False):
     """
-    Διαβάζει και επιστρέφει όλα τα ονόματα φύλλων από ένα αρχείο Excel.
-    Επιστρέφει κενή λίστα σε περίπτωση αποτυχίας.
+    Επιστρέφει τα φύλλα του αρχείου master με την ετικέτα τους για το dropdown menu.
+    Δίπλα σε κάθε φύλλο σημειώνεται αν υπάρχει σε όλα τα αρχεία του φακέλου ή μόνο σε κάποια.
 
     Parameters:
-    - filepath: η διαδρομή του αρχείου Excel
+    - folder: διαδρομή φακέλου
+    - master_filename: όνομα αρχείου Excel
+    - output_filename: το αρχείο εξόδου, που δεν μετρά στα αρχεία του φακέλου
+    - recursive: αν True, μετρούν και τα αρχεία των υποφακέλων
 
     Returns:
-    - Λίστα με ονόματα φύλλων (list of str)
+    - Λίστα από (φύλλο, ετικέτα)· κενή αν το master δεν έχει αναγνώσιμα φύλλα
     """
-    try:
-        xl = pd.ExcelFile(filepath, engine='openpyxl')
-        return xl.sheet_names
-    except Exception:
+    sheet_names = read_excel_sheets(os.path.join(folder, master_filename))
+    if not sheet_names:
         return []
+    # Διαβάζεται μόνο το xl/workbook.xml κάθε αρχείου (και κρατιέται όσο το αρχείο δεν αλλάζει)
+    counts, readable = {}, 0
+    if os.path.isdir(folder):
+        try:
+            source_files = list_source_files(folder, [name for name in (master_filename, output_filename) if name],
+                                             recursive=recursive)
+            counts, readable, _ = sheet_presence([os.path.join(folder, f) for f in source_files])
+        except OSError:
+            pass
+    sheets = []
+    for sheet in sheet_names:
+        label = sheet
+        if readable:
+            found = counts.get(sheet, 0)
+            if found == readable:
+                label = f"{sheet}  ✔ σε όλα τα αρχεία ({readable})"
+            else:
+                label = f"{sheet}  ⚠ σε {found} από {readable} αρχεία"
+        sheets.append((sheet, label))
+    return sheets
 
 
 # Ενημερώνει τη λίστα με τα διαθέσιμα φύλλα από το αρχείο master
 # Χρησιμοποιείται κατά την αρχική φόρτωση ή αλλαγή αρχείου
 
-def update_sheet_list(folder, master_filename, selected_sheet, sheet_menu):
+class SheetListUpdater:
     """
-    Ενημερώνει τη λίστα με τα διαθέσιμα φύλλα του αρχείου master στο dropdown menu.
+    Ενημερώνει τη λίστα με τα διαθέσιμα φύλλα του αρχείου master στο dropdown menu χωρίς να «παγώνει» το GUI:
+    η σάρωση του φακέλου (scan_sheet_list) γίνεται σε νήμα εργασίας και το αποτέλεσμα περνά στο κύριο νήμα
+    μέσω ουράς, που ελέγχεται με window.after. Αν ζητηθεί νέα ενημέρωση πριν ολοκληρωθεί η προηγούμενη,
+    εφαρμόζεται μόνο η τελευταία.
 
     Parameters:
-    - folder: διαδρομή φακέλου
-    - master_filename: όνομα αρχείου Excel
     - selected_sheet: μεταβλητή StringVar για το επιλεγμένο φύλλο
     - sheet_menu: το OptionMenu widget που περιέχει τα ονόματα των φύλλων
+    - poll_interval_ms: κάθε πόσα ms ελέγχεται αν ολοκληρώθηκε η σάρωση
     """
-    filepath = os.path.join(folder, master_filename)
-    sheet_names = read_excel_sheets(filepath)
-    sheet_menu['menu'].delete(0, 'end')
-    if sheet_names:
-        selected_sheet.set(sheet_names[0])
-        for sheet in sheet_names:
-            sheet_menu['menu'].add_command(label=sheet, command=lambda value=sheet: selected_sheet.set(value))
-    else:
-        selected_sheet.set("")
-        messagebox.showwarning("Χωρίς φύλλα", f"Το αρχείο '{master_filename}' δεν περιέχει αναγνώσιμα φύλλα.")
-
-
-# Κύρια συνάρτηση συγχώνευσης: διαβάζει τη 2η γραμμή (και κάτω) από κάθε αρχείο Excel στον φάκελο
-# και τις προσθέτει κάτω από την επικεφαλίδα του master αρχείου. Καταγράφει τα αποτελέσματα στο log.
-
-def merge_excel_rows(folder, master_filename, output_filename, sheet_name, log, progress=None, skip_rows=1):
-    """
-    Συγχωνεύει την 1η γραμμή από το master αρχείο και τις επόμενες (2+ γραμμές) από τα υπόλοιπα αρχεία Excel στον ίδιο φάκελο.
-    Καταγράφει στο log την πρόοδο και τα σφάλματα, και ενημερώνει την progress bar εάν δοθεί.
 
-    Parameters:
-    - folder: φάκελος όπου βρίσκονται τα αρχεία Excel
-    - master_filename: το όνομα του αρχείου που περιέχει την επικεφαλίδα
-    - output_filename: το όνομα του αρχείου εξόδου
-    - sheet_name: το φύλλο που θα διαβαστεί από κάθε αρχείο
-    - log: widget Text για καταγραφή μηνυμάτων
-    - progress: optional ttk.Progressbar για ενημέρωση προόδου
-    """
-        # === Αρχικοποίηση μεταβλητών για συγχώνευση δεδομένων ===
-    merged_data = []
-    failed_files = []
-    success_count = 0
-    output_path = os.path.join(folder, output_filename)
-
-    def log_message(message):
-        log.insert(END, message + "\n")
-        log.see(END)
-
-    # Διαβάζουμε την επικεφαλίδα από το αρχείο master
-    try:
-        master_path = os.path.join(folder, master_filename)
-        master_df = pd.read_excel(master_path, sheet_name=sheet_name, engine='openpyxl', header=None)
-        # header = master_df.iloc[0].tolist()
-        # merged_data.append(header)
-        # Παίρνουμε τις πρώτες skip_rows γραμμές ως επικεφαλίδα
-        for i in range(skip_rows):
-            if i < len(master_df):
-                merged_data.append(master_df.iloc[i].tolist())
-
-    except Exception as e:
-        log_message(f"❌ Σφάλμα στο αρχείο master ή στο φύλλο '{sheet_name}': {e}")
-        return
-
-    # Λίστα με όλα τα αρχεία Excel εκτός του master και του αρχείου εξόδου
-    excel_files = [f for f in os.listdir(folder) if f.endswith('.xlsx') and f not in [master_filename, output_filename]]
-
-        # === Βρόχος που διατρέχει όλα τα Excel αρχεία προς συγχώνευση ===
-    for idx, filename in enumerate(excel_files):
-        filepath = os.path.join(folder, filename)
-        try:
-            df = pd.read_excel(filepath, sheet_name=sheet_name, engine='openpyxl', header=None)
-            if len(df) >= 2:
-                rows_to_add = []
-                for i in range(skip_rows, len(df)):
-                    row = df.iloc[i]
-                    if row.isnull().all() or all(str(cell).strip() == '' for cell in row):
-                        break
-                    rows_to_add.append(row.tolist())
-                    # Καταγραφή επιτυχούς γραμμής
-                    log_message(f"✅ {filename} ➔ Γραμμή {i+1}: {row.tolist()}")
-                if rows_to_add:
-                    merged_data.extend(rows_to_add)
-                    success_count += 1
-                else:
-                    failed_files.append((filename, "Η 2η γραμμή είναι εντελώς κενή ή δεν βρέθηκαν δεδομένα"))
-            else:
-                failed_files.append((filename, "Μόνο 1 γραμμή – δεν υπάρχει 2η για συγχώνευση"))
-        except Exception as e:
-            failed_files.append((filename, str(e)))
+    def __init__(self, selected_sheet, sheet_menu, poll_interval_ms=POLL_INTERVAL_MS):
+        self.selected_sheet = selected_sheet
+        self.sheet_menu = sheet_menu
+        self.poll_interval_ms = poll_interval_ms
+        self.generation = 0
 
-        # Ενημέρωση progress bar (αν υπάρχει)
-            progress['value'] = int(((idx + 1) / len(excel_files)) * 100)
-            progress.update_idletasks()
+    def update(self, folder, master_filename, output_filename=None, recursive=False):
+        """
+        Ξεκινά την ανάγνωση των φύλλων σε νήμα εργασίας. Πρέπει να καλείται από το κύριο νήμα του Tk.
 
-        # === Αποθήκευση όλων των συγχωνευμένων γραμμών σε νέο αρχείο Excel ===
-    try:
-        pd.DataFrame(merged_data).to_excel(output_path, index=False, header=False, engine='openpyxl')
-        log_message(f"📂 Το αρχείο συγχωνεύτηκε με επιτυχία: {output_filename}")
-    except Exception as e:
-        log_message(f"❌ Σφάλμα κατά την αποθήκευση του αρχείου: {e}")
-        return
+        Parameters:
+        - folder: διαδρομή φακέλου
+        - master_filename: όνομα αρχείου Excel
+        - output_filename: το αρχείο εξόδου, που δεν μετρά στα αρχεία του φακέλου
+        - recursive: αν True, μετρούν και τα αρχεία των υποφακέλων
+        """
+        self.generation += 1
+        results = queue.Queue()
 
-        # === Τελική καταγραφή στατιστικών συγχώνευσης στο log ===
-    log_message(f"📊 Συνολικά αρχεία: {len(excel_files)}")
-    log_message(f"✅ Επιτυχώς συγχωνεύθηκαν: {success_count}")
-    log_message(f"⚠ Προβληματικά αρχεία: {len(failed_files)}")
-    for f, reason in failed_files:
-        log_message(f"  - {f}: {reason}")
+        def scan_worker():
+            try:
+                sheets = scan_sheet_list(folder, master_filename, output_filename, recursive)
+            except Exception:
+                sheets = []
+            results.put(sheets)
 
+        threading.Thread(target=scan_worker, daemon=True).start()
+        self.sheet_menu.after(self.poll_interval_ms, self._poll, results, self.generation, master_filename)
+
+    def _poll(self, results, generation, master_filename):
+        # Μια παλαιότερη σάρωση που ξεπεράστηκε από νεότερη δεν εφαρμόζεται
+        if generation != self.generation:
+            return
+        try:
+            sheets = results.get_nowait()
+        except queue.Empty:
+            self.sheet_menu.after(self.poll_interval_ms, self._poll, results, generation, master_filename)
+            return
+        self._apply(sheets, master_filename)
+
+    def _apply(self, sheets, master_filename):
+        menu = self.sheet_menu['menu']
+        menu.delete(0, 'end')
+        if sheets:
+            self.selected_sheet.set(sheets[0][0])
+            for sheet, label in sheets:
+                menu.add_command(label=label, command=lambda value=sheet: self.selected_sheet.set(value))
+        else:
+            self.selected_sheet.set("")
+            messagebox.showwarning("Χωρίς φύλλα", f"Το αρχείο '{master_filename}' δεν περιέχει αναγνώσιμα φύλλα.")
 
-# Αποθηκεύει το περιεχόμενο του widget log σε αρχείο κειμένου
-# Το όνομα αρχείου βασίζεται στην τρέχουσα ημερομηνία και ώρα
 
-def save_log_to_file(folder_path, log_widget):
+# Αποδέκτης (sink) των μηνυμάτων log: τα μαζεύει και τα εμφανίζει στο Text widget σε παρτίδες,
+# κρατώντας μόνο τις τελευταίες γραμμές, ενώ το πλήρες log γράφεται απευθείας σε αρχείο
+
+class LogSink:
     """
-    Αποθηκεύει το περιεχόμενο του log widget σε αρχείο κειμένου.
+    Συγκεντρώνει τα μηνύματα log και τα γράφει στο Text widget το πολύ μία φορά ανά flush_interval_ms,
+    με ένα μόνο insert ανά παρτίδα. Το widget κρατά μόνο τις τελευταίες max_lines γραμμές (ring buffer),
+    ενώ όσο είναι ανοιχτό το αρχείο log, κάθε μήνυμα γράφεται εκεί ολόκληρο.
 
     Parameters:
-    - folder_path: ο φάκελος αποθήκευσης
-    - log_widget: το Text widget που περιέχει το log
+    - widget: το Text widget του log
+    - max_lines: μέγιστο πλήθος γραμμών που κρατά το widget
+    - flush_interval_ms: ελάχιστο διάστημα ανάμεσα σε δύο ενημερώσεις του widget
     """
-    log_content = log_widget.get("1.0", END).strip()
-    if not log_content:
-        return
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    log_filename = f"merge_log_{timestamp}.txt"
-    log_path = os.path.join(folder_path, log_filename)
-    try:
-        with open(log_path, 'w', encoding='utf-8') as f:
-            f.write(log_content)
-        log_widget.insert(END, f"\n📝 Το log αποθηκεύτηκε στο αρχείο: {log_filename}\n")
-    except Exception as e:
-        log_widget.insert(END, f"\n❌ Σφάλμα κατά την αποθήκευση του log: {e}\n")
+
+    def __init__(self, widget, max_lines=MAX_LOG_LINES, flush_interval_ms=LOG_FLUSH_INTERVAL_MS):
+        self.widget = widget
+        self.max_lines = max_lines
+        self.flush_interval_ms = flush_interval_ms
+        # Ό,τι δεν χωράει στο widget δεν χρειάζεται να περιμένει στην ουρά
+        self.pending = deque(maxlen=max_lines)
+        self.widget_lines = 0
+        self.log_file = None
+        self.log_filename = None
+        self._flush_scheduled = False
+
+    def write(self, message):
+        """
+        Καταγράφει ένα μήνυμα: αμέσως στο αρχείο log (αν είναι ανοιχτό) και στην επόμενη παρτίδα του widget.
+        Πρέπει να καλείται από το κύριο νήμα του Tk.
+        """
+        if self.log_file is not None:
+            self.log_file.write(message + "\n")
+        self.pending.append(message)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            self.widget.after(self.flush_interval_ms, self.flush)
+
+    def flush(self):
+        """
+        Γράφει όλα τα μηνύματα που περιμένουν στο widget με ένα insert και κόβει τις παλαιότερες γραμμές.
+        """
+        self._flush_scheduled = False
+        if not self.pending:
+            return
+        text = "\n".join(self.pending) + "\n"
+        self.widget_lines += text.count("\n")
+        self.pending.clear()
+        self.widget.insert(END, text)
+        excess = self.widget_lines - self.max_lines
+        if excess > 0:
+            self.widget.delete("1.0", f"{excess + 1}.0")
+            self.widget_lines -= excess
+        self.widget.see(END)
+
+    def clear(self):
+        """
+        Καθαρίζει το widget και τα μηνύματα που δεν έχουν εμφανιστεί ακόμη.
+        """
+        self.pending.clear()
+        self.widget.delete("1.0", END)
+        self.widget_lines = 0
+
+    def open_file(self, folder_path):
+        """
+        Ανοίγει νέο αρχείο log (με ημερομηνία και ώρα στο όνομα) στον φάκελο folder_path.
+        Από εδώ και πέρα κάθε μήνυμα γράφεται και στο αρχείο.
+        """
+        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+        log_filename = f"merge_log_{timestamp}.txt"
+        try:
+            self.log_file = open(os.path.join(folder_path, log_filename), 'w', encoding='utf-8')
+            self.log_filename = log_filename
+        except Exception as e:
+            self.write(f"❌ Σφάλμα κατά την αποθήκευση του log: {e}")
+
+    def close_file(self):
+        """
+        Κλείνει το αρχείο log και ενημερώνει το widget για το πού αποθηκεύτηκε.
+        """
+        if self.log_file is None:
+            return
+        log_file, self.log_file = self.log_file, None
+        try:
+            log_file.close()
+            self.write(f"\n📝 Το log αποθηκεύτηκε στο αρχείο: {self.log_filename}")
+        except Exception as e:
+            self.write(f"\n❌ Σφάλμα κατά την αποθήκευση του log: {e}")
+        self.flush()
 
 
 # Συνάρτηση εκκίνησης του γραφικού περιβάλλοντος
 # Δημιουργεί και οργανώνει όλα τα στοιχεία του παραθύρου (widgets)
 
-def main():
+def main(profile_path=None):
     """
     Εκκινεί το γραφικό περιβάλλον (GUI) και ορίζει όλα τα widgets, callbacks και λογική ελέγχου.
     Περιλαμβάνει επιλογή φακέλου, αρχείου master, αρχείου εξόδου, φύλλου, συγχώνευση και dark mode.
+
+    Parameters:
+    - profile_path: αν δοθεί, κάθε συγχώνευση εκτελείται με cProfile και το προφίλ γράφεται σε αυτό το αρχείο
     """
     def start_merge():
         """
         Ξεκινά τη διαδικασία συγχώνευσης των αρχείων Excel.
         Ελέγχει αν υπάρχουν τα απαραίτητα αρχεία και διαχειρίζεται την εγγραφή του αρχείου εξόδου.
-        Καθαρίζει το log, επανεκκινεί την progress bar και καλεί τη συγχώνευση.
+        Καθαρίζει το log, επανεκκινεί την progress bar και ξεκινά τη συγχώνευση σε νήμα εργασίας.
         """
         folder = folder_entry.get()
         master = master_entry.get()
         output = output_entry.get()
-        sheet = selected_sheet.get()
         output_path = os.path.join(folder, output)
 
         if not os.path.isdir(folder):
@@ -194,27 +256,202 @@ def main():
             messagebox.showerror("Σφάλμα", "Το αρχείο master δεν βρέθηκε.")
             return
 
+        # Ένα υπάρχον αρχείο csv μπορεί και να ενημερωθεί μόνο με τα νέα/τροποποιημένα αρχεία (βλ. MergeConfig.append)
+        append = False
         if os.path.exists(output_path):
-            if not messagebox.askyesno("Υπάρχει ήδη αρχείο", f"Το αρχείο '{output}' υπάρχει ήδη. Θέλεις να διαγραφεί;"):
-                log_text.insert(END, "ℹ️ Η διαδικασία ακυρώθηκε από τον χρήστη.\n")
+            if output.lower().endswith('.csv'):
+                answer = messagebox.askyesnocancel(
+                    "Υπάρχει ήδη αρχείο",
+                    f"Το αρχείο '{output}' υπάρχει ήδη.\n\nΝαι: ενημέρωση μόνο με τα νέα, τροποποιημένα και "
+                    f"διαγραμμένα αρχεία\nΌχι: διαγραφή και συγχώνευση από την αρχή")
+                append = bool(answer)
+                delete = answer is False
+            else:
+                delete = messagebox.askyesno("Υπάρχει ήδη αρχείο", f"Το αρχείο '{output}' υπάρχει ήδη. Θέλεις να διαγραφεί;")
+            if not append and not delete:
+                log_sink.write("ℹ️ Η διαδικασία ακυρώθηκε από τον χρήστη.")
                 return
+            if delete:
+                try:
+                    os.remove(output_path)
+                except Exception as e:
+                    messagebox.showerror("Σφάλμα διαγραφής", f"Δεν ήταν δυνατή η διαγραφή του αρχείου: {e}")
+                    return
+
+        log_sink.clear()
+        log_sink.open_file(folder)
+        progress_bar['value'] = 0
+        status_label.configure(text="")
+
+        # Η συγχώνευση τρέχει σε νήμα εργασίας· τα μηνύματα έρχονται μέσω της ουράς events
+        # και τα widgets ενημερώνονται μόνο από το κύριο νήμα (poll_events)
+        events = queue.Queue()
+        cancel_event = threading.Event()
+        merge_state['cancel_event'] = cancel_event
+        config = build_config()
+        config.append = append
+        # Μια συγχώνευση που διακόπηκε (κλείσιμο, σφάλμα, αναστολή του υπολογιστή) αφήνει checkpoint
+        if os.path.exists(checkpoint_path(config)):
+            config.resume = messagebox.askyesno(
+                "Συγχώνευση που διακόπηκε",
+                "Βρέθηκε η πρόοδος μιας συγχώνευσης που δεν ολοκληρώθηκε.\n\n"
+                "Ναι: συνέχεια από εκεί που σταμάτησε\nΌχι: συγχώνευση από την αρχή")
+
+        watch = bool(watch_var.get())
+
+        def merge_worker():
             try:
-                os.remove(output_path)
+                if watch:
+                    # Σε κάθε αλλαγή του φακέλου νέα συγχώνευση· η ακύρωση σταματά την παρακολούθηση
+                    run_watch(config,
+                              log=lambda message: events.put(('log', message)),
+                              stop_event=cancel_event,
+                              on_result=lambda round_result: events.put(('summary', round_result)),
+                              progress=lambda value: events.put(('progress', value)))
+                    result = None
+                else:
+                    result = run_merge(config,
+                                       log=lambda message: events.put(('log', message)),
+                                       progress=lambda value: events.put(('progress', value)),
+                                       cancel_event=cancel_event)
             except Exception as e:
-                messagebox.showerror("Σφάλμα διαγραφής", f"Δεν ήταν δυνατή η διαγραφή του αρχείου: {e}")
-                return
+                events.put(('log', f"❌ Απρόσμενο σφάλμα κατά τη συγχώνευση: {e}"))
+                result = None
+            events.put(('done', result))
 
-        log_text.delete('1.0', END)
-        progress_bar['value'] = 0
+        set_running(True)
+        threading.Thread(target=merge_worker, daemon=True).start()
+        window.after(POLL_INTERVAL_MS, poll_events, events, finish_merge)
 
+    def build_config():
+        """
+        Δημιουργεί το MergeConfig από τις τιμές των πεδίων της φόρμας.
+        """
         try:
             skip_rows = int(skip_rows_entry.get())
         except ValueError:
             skip_rows = 1  # Αν ο χρήστης βάλει κάτι μη αριθμητικό
 
-        merge_excel_rows(folder, master, output, sheet, log_text, progress=progress_bar, skip_rows=skip_rows)
+        try:
+            workers = max(1, int(workers_entry.get()))
+        except ValueError:
+            workers = 1  # Σειριακή ανάγνωση αν η τιμή δεν είναι αριθμός
+
+        use_cache = bool(use_cache_var.get())
+        return MergeConfig(folder_entry.get(), master_entry.get(), output_entry.get(), selected_sheet.get(),
+                           skip_rows=skip_rows, workers=workers, use_cache=use_cache, profile_path=profile_path,
+                           align_columns=bool(align_columns_var.get()), recursive=bool(recursive_var.get()),
+                           checkpoint=bool(checkpoint_var.get()))
+
+    def set_running(running):
+        """
+        Ενεργοποιεί/απενεργοποιεί τα κουμπιά ανάλογα με το αν τρέχει συγχώνευση ή έλεγχος.
+        """
+        start_button.configure(state='disabled' if running else 'normal')
+        preflight_button.configure(state='disabled' if running else 'normal')
+        cancel_button.configure(state='normal' if running else 'disabled')
+
+    def start_preflight():
+        """
+        Ξεκινά τον γρήγορο έλεγχο του φακέλου (φύλλο, επικεφαλίδα, κατεστραμμένα αρχεία) σε νήμα εργασίας,
+        ώστε τα προβληματικά αρχεία να φανούν πριν από τη συγχώνευση.
+        """
+        folder = folder_entry.get()
+        if not os.path.isdir(folder):
+            messagebox.showerror("Σφάλμα", "Ο φάκελος δεν υπάρχει.")
+            return
+        if not os.path.exists(os.path.join(folder, master_entry.get())):
+            messagebox.showerror("Σφάλμα", "Το αρχείο master δεν βρέθηκε.")
+            return
+
+        log_sink.clear()
+        progress_bar['value'] = 0
+        status_label.configure(text="")
+
+        events = queue.Queue()
+        cancel_event = threading.Event()
+        merge_state['cancel_event'] = cancel_event
+        config = build_config()
+
+        def preflight_worker():
+            try:
+                result = run_preflight(config,
+                                       log=lambda message: events.put(('log', message)),
+                                       progress=lambda value: events.put(('progress', value)),
+                                       cancel_event=cancel_event)
+            except Exception as e:
+                events.put(('log', f"❌ Απρόσμενο σφάλμα κατά τον έλεγχο: {e}"))
+                result = None
+            events.put(('done', result))
+
+        set_running(True)
+        threading.Thread(target=preflight_worker, daemon=True).start()
+        window.after(POLL_INTERVAL_MS, poll_events, events, finish_preflight)
+
+    def poll_events(events, on_done):
+        """
+        Αδειάζει την ουρά μηνυμάτων του νήματος εργασίας και ενημερώνει log, progress bar και στατιστικά.
+        Ξαναπρογραμματίζει τον εαυτό της με window.after μέχρι να έρθει το μήνυμα ολοκλήρωσης,
+        οπότε καλεί την on_done με το αποτέλεσμα.
+        """
+        while True:
+            try:
+                kind, payload = events.get_nowait()
+            except queue.Empty:
+                break
+            if kind == 'log':
+                log_sink.write(payload)
+            elif kind == 'progress':
+                progress_bar['value'] = payload
+            elif kind == 'summary':
+                show_summary(payload)
+            elif kind == 'done':
+                on_done(payload)
+                return
+        window.after(POLL_INTERVAL_MS, poll_events, events, on_done)
+
+    def finish_merge(result):
+        """
+        Καλείται στο κύριο νήμα όταν τελειώσει (ή ακυρωθεί) η συγχώνευση.
+        Εμφανίζει τα τελικά στατιστικά, αποθηκεύει το log και επαναφέρει τα κουμπιά.
+        """
+        merge_state['cancel_event'] = None
+        set_running(False)
+        if result is not None and result.error is None:
+            status = "⏹ Ακυρώθηκε" if result.cancelled else "✔ Ολοκληρώθηκε"
+            status_label.configure(text=f"{status}: ✅ {result.success_count} / ⚠ {len(result.failed_files)} / 📊 {result.total}")
+        log_sink.close_file()
+
+    def show_summary(result):
+        """
+        Ενημερώνει τα στατιστικά μετά από κάθε συγχώνευση της παρακολούθησης φακέλου.
+        """
+        if result.error is None and not result.cancelled:
+            status_label.configure(text=f"👀 {datetime.now().strftime('%H:%M')}: ✅ {result.success_count} / "
+                                        f"⚠ {len(result.failed_files)} / 📊 {result.total}")
 
-        save_log_to_file(folder, log_text)
+    def finish_preflight(result):
+        """
+        Καλείται στο κύριο νήμα όταν τελειώσει ο έλεγχος του φακέλου· εμφανίζει πόσα αρχεία έχουν προβλήματα.
+        """
+        merge_state['cancel_event'] = None
+        set_running(False)
+        if result is not None and result.error is None and not result.cancelled:
+            if result.ok:
+                status_label.configure(text=f"🔍 ✔ {len(result.files)} αρχεία εντάξει")
+            else:
+                status_label.configure(text=f"🔍 ⚠ {len(result.problem_files)} από {len(result.files)} αρχεία με προβλήματα")
+        log_sink.flush()
+
+    def cancel_merge():
+        """
+        Ζητά από το νήμα συγχώνευσης να σταματήσει πριν από το επόμενο αρχείο.
+        """
+        cancel_event = merge_state['cancel_event']
+        if cancel_event is not None:
+            cancel_event.set()
+            cancel_button.configure(state='disabled')
+            log_sink.write("⏹ Ακύρωση σε εξέλιξη...")
 
     def browse_folder():
         """
@@ -224,7 +461,7 @@ def main():
         if path:
             folder_entry.delete(0, END)
             folder_entry.insert(0, path)
-            update_sheet_list(path, master_entry.get(), selected_sheet, sheet_menu)
+            sheet_list.update(path, master_entry.get(), output_entry.get(), bool(recursive_var.get()))
 
     def browse_master_file():
         """
@@ -238,14 +475,14 @@ def main():
             folder_entry.insert(0, folder)
             master_entry.delete(0, END)
             master_entry.insert(0, filename)
-            update_sheet_list(folder, filename, selected_sheet, sheet_menu)
+            sheet_list.update(folder, filename, output_entry.get(), bool(recursive_var.get()))
 
     def master_changed(*args):
         """
         Callback όταν αλλάζει το πεδίο του master αρχείου (π.χ. με το χέρι).
         Χρησιμοποιείται για να ενημερώνεται η λίστα φύλλων.
         """
-        update_sheet_list(folder_entry.get(), master_entry.get(), selected_sheet, sheet_menu)
+        sheet_list.update(folder_entry.get(), master_entry.get(), output_entry.get(), bool(recursive_var.get()))
 
     def toggle_dark_mode():
         """
@@ -267,10 +504,15 @@ def main():
 
     def close_app():
         """
-        Κλείνει το παράθυρο της εφαρμογής.
+        Κλείνει το παράθυρο της εφαρμογής. Αν τρέχει συγχώνευση, της ζητά πρώτα να σταματήσει.
         """
+        if merge_state['cancel_event'] is not None:
+            merge_state['cancel_event'].set()
         window.destroy()
 
+    # === Κατάσταση της συγχώνευσης που εκτελείται (αν υπάρχει) ===
+    merge_state = {'cancel_event': None}
+
     # === Δημιουργία παραθύρου εφαρμογής ===
     window = Tk()
     dark_mode_var = IntVar()
@@ -278,7 +520,7 @@ def main():
     window.geometry("1000x700")
     window.minsize(800, 550)
 
-    window.grid_rowconfigure(5, weight=1)
+    window.grid_rowconfigure(8, weight=1)
     window.grid_columnconfigure(1, weight=1)
 
     # === Ορισμός γραμματοσειρών ===
@@ -308,13 +550,19 @@ def main():
     output_entry.insert(0, "merged_output.xlsx")
     output_entry.grid(row=2, column=1, padx=5, pady=3, sticky='ew')
 
+    # === Επιλογή συγχώνευσης και των αρχείων των υποφακέλων ===
+    recursive_var = IntVar(value=0)
+    Checkbutton(window, text="📁 Και υποφάκελοι", variable=recursive_var, font=button_font, command=master_changed).grid(row=2, column=2, sticky='w')
+
         # === Επιλογή φύλλου εργασίας από το master αρχείο ===
     Label(window, text="📑 Επιλογή φύλλου:", font=label_font).grid(row=3, column=0, sticky='e')
     selected_sheet = StringVar()
         # Το OptionMenu δημιουργεί αναδιπλούμενη λίστα (dropdown) για επιλογή φύλλου από το Excel
     sheet_menu = OptionMenu(window, selected_sheet, "")
     sheet_menu.grid(row=3, column=1, padx=5, pady=3, sticky='ew')
-    Button(window, text="🔄 Ανάγνωση φύλλων", font=button_font, command=lambda: update_sheet_list(folder_entry.get(), master_entry.get(), selected_sheet, sheet_menu)).grid(row=3, column=2)
+    # Η λίστα των φύλλων διαβάζεται σε νήμα εργασίας, ώστε το GUI να μην «παγώνει» σε μεγάλους φακέλους
+    sheet_list = SheetListUpdater(selected_sheet, sheet_menu)
+    Button(window, text="🔄 Ανάγνωση φύλλων", font=button_font, command=lambda: sheet_list.update(folder_entry.get(), master_entry.get(), output_entry.get(), bool(recursive_var.get()))).grid(row=3, column=2)
 
     # === Πεδίο για γραμμές προς αγνόηση ===
     Label(window, text="Γραμμές προς αγνόηση:", font=label_font).grid(row=4, column=0, sticky='e')
@@ -322,34 +570,76 @@ def main():
     skip_rows_entry.insert(0, "1")  # Προεπιλογή να αγνοεί 1 γραμμή (επικεφαλίδα)
     skip_rows_entry.grid(row=4, column=1, padx=5, pady=3, sticky='w')
 
+    # === Επιλογή αντιστοίχισης στηλών με βάση το όνομα (αντί για τη θέση) ===
+    align_columns_var = IntVar(value=0)
+    Checkbutton(window, text="🧭 Στήλες κατά όνομα", variable=align_columns_var, font=button_font).grid(row=4, column=2, sticky='w')
+
+    # === Πεδίο για πλήθος παράλληλων διεργασιών ανάγνωσης ===
+    Label(window, text="Παράλληλες διεργασίες:", font=label_font).grid(row=5, column=0, sticky='e')
+    workers_entry = Entry(window, width=10, font=entry_font)
+    workers_entry.insert(0, str(os.cpu_count() or 1))
+    workers_entry.grid(row=5, column=1, padx=5, pady=3, sticky='w')
+
+    # === Επιλογή χρήσης cache για αρχεία που δεν άλλαξαν από την προηγούμενη συγχώνευση ===
+    use_cache_var = IntVar(value=1)
+    Checkbutton(window, text="🗃️ Χρήση cache", variable=use_cache_var, font=button_font).grid(row=5, column=2, sticky='w')
+
+    # === Κουμπί γρήγορου ελέγχου του φακέλου πριν από τη συγχώνευση ===
+    preflight_button = Button(window, text="🔍 Έλεγχος φακέλου", font=button_font, command=start_preflight)
+    preflight_button.grid(row=6, column=0, pady=10)
+
     # === Κουμπί έναρξης συγχώνευσης ===
-    Button(window, text="🚀 Έναρξη συγχώνευσης", font=button_font, command=start_merge).grid(row=5, column=1, pady=10)
+    start_button = Button(window, text="🚀 Έναρξη συγχώνευσης", font=button_font, command=start_merge)
+    start_button.grid(row=6, column=1, pady=10)
+
+    # === Κουμπί ακύρωσης (ενεργό μόνο όσο τρέχει συγχώνευση) ===
+    cancel_button = Button(window, text="⏹ Ακύρωση", font=button_font, command=cancel_merge, state='disabled')
+    cancel_button.grid(row=6, column=2, pady=10)
 
         # === Μπάρα προόδου για παρακολούθηση ===
         # Το Progressbar είναι γραφική αναπαράσταση της προόδου επεξεργασίας
     progress_bar = ttk.Progressbar(window, orient="horizontal", length=400, mode="determinate")
-    progress_bar.grid(row=6, column=1, pady=5)
+    progress_bar.grid(row=7, column=1, pady=5)
+
+        # === Ετικέτα με τα τελικά στατιστικά της συγχώνευσης ===
+    status_label = Label(window, text="", font=entry_font)
+    status_label.grid(row=7, column=2, sticky='w')
 
         # === Περιοχή εμφάνισης log ===
         # Το Text widget είναι πολυγραμμικό πλαίσιο κειμένου για εμφάνιση των μηνυμάτων log
     log_text = Text(window, font=log_font)
-    log_text.grid(row=7, column=0, columnspan=3, padx=10, pady=10, sticky='nsew')
+    log_text.grid(row=8, column=0, columnspan=3, padx=10, pady=10, sticky='nsew')
 
         # Το Scrollbar συνδέεται με το log_text για κύλιση κάθετα
     scrollbar = Scrollbar(window, command=log_text.yview)
     log_text.configure(yscrollcommand=scrollbar.set)
-    scrollbar.grid(row=7, column=3, sticky='ns')
+
+        # Όλα τα μηνύματα περνούν από το LogSink, που ενημερώνει το widget σε παρτίδες
+    log_sink = LogSink(log_text)
+    scrollbar.grid(row=8, column=3, sticky='ns')
 
         # === Επιλογή dark mode ===
         # Το Checkbutton προσθέτει επιλογή ενεργοποίησης/απενεργοποίησης Dark Mode
-    Checkbutton(window, text="🌙 Dark Mode", variable=dark_mode_var, command=toggle_dark_mode, font=button_font).grid(row=8, column=0, pady=5, sticky='w')
-    Button(window, text="❌ Κλείσιμο", font=button_font, command=close_app).grid(row=9, column=1, pady=5)
+    Checkbutton(window, text="🌙 Dark Mode", variable=dark_mode_var, command=toggle_dark_mode, font=button_font).grid(row=9, column=0, pady=5, sticky='w')
+
+    # === Παρακολούθηση φακέλου: νέα συγχώνευση κάθε φορά που αλλάζει ο φάκελος, ώσπου να πατηθεί «Ακύρωση» ===
+    watch_var = IntVar(value=0)
+    Checkbutton(window, text="👀 Παρακολούθηση φακέλου", variable=watch_var, font=button_font).grid(row=9, column=1, pady=5, sticky='w')
+
+    # === Καταγραφή της προόδου (checkpoint), ώστε μια συγχώνευση που διακόπηκε να συνεχίσει από εκεί που σταμάτησε ===
+    checkpoint_var = IntVar(value=0)
+    Checkbutton(window, text="💾 Συνέχεια μετά από διακοπή", variable=checkpoint_var, font=button_font).grid(row=9, column=2, pady=5, sticky='w')
+    Button(window, text="❌ Κλείσιμο", font=button_font, command=close_app).grid(row=10, column=1, pady=5)
 
         # === Αυτόματη φόρτωση φύλλων από προεπιλεγμένο αρχείο ===
-    update_sheet_list("merge_files", "master.xlsx", selected_sheet, sheet_menu)
+    sheet_list.update("merge_files", "master.xlsx", output_entry.get(), bool(recursive_var.get()))
 
     window.mainloop()
 
 
 if __name__ == "__main__":
-    main()
+    # Απαραίτητο για τις παράλληλες διεργασίες όταν η εφαρμογή πακεταριστεί με pyinstaller
+    freeze_support()
+    parser = argparse.ArgumentParser(description="Excel Merge GUI")
+    parser.add_argument('--profile', metavar='FILE', help="αποθήκευση προφίλ cProfile κάθε συγχώνευσης (pstats)")
+    main(parser.parse_args(sys.argv[1:]).profile)
@@ -0,0 +1,846 @@
+import io
+import os
+import posixpath
+import threading
+import zipfile
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from itertools import islice
+import openpyxl
+from openpyxl.styles.numbers import BUILTIN_FORMATS, is_date_format, is_timedelta_format
+from openpyxl.utils.datetime import CALENDAR_MAC_1904, CALENDAR_WINDOWS_1900, from_excel, from_ISO8601
+
+# Προαιρετικές βιβλιοθήκες για γρηγορότερη ανάγνωση: python-calamine (Rust) και lxml
+try:
+    from python_calamine import CalamineWorkbook
+except ImportError:
+    CalamineWorkbook = None
+
+try:
+    from lxml.etree import iterparse
+    HAS_LXML = True
+except ImportError:
+    from xml.etree.ElementTree import iterparse
+    HAS_LXML = False
+
+
+# Διαθέσιμοι τρόποι ανάγνωσης (backends), με σειρά προτίμησης για την αυτόματη επιλογή
+BACKENDS = ('calamine', 'xml', 'openpyxl')
+AUTO_BACKEND = 'auto'
+
+# Πόσες γραμμές κανονικοποιούνται και ελέγχονται μαζί στη filter_rows
+FILTER_BLOCK_ROWS = 512
+
+# Το σφάλμα ενός φύλλου που δεν έχει γραμμές δεδομένων
+NO_DATA_ERROR = "Η 2η γραμμή είναι εντελώς κενή ή δεν βρέθηκαν δεδομένα"
+
+SHEET_MAIN_NS = 'http://schemas.openxmlformats.org/spreadsheetml/2006/main'
+REL_NS = 'http://schemas.openxmlformats.org/officeDocument/2006/relationships'
+PKG_REL_NS = 'http://schemas.openxmlformats.org/package/2006/relationships'
+ROW_TAG = f'{{{SHEET_MAIN_NS}}}row'
+VALUE_TAG = f'{{{SHEET_MAIN_NS}}}v'
+INLINE_STRING_TAG = f'{{{SHEET_MAIN_NS}}}is'
+TEXT_TAG = f'{{{SHEET_MAIN_NS}}}t'
+RUN_TAG = f'{{{SHEET_MAIN_NS}}}r'
+STRING_ITEM_TAG = f'{{{SHEET_MAIN_NS}}}si'
+DIMENSION_TAG = f'{{{SHEET_MAIN_NS}}}dimension'
+SHEET_DATA_TAG = f'{{{SHEET_MAIN_NS}}}sheetData'
+
+# Μέγιστο πλήθος βιβλίων εργασίας στην cache μεταδεδομένων
+METADATA_CACHE_SIZE = 4096
+
+
+# Μετατρέπει μια τιμή κελιού όπως θα την επέστρεφε το pd.read_excel, ώστε όλα τα backends
+# να δίνουν ακριβώς τις ίδιες τιμές (οι δεκαδικοί με ακέραια τιμή γίνονται int, το '' γίνεται None)
+
+def convert_cell(value):
+    """
+    Κανονικοποιεί την τιμή ενός κελιού ώστε να ταυτίζεται με την τιμή που δίνει το pandas.
+
+    Parameters:
+    - value: η τιμή του κελιού όπως τη διάβασε το backend
+
+    Returns:
+    - Η κανονικοποιημένη τιμή
+    """
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    if value == '':
+        return None
+    # Το calamine επιστρέφει date για ημερομηνίες χωρίς ώρα, το openpyxl πάντα datetime
+    if type(value) is date:
+        return datetime(value.year, value.month, value.day)
+    return value
+
+
+# Ελέγχει αν μια γραμμή είναι εντελώς κενή (κενά κελιά ή κελιά μόνο με κενούς χαρακτήρες)
+
+def is_blank_row(values):
+    """
+    Επιστρέφει True αν όλα τα κελιά της γραμμής είναι κενά ή περιέχουν μόνο κενούς χαρακτήρες.
+
+    Parameters:
+    - values: οι τιμές της γραμμής (tuple ή list)
+    """
+    return all(value is None or (isinstance(value, str) and value.strip() == '') for value in values)
+
+
+# Διαβάζει και επιστρέφει όλα τα ονόματα φύλλων από ένα αρχείο Excel
+# Επιστρέφει κενή λίστα σε περίπτωση αποτυχίας
+
+def read_excel_sheets(filepath):
+    """
+    Διαβάζει και επιστρέφει όλα τα ονόματα φύλλων από ένα αρχείο Excel.
+    Επιστρέφει κενή λίστα σε περίπτωση αποτυχίας.
+    Διαβάζεται μόνο το xl/workbook.xml και το αποτέλεσμα κρατιέται όσο το αρχείο δεν αλλάζει.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+
+    Returns:
+    - Λίστα με ονόματα φύλλων (list of str)
+    """
+    try:
+        return list(get_workbook_metadata(filepath).sheet_names)
+    except Exception:
+        return []
+
+
+# Επιστρέφει το φύλλο sheet_name ενός βιβλίου εργασίας, με το ίδιο μήνυμα σφάλματος που δίνει το pandas
+
+def get_sheet(workbook, sheet_name):
+    """
+    Επιστρέφει το ζητούμενο φύλλο ή σηκώνει ValueError αν δεν υπάρχει.
+
+    Parameters:
+    - workbook: βιβλίο εργασίας openpyxl
+    - sheet_name: το όνομα του φύλλου
+    """
+    if sheet_name not in workbook.sheetnames:
+        raise ValueError(f"Worksheet named '{sheet_name}' not found")
+    sheet = workbook[sheet_name]
+    # Η διάσταση που γράφουν ορισμένα προγράμματα είναι λανθασμένη, οπότε δεν τη λαμβάνουμε υπόψη
+    sheet.reset_dimensions()
+    return sheet
+
+
+# Επιστρέφει τα ονόματα των backends που μπορούν να χρησιμοποιηθούν σε αυτό το σύστημα
+
+def available_backends():
+    """
+    Επιστρέφει τα διαθέσιμα backends ανάγνωσης, με σειρά προτίμησης.
+    Το 'calamine' απαιτεί το python-calamine, ενώ το 'xml' προτιμάται αυτόματα μόνο αν υπάρχει το lxml.
+    """
+    backends = []
+    if CalamineWorkbook is not None:
+        backends.append('calamine')
+    backends.append('xml')
+    backends.append('openpyxl')
+    return backends
+
+
+# Επιλέγει το backend ανάγνωσης: το ζητούμενο ή, με 'auto', το γρηγορότερο εγκατεστημένο
+
+def resolve_backend(backend=AUTO_BACKEND):
+    """
+    Επιστρέφει το όνομα του backend που θα χρησιμοποιηθεί.
+
+    Parameters:
+    - backend: 'auto', 'calamine', 'xml' ή 'openpyxl'
+    """
+    if backend == AUTO_BACKEND:
+        if CalamineWorkbook is not None:
+            return 'calamine'
+        # Χωρίς lxml ο απευθείας αναγνώστης XML δεν είναι αισθητά γρηγορότερος από το openpyxl
+        return 'xml' if HAS_LXML else 'openpyxl'
+    if backend not in BACKENDS:
+        raise ValueError(f"Άγνωστο backend ανάγνωσης: '{backend}'")
+    if backend == 'calamine' and CalamineWorkbook is None:
+        raise ValueError("Το backend 'calamine' απαιτεί τη βιβλιοθήκη python-calamine")
+    return backend
+
+
+# Τα backends διαβάζουν είτε από τη διαδρομή του αρχείου είτε από τα bytes του, αν έχουν ήδη διαβαστεί
+# στη μνήμη (βλ. merge_prefetch), ώστε το αρχείο να μην ανοίγει ξανά από τον δίσκο ή το δίκτυο
+
+def _source_input(filepath, data):
+    return filepath if data is None else io.BytesIO(data)
+
+
+# === Backend 'openpyxl': ανάγνωση σε λειτουργία read_only ===
+
+class _OpenpyxlSource:
+    def __init__(self, filepath, data=None):
+        self.workbook = openpyxl.load_workbook(_source_input(filepath, data), read_only=True, data_only=True,
+                                               keep_links=False)
+
+    def rows(self, sheet_name, min_row):
+        yield from get_sheet(self.workbook, sheet_name).iter_rows(min_row=min_row, values_only=True)
+
+    def close(self):
+        self.workbook.close()
+
+
+# === Backend 'calamine': ανάγνωση μέσω της βιβλιοθήκης python-calamine (γραμμένη σε Rust) ===
+
+class _CalamineSource:
+    def __init__(self, filepath, data=None):
+        if data is None:
+            self.workbook = CalamineWorkbook.from_path(filepath)
+        else:
+            self.workbook = CalamineWorkbook.from_filelike(io.BytesIO(data))
+
+    def rows(self, sheet_name, min_row):
+        if sheet_name not in self.workbook.sheet_names:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        # Το iter_rows ξεκινά πάντα από τη γραμμή 1, ακόμη κι αν οι πρώτες γραμμές είναι κενές
+        for row_number, values in enumerate(self.workbook.get_sheet_by_name(sheet_name).iter_rows(), start=1):
+            if row_number >= min_row:
+                yield values
+
+    def close(self):
+        self.workbook.close()
+
+
+# === Backend 'xml': απευθείας ανάγνωση του sheetN.xml και του sharedStrings.xml από το zip ===
+
+def _column_index(reference):
+    # 'AB12' -> 28
+    index = 0
+    for char in reference:
+        if 'A' <= char <= 'Z':
+            index = index * 26 + ord(char) - 64
+        else:
+            break
+    return index
+
+
+def _string_content(element):
+    # Το κείμενο ενός <si> ή <is>: απλό <t> ή διαδοχικά <r><t> (rich text), όπως το Text.content του openpyxl
+    parts = []
+    plain = element.find(TEXT_TAG)
+    if plain is not None:
+        parts.append(plain.text or '')
+    for run in element.iterfind(RUN_TAG):
+        text = run.find(TEXT_TAG)
+        if text is not None:
+            parts.append(text.text or '')
+    return ''.join(parts)
+
+
+def _read_relationships(archive, path):
+    # Επιστρέφει {Id: (Type, πλήρης διαδρομή στόχου)} από ένα αρχείο .rels
+    folder = posixpath.dirname(posixpath.dirname(path))
+    relationships = {}
+    if path not in archive.namelist():
+        return relationships
+    with archive.open(path) as source:
+        for _, element in iterparse(source, events=('end',)):
+            if element.tag == f'{{{PKG_REL_NS}}}Relationship':
+                target = element.get('Target')
+                if target.startswith('/'):
+                    target = target.lstrip('/')
+                else:
+                    target = posixpath.normpath(posixpath.join(folder, target))
+                relationships[element.get('Id')] = (element.get('Type', ''), target)
+    return relationships
+
+
+def _workbook_parts(archive):
+    # Εντοπίζει το workbook.xml και επιστρέφει (διαδρομή, σχέσεις του workbook)
+    workbook_path = 'xl/workbook.xml'
+    for rel_type, target in _read_relationships(archive, '_rels/.rels').values():
+        if rel_type.endswith('/officeDocument'):
+            workbook_path = target
+    rels_path = posixpath.join(posixpath.dirname(workbook_path), '_rels',
+                               posixpath.basename(workbook_path) + '.rels')
+    return workbook_path, _read_relationships(archive, rels_path)
+
+
+def _read_shared_strings(archive, path):
+    strings = []
+    if path is None or path not in archive.namelist():
+        return strings
+    with archive.open(path) as source:
+        for _, element in iterparse(source, events=('end',)):
+            if element.tag == STRING_ITEM_TAG:
+                strings.append(_string_content(element).replace('x005F_', ''))
+                element.clear()
+    return strings
+
+
+def _read_date_styles(archive, path):
+    # Οι δείκτες στυλ (cellXfs) με μορφή ημερομηνίας και διάρκειας, όπως τους υπολογίζει το openpyxl
+    date_styles, timedelta_styles = set(), set()
+    if path is None or path not in archive.namelist():
+        return date_styles, timedelta_styles
+    custom_formats = {}
+    style_formats = []
+    with archive.open(path) as source:
+        in_cell_xfs = False
+        for event, element in iterparse(source, events=('start', 'end')):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag == 'cellXfs':
+                in_cell_xfs = event == 'start'
+            elif event == 'end' and tag == 'numFmt':
+                custom_formats[int(element.get('numFmtId'))] = element.get('formatCode')
+            elif event == 'end' and tag == 'xf' and in_cell_xfs:
+                style_formats.append(int(element.get('numFmtId', 0)))
+    for index, format_id in enumerate(style_formats):
+        number_format = custom_formats.get(format_id, BUILTIN_FORMATS.get(format_id))
+        if is_date_format(number_format):
+            date_styles.add(index)
+        if is_timedelta_format(number_format):
+            timedelta_styles.add(index)
+    return date_styles, timedelta_styles
+
+
+def _read_sheet_index(archive, workbook_path):
+    # Επιστρέφει (λίστα (όνομα φύλλου, r:id), epoch)
+    sheets = []
+    epoch = CALENDAR_WINDOWS_1900
+    with archive.open(workbook_path) as source:
+        for _, element in iterparse(source, events=('end',)):
+            tag = element.tag.rsplit('}', 1)[-1]
+            if tag == 'sheet':
+                sheets.append((element.get('name'), element.get(f'{{{REL_NS}}}id')))
+            elif tag == 'workbookPr' and element.get('date1904') in ('1', 'true'):
+                epoch = CALENDAR_MAC_1904
+    return sheets, epoch
+
+
+def _cast_number(value):
+    if '.' in value or 'E' in value or 'e' in value:
+        return float(value)
+    return int(value)
+
+
+class _XmlSource:
+    # Το zip, το workbook.xml, το sharedStrings.xml και το styles.xml διαβάζονται μία φορά για όλα τα φύλλα
+
+    def __init__(self, filepath, data=None):
+        self.archive = zipfile.ZipFile(_source_input(filepath, data))
+        try:
+            workbook_path, self.relationships = _workbook_parts(self.archive)
+            sheets, self.epoch = _read_sheet_index(self.archive, workbook_path)
+        except Exception:
+            self.archive.close()
+            raise
+        self.sheet_ids = dict(sheets)
+        self.part_paths = {rel_type.rsplit('/', 1)[-1]: target for rel_type, target in self.relationships.values()}
+        self.shared_strings = None
+        self.date_styles = self.timedelta_styles = None
+
+    def rows(self, sheet_name, min_row):
+        if sheet_name not in self.sheet_ids:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+        sheet_path = self.relationships[self.sheet_ids[sheet_name]][1]
+        if self.shared_strings is None:
+            self.shared_strings = _read_shared_strings(self.archive, self.part_paths.get('sharedStrings'))
+            self.date_styles, self.timedelta_styles = _read_date_styles(self.archive, self.part_paths.get('styles'))
+        shared_strings, date_styles, timedelta_styles = self.shared_strings, self.date_styles, self.timedelta_styles
+        epoch = self.epoch
+
+        with self.archive.open(sheet_path) as source:
+            # Το lxml φιλτράρει μόνο του τα <row>, με το ElementTree ελέγχουμε εμείς την ετικέτα
+            events = iterparse(source, events=('end',), tag=ROW_TAG) if HAS_LXML else iterparse(source, events=('end',))
+            row_number = 0
+            next_row = min_row
+            for _, row in events:
+                if row.tag != ROW_TAG:
+                    continue
+                reference = row.get('r')
+                row_number = int(reference) if reference else row_number + 1
+                if row_number >= min_row:
+                    # Γραμμές που λείπουν από το XML είναι κενές
+                    while next_row < row_number:
+                        yield ()
+                        next_row += 1
+                    values = _parse_xml_row(row, shared_strings, date_styles, timedelta_styles, epoch)
+                else:
+                    values = None
+                row.clear()
+                if HAS_LXML:
+                    # Αφαιρούμε και τις προηγούμενες (ήδη επεξεργασμένες) γραμμές ώστε η μνήμη να μένει σταθερή
+                    while row.getprevious() is not None:
+                        del row.getparent()[0]
+                if values is not None:
+                    yield values
+                    next_row += 1
+
+    def close(self):
+        self.archive.close()
+
+
+_SOURCES = {
+    'calamine': _CalamineSource,
+    'xml': _XmlSource,
+    'openpyxl': _OpenpyxlSource,
+}
+
+
+# Ανοίγει ένα αρχείο με το backend και επιστρέφει (yield) τις γραμμές ενός φύλλου του
+
+def _sheet_rows(source_type, filepath, sheet_name, min_row):
+    source = source_type(filepath)
+    try:
+        yield from source.rows(sheet_name, min_row)
+    finally:
+        source.close()
+
+
+def _xml_rows(filepath, sheet_name, min_row):
+    return _sheet_rows(_XmlSource, filepath, sheet_name, min_row)
+
+
+# Ανοίγει ένα αρχείο πηγής μία φορά, ώστε να διαβαστούν από αυτό ένα ή περισσότερα φύλλα
+
+def open_source(filepath, backend='openpyxl', data=None):
+    """
+    Ανοίγει ένα αρχείο Excel με το επιλεγμένο backend.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+    - backend: 'openpyxl', 'calamine', 'xml' ή 'auto'
+    - data: τα bytes του αρχείου, αν έχουν ήδη διαβαστεί (τότε το αρχείο δεν ανοίγει από τη διαδρομή)
+
+    Returns:
+    - Αντικείμενο με τις μεθόδους rows(sheet_name, min_row) και close()
+    """
+    return _SOURCES[resolve_backend(backend)](filepath, data)
+
+
+def _parse_xml_row(row, shared_strings, date_styles, timedelta_styles, epoch):
+    # Μετατρέπει ένα στοιχείο <row> σε λίστα τιμών (οι θέσεις των κενών κελιών γεμίζουν με None)
+    values = []
+    column = 0
+    for cell in row:
+        get = cell.get
+        reference = get('r')
+        column = _column_index(reference) if reference else column + 1
+        data_type = get('t', 'n')
+        value = None
+        for child in cell:
+            if child.tag == VALUE_TAG:
+                value = child.text or None
+            elif child.tag == INLINE_STRING_TAG:
+                value = _string_content(child)
+        if value is None:
+            continue
+        if data_type == 'n':
+            value = _cast_number(value)
+            style = get('s')
+            if style and int(style) in date_styles:
+                try:
+                    value = from_excel(value, epoch, timedelta=int(style) in timedelta_styles)
+                except (OverflowError, ValueError):
+                    value = '#VALUE!'
+        elif data_type == 's':
+            value = shared_strings[int(value)]
+        elif data_type == 'b':
+            value = bool(int(value))
+        elif data_type == 'd':
+            value = from_ISO8601(value)
+        missing = column - 1 - len(values)
+        if missing > 0:
+            values.extend([None] * missing)
+        values.append(value)
+    return values
+
+
+# === Μεταδεδομένα βιβλίου εργασίας: ονόματα φύλλων, διαστάσεις και γραμμή επικεφαλίδας ===
+
+@dataclass
+class WorkbookMetadata:
+    """
+    Τα μεταδεδομένα ενός αρχείου xlsx, όπως διαβάζονται απευθείας από το zip.
+    Τα ονόματα των φύλλων διαβάζονται αμέσως (από το xl/workbook.xml)· η διάσταση και οι γραμμές
+    επικεφαλίδας κάθε φύλλου διαβάζονται μόνο όταν ζητηθούν και μετά κρατιούνται.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου
+    - mtime_ns, size: η κατάσταση του αρχείου όταν διαβάστηκαν τα μεταδεδομένα
+    - sheet_names: τα ονόματα των φύλλων με τη σειρά του βιβλίου εργασίας
+    - sheet_paths: το αρχείο XML (μέσα στο zip) κάθε φύλλου
+    """
+    filepath: str
+    mtime_ns: int
+    size: int
+    sheet_names: list
+    sheet_paths: dict
+    dimensions: dict = field(default_factory=dict)
+    headers: dict = field(default_factory=dict)
+
+    def _check_sheet(self, sheet_name):
+        if sheet_name not in self.sheet_paths:
+            raise ValueError(f"Worksheet named '{sheet_name}' not found")
+
+    def dimension(self, sheet_name):
+        """
+        Επιστρέφει την περιοχή που δηλώνει το φύλλο (π.χ. 'A1:E20') ή None αν δεν δηλώνεται.
+        Διαβάζεται μόνο η αρχή του XML του φύλλου, πριν από τα δεδομένα.
+        """
+        self._check_sheet(sheet_name)
+        if sheet_name not in self.dimensions:
+            reference = None
+            with zipfile.ZipFile(self.filepath) as archive, archive.open(self.sheet_paths[sheet_name]) as source:
+                for _, element in iterparse(source, events=('start',)):
+                    if element.tag == DIMENSION_TAG:
+                        reference = element.get('ref')
+                        break
+                    if element.tag == SHEET_DATA_TAG:
+                        break
+            self.dimensions[sheet_name] = reference
+        return self.dimensions[sheet_name]
+
+    def header_rows(self, sheet_name, count=1):
+        """
+        Επιστρέφει τις πρώτες count γραμμές του φύλλου (list of list), κανονικοποιημένες όπως και οι
+        γραμμές δεδομένων. Διαβάζεται μόνο η αρχή του φύλλου.
+        """
+        self._check_sheet(sheet_name)
+        key = (sheet_name, count)
+        if key not in self.headers:
+            rows = _xml_rows(self.filepath, sheet_name, 1)
+            try:
+                self.headers[key] = [[convert_cell(value) for value in values] for values in islice(rows, count)]
+            finally:
+                rows.close()
+        return self.headers[key]
+
+
+# Μεταδεδομένα ανά αρχείο (απόλυτη διαδρομή), που ισχύουν όσο δεν αλλάζουν το mtime και το μέγεθος
+_metadata_cache = {}
+# Ο προκαταρκτικός έλεγχος καλεί τη get_workbook_metadata από πολλά νήματα ταυτόχρονα
+_metadata_lock = threading.Lock()
+
+
+def _read_workbook_metadata(filepath, stat):
+    with zipfile.ZipFile(filepath) as archive:
+        workbook_path, relationships = _workbook_parts(archive)
+        sheets, _ = _read_sheet_index(archive, workbook_path)
+    sheet_paths = {name: relationships[rel_id][1] for name, rel_id in sheets if rel_id in relationships}
+    return WorkbookMetadata(filepath, stat.st_mtime_ns, stat.st_size, [name for name, _ in sheets], sheet_paths)
+
+
+# Επιστρέφει τα μεταδεδομένα ενός αρχείου, από την cache αν το αρχείο δεν έχει αλλάξει
+
+def get_workbook_metadata(filepath):
+    """
+    Επιστρέφει το WorkbookMetadata ενός αρχείου xlsx. Διαβάζεται μόνο το xl/workbook.xml και
+    οι σχέσεις του· κατεστραμμένα αρχεία σηκώνουν εξαίρεση (π.χ. zipfile.BadZipFile).
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+    """
+    key = os.path.abspath(filepath)
+    stat = os.stat(key)
+    metadata = _metadata_cache.get(key)
+    if metadata is None or metadata.mtime_ns != stat.st_mtime_ns or metadata.size != stat.st_size:
+        metadata = _read_workbook_metadata(key, stat)
+        with _metadata_lock:
+            _metadata_cache.pop(key, None)
+            if len(_metadata_cache) >= METADATA_CACHE_SIZE:
+                # Αφαιρείται η παλαιότερη εγγραφή (τα dict κρατούν τη σειρά εισαγωγής)
+                del _metadata_cache[next(iter(_metadata_cache))]
+            _metadata_cache[key] = metadata
+    return metadata
+
+
+# Μετρά σε πόσα από τα αρχεία υπάρχει κάθε φύλλο (χωρίς να ανοιχτεί κανένα φύλλο)
+
+def sheet_presence(filepaths):
+    """
+    Επιστρέφει σε πόσα αρχεία εμφανίζεται κάθε όνομα φύλλου.
+
+    Parameters:
+    - filepaths: λίστα με διαδρομές αρχείων Excel
+
+    Returns:
+    - Tuple (counts, readable, unreadable): counts είναι {όνομα φύλλου: πλήθος αρχείων}, readable το πλήθος
+      των αρχείων που διαβάστηκαν και unreadable λίστα με τα αρχεία που δεν ήταν δυνατό να διαβαστούν
+    """
+    counts = {}
+    readable = 0
+    unreadable = []
+    for filepath in filepaths:
+        try:
+            sheet_names = get_workbook_metadata(filepath).sheet_names
+        except Exception:
+            unreadable.append(filepath)
+            continue
+        readable += 1
+        for sheet_name in set(sheet_names):
+            counts[sheet_name] = counts.get(sheet_name, 0) + 1
+    return counts, readable, unreadable
+
+
+# Κανονικοποιεί ένα κομμάτι γραμμών με τον ίδιο τρόπο που η convert_cell κανονικοποιεί ένα κελί.
+# Η μετατροπή είναι γραμμένη inline ώστε να μη γίνεται μία κλήση συνάρτησης για κάθε κελί.
+
+def _convert_block(block):
+    return [[(int(value) if value.is_integer() else value) if isinstance(value, float)
+             else None if value == ''
+             else datetime(value.year, value.month, value.day) if type(value) is date
+             else value
+             for value in values]
+            for values in block]
+
+
+# Επιστρέφει τη θέση της πρώτης κενής γραμμής ενός κομματιού (ή None). Ίδιος κανόνας με την is_blank_row,
+# αλλά χωρίς generator ανά γραμμή: για τις περισσότερες γραμμές αρκεί ο έλεγχος του πρώτου κελιού.
+
+def _first_blank_row(block):
+    for index, values in enumerate(block):
+        for value in values:
+            if value is not None and (not isinstance(value, str) or value.strip()):
+                break
+        else:
+            return index
+    return None
+
+
+# Μετατρέπει τις «ωμές» γραμμές ενός backend σε γραμμές δεδομένων: κανονικοποιεί τις τιμές,
+# σταματά στην πρώτη κενή γραμμή και αφαιρεί τα κενά κελιά στο τέλος κάθε γραμμής.
+# Οι γραμμές επεξεργάζονται σε κομμάτια: κάθε κομμάτι μετατρέπεται μονομιάς, εντοπίζεται η πρώτη
+# κενή γραμμή του και επιστρέφεται ολόκληρο το τμήμα πριν από αυτήν.
+
+def filter_rows(rows, skip_rows=1):
+    """
+    Επιστρέφει (yield) τις γραμμές δεδομένων από τις τιμές που δίνει ένα backend.
+
+    Parameters:
+    - rows: iterable με τις τιμές κάθε γραμμής, ξεκινώντας από τη γραμμή skip_rows + 1
+    - skip_rows: πλήθος γραμμών επικεφαλίδας που αγνοήθηκαν (για την αρίθμηση των γραμμών)
+
+    Yields:
+    - Tuple (αριθμός γραμμής, λίστα τιμών)
+    """
+    rows = iter(rows)
+    line_number = skip_rows + 1
+    while True:
+        block = _convert_block(islice(rows, FILTER_BLOCK_ROWS))
+        if not block:
+            return
+        end = _first_blank_row(block)
+        if end is not None:
+            del block[end:]
+        for values in block:
+            while values and values[-1] is None:
+                values.pop()
+        yield from zip(range(line_number, line_number + len(block)), block)
+        if end is not None:
+            return
+        line_number += len(block)
+
+
+# Επιστρέφει τον «ωμό» αναγνώστη γραμμών ενός backend (χωρίς κανονικοποίηση και χωρίς τέλος στην κενή γραμμή)
+
+def iter_raw_rows(filepath, sheet_name, skip_rows=1, backend='openpyxl'):
+    """
+    Επιστρέφει generator με τις τιμές κάθε γραμμής όπως τις δίνει το backend, από τη γραμμή skip_rows + 1.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+    - sheet_name: το φύλλο που θα διαβαστεί
+    - skip_rows: πλήθος γραμμών επικεφαλίδας που αγνοούνται
+    - backend: 'openpyxl', 'calamine', 'xml' ή 'auto'
+    """
+    return _sheet_rows(_SOURCES[resolve_backend(backend)], filepath, sheet_name, skip_rows + 1)
+
+
+# Διαβάζει «τεμπέλικα» (lazily) τις γραμμές ενός φύλλου με το επιλεγμένο backend.
+# Η ανάγνωση σταματά στην πρώτη κενή γραμμή, άρα δεν διαβάζονται οι μορφοποιημένες κενές γραμμές στο τέλος.
+
+def iter_sheet_rows(filepath, sheet_name, skip_rows=1, backend='openpyxl'):
+    """
+    Επιστρέφει (yield) τις γραμμές δεδομένων ενός φύλλου, ξεκινώντας μετά τις πρώτες
+    skip_rows γραμμές και σταματώντας στην πρώτη εντελώς κενή γραμμή.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+    - sheet_name: το φύλλο που θα διαβαστεί
+    - skip_rows: πλήθος γραμμών επικεφαλίδας που αγνοούνται
+    - backend: 'openpyxl', 'calamine', 'xml' ή 'auto'
+
+    Yields:
+    - Tuple (αριθμός γραμμής, λίστα τιμών), χωρίς τα κενά κελιά στο τέλος της γραμμής
+    """
+    rows = iter_raw_rows(filepath, sheet_name, skip_rows, backend)
+    try:
+        yield from filter_rows(rows, skip_rows)
+    finally:
+        rows.close()
+
+
+# Διαβάζει τις πρώτες γραμμές ενός φύλλου (π.χ. την επικεφαλίδα του master αρχείου)
+
+def read_header_rows(filepath, sheet_name, count=1):
+    """
+    Επιστρέφει τις πρώτες count γραμμές ενός φύλλου, χωρίς να διαβάσει το υπόλοιπο φύλλο.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+    - sheet_name: το φύλλο που θα διαβαστεί
+    - count: πλήθος γραμμών
+
+    Returns:
+    - Λίστα με τις τιμές κάθε γραμμής (list of list)
+    """
+    workbook = openpyxl.load_workbook(filepath, read_only=True, data_only=True, keep_links=False)
+    try:
+        sheet = get_sheet(workbook, sheet_name)
+        if count <= 0:
+            return []
+        return [[convert_cell(value) for value in values]
+                for values in sheet.iter_rows(min_row=1, max_row=count, values_only=True)]
+    finally:
+        workbook.close()
+
+
+# Διαβάζει τις γραμμές δεδομένων ενός αρχείου πηγής (μετά τις skip_rows γραμμές, ως την 1η κενή).
+# Ορίζεται σε επίπεδο module ώστε να μπορεί να εκτελεστεί και σε ξεχωριστή διεργασία.
+
+def read_source_rows(filepath, sheet_name, skip_rows=1, backend='openpyxl'):
+    """
+    Διαβάζει ένα αρχείο Excel και επιστρέφει τις γραμμές δεδομένων του, ξεκινώντας μετά τις
+    πρώτες skip_rows γραμμές και σταματώντας στην πρώτη εντελώς κενή γραμμή.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+    - sheet_name: το φύλλο που θα διαβαστεί
+    - skip_rows: πλήθος γραμμών επικεφαλίδας που αγνοούνται
+    - backend: το backend ανάγνωσης ('openpyxl', 'calamine', 'xml' ή 'auto')
+
+    Returns:
+    - Tuple (rows, error): rows είναι λίστα από (αριθμός γραμμής, λίστα τιμών) και
+      error το μήνυμα σφάλματος (ή None αν το αρχείο διαβάστηκε κανονικά)
+    """
+    return _collect_rows(iter_sheet_rows(filepath, sheet_name, skip_rows, backend))
+
+
+def _split_header(rows, count):
+    # Οι πρώτες count γραμμές ενός φύλλου (από τη γραμμή 1), κανονικοποιημένες όπως οι γραμμές δεδομένων
+    return [[convert_cell(value) for value in values] for values in islice(rows, count)]
+
+
+def _collect_rows(rows):
+    # Διαβάζει όλες τις γραμμές δεδομένων ενός φύλλου και επιστρέφει (rows, error)
+    try:
+        rows = list(rows)
+    except Exception as e:
+        return [], str(e)
+
+    if not rows:
+        return [], NO_DATA_ERROR
+    return rows, None
+
+
+# Διαβάζει πολλά φύλλα του ίδιου αρχείου πηγής ανοίγοντάς το μία φορά (zip, κοινόχρηστα κείμενα, στυλ),
+# αντί για μία φορά ανά φύλλο. Ορίζεται σε επίπεδο module ώστε να μπορεί να εκτελεστεί σε ξεχωριστή διεργασία.
+
+def read_source_sheets(filepath, sheet_names, skip_rows=1, backend='openpyxl', data=None, header=False):
+    """
+    Όπως η read_source_rows, αλλά για πολλά φύλλα: ένα φύλλο που λείπει ή είναι κενό δεν επηρεάζει τα υπόλοιπα.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+    - sheet_names: τα φύλλα που θα διαβαστούν
+    - skip_rows: πλήθος γραμμών επικεφαλίδας που αγνοούνται σε κάθε φύλλο
+    - backend: το backend ανάγνωσης ('openpyxl', 'calamine', 'xml' ή 'auto')
+    - data: τα bytes του αρχείου, αν έχουν ήδη διαβαστεί στη μνήμη (βλ. open_source)
+    - header: αν True, επιστρέφονται και οι skip_rows γραμμές επικεφαλίδας κάθε φύλλου, από την ίδια ανάγνωση
+
+    Returns:
+    - Λίστα από (rows, error), ή (rows, error, γραμμές επικεφαλίδας) με header=True (None αν το φύλλο δεν
+      διαβάστηκε), μία για κάθε φύλλο με τη σειρά του sheet_names
+    """
+    try:
+        source = open_source(filepath, backend, data)
+    except Exception as e:
+        return [([], str(e), None) if header else ([], str(e)) for _ in sheet_names]
+    try:
+        results = []
+        for sheet_name in sheet_names:
+            if not header:
+                rows = source.rows(sheet_name, skip_rows + 1)
+                try:
+                    results.append(_collect_rows(filter_rows(rows, skip_rows)))
+                finally:
+                    rows.close()
+                continue
+            rows = source.rows(sheet_name, 1)
+            try:
+                header_rows = _split_header(rows, skip_rows)
+                results.append(_collect_rows(filter_rows(rows, skip_rows)) + (header_rows,))
+            except Exception as e:
+                results.append(([], str(e), None))
+            finally:
+                rows.close()
+        return results
+    finally:
+        source.close()
+
+
+# Διαβάζει τις γραμμές δεδομένων ενός φύλλου σε κομμάτια σταθερού μεγέθους, ώστε ένα πολύ μεγάλο φύλλο
+# να γράφεται στο αρχείο εξόδου χωρίς να κρατιέται ποτέ ολόκληρο στη μνήμη
+
+def iter_source_chunks(source, sheet_name, skip_rows=1, chunk_rows=FILTER_BLOCK_ROWS, header=None):
+    """
+    Επιστρέφει (yield) τις γραμμές δεδομένων ενός φύλλου σε λίστες των έως chunk_rows γραμμών.
+    Τα σφάλματα ανάγνωσης εμφανίζονται ως εξαίρεση, ίσως αφού έχουν ήδη δοθεί κάποια κομμάτια.
+
+    Parameters:
+    - source: το ανοιχτό αρχείο (βλ. open_source)
+    - sheet_name: το φύλλο που θα διαβαστεί
+    - skip_rows: πλήθος γραμμών επικεφαλίδας που αγνοούνται
+    - chunk_rows: μέγιστο πλήθος γραμμών ανά κομμάτι
+    - header: optional λίστα, στην οποία προστίθενται οι γραμμές επικεφαλίδας του φύλλου πριν από το πρώτο κομμάτι
+
+    Yields:
+    - Λίστα από (αριθμός γραμμής, λίστα τιμών)
+    """
+    rows = source.rows(sheet_name, 1 if header is not None else skip_rows + 1)
+    try:
+        if header is not None:
+            header.extend(_split_header(rows, skip_rows))
+        data_rows = filter_rows(rows, skip_rows)
+        while True:
+            chunk = list(islice(data_rows, max(1, chunk_rows)))
+            if not chunk:
+                return
+            yield chunk
+    finally:
+        rows.close()
+
+
+# Διαβάζει το ίδιο αρχείο με όλα τα διαθέσιμα backends και επιστρέφει όσα δίνουν διαφορετικές γραμμές
+# από το openpyxl (που θεωρείται η αναφορά)
+
+def compare_backends(filepath, sheet_name, skip_rows=1):
+    """
+    Ελέγχει ότι όλα τα διαθέσιμα backends εξάγουν ακριβώς τις ίδιες γραμμές από ένα αρχείο.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+    - sheet_name: το φύλλο που θα διαβαστεί
+    - skip_rows: πλήθος γραμμών επικεφαλίδας που αγνοούνται
+
+    Returns:
+    - Λίστα από (backend, περιγραφή διαφοράς)· κενή λίστα αν όλα συμφωνούν
+    """
+    reference = read_source_rows(filepath, sheet_name, skip_rows, 'openpyxl')
+    mismatches = []
+    for backend in available_backends():
+        if backend == 'openpyxl':
+            continue
+        rows, error = read_source_rows(filepath, sheet_name, skip_rows, backend)
+        if (error is None) != (reference[1] is None):
+            mismatches.append((backend, f"σφάλμα: {error!r} αντί για {reference[1]!r}"))
+        elif rows != reference[0]:
+            if len(rows) != len(reference[0]):
+                mismatches.append((backend, f"{len(rows)} γραμμές αντί για {len(reference[0])}"))
+            else:
+                line_number, row = next((r for r, expected in zip(rows, reference[0]) if r != expected))
+                mismatches.append((backend, f"διαφορά στη γραμμή {line_number}: {row}"))
+    return mismatches
@@ -1,18 +1,11 @@
 import os
-import pandas as pd
 from tkinter import (
     Tk, Label, Entry, Button, Text, Scrollbar, StringVar,
     END, filedialog, messagebox, font, OptionMenu
 )
 from datetime import datetime
-
-
-def read_excel_sheets(filepath):
-    try:
-        xl = pd.ExcelFile(filepath, engine='openpyxl')
-        return xl.sheet_names
-    except Exception:
-        return []
+from excel_reader import read_excel_sheets
+from merge_engine import MergeConfig, run_merge
 
 
 def update_sheet_list(folder, master_filename, selected_sheet, sheet_menu):
@@ -29,61 +22,13 @@ def update_sheet_list(folder, master_filename, selected_sheet, sheet_menu):
 
 
 def merge_excel_rows(folder, master_filename, output_filename, sheet_name, log):
-    merged_data = []
-    failed_files = []
-    success_count = 0
-    output_path = os.path.join(folder, output_filename)
-
     def log_message(message):
         log.insert(END, message + "\n")
         log.see(END)
         log.update_idletasks()
 
-    try:
-        master_path = os.path.join(folder, master_filename)
-        master_df = pd.read_excel(master_path, sheet_name=sheet_name, engine='openpyxl', header=None)
-        header = master_df.iloc[0].tolist()
-        merged_data.append(header)
-    except Exception as e:
-        log_message(f"❌ Σφάλμα στο αρχείο master ή στο φύλλο '{sheet_name}': {e}")
-        return
-
-    for filename in os.listdir(folder):
-        if not filename.endswith('.xlsx') or filename in [master_filename, output_filename]:
-            continue
-        filepath = os.path.join(folder, filename)
-        try:
-            df = pd.read_excel(filepath, sheet_name=sheet_name, engine='openpyxl', header=None)
-            if len(df) >= 2:
-                added_rows = 0
-                for i in range(1, len(df)):
-                    row = df.iloc[i]
-                    if row.isnull().all() or all(str(cell).strip() == '' for cell in row):
-                        break
-                    merged_data.append(row.tolist())
-                    log_message(f"✅ {filename} ➔ Γραμμή {i+1}: {row.tolist()}")
-                    added_rows += 1
-                if added_rows > 0:
-                    success_count += 1
-                else:
-                    failed_files.append((filename, "Η 2η γραμμή είναι εντελώς κενή ή δεν βρέθηκαν δεδομένα"))
-            else:
-                failed_files.append((filename, "Μόνο 1 γραμμή – δεν υπάρχει 2η για συγχώνευση"))
-        except Exception as e:
-            failed_files.append((filename, str(e)))
-
-    try:
-        pd.DataFrame(merged_data).to_excel(output_path, index=False, header=False, engine='openpyxl')
-        log_message(f"📂 Το αρχείο συγχωνεύτηκε με επιτυχία: {output_filename}")
-    except Exception as e:
-        log_message(f"❌ Σφάλμα κατά την αποθήκευση του αρχείου: {e}")
-        return
-
-    log_message(f"\n📊 Συνολικά αρχεία: {len([f for f in os.listdir(folder) if f.endswith('.xlsx') and f not in [master_filename, output_filename]])}")
-    log_message(f"✅ Επιτυχώς συγχωνεύθηκαν: {success_count}")
-    log_message(f"⚠ Προβληματικά αρχεία: {len(failed_files)}")
-    for f, reason in failed_files:
-        log_message(f"  - {f}: {reason}")
+    config = MergeConfig(folder, master_filename, output_filename, sheet_name)
+    run_merge(config, log=log_message)
 
 
 def save_log_to_file(folder_path, log_widget):
@@ -0,0 +1,146 @@
+from collections import defaultdict, deque
+from dataclasses import dataclass, field
+from operator import itemgetter
+from openpyxl.utils import get_column_letter
+
+
+# Τα ονόματα στηλών συγκρίνονται χωρίς διαφορές σε κεφαλαία/πεζά και σε κενά
+
+def normalize_column_name(value):
+    """
+    Επιστρέφει το κανονικοποιημένο όνομα μιας στήλης ('' για κενό κελί).
+    """
+    if value is None:
+        return ''
+    return ' '.join(str(value).split()).casefold()
+
+
+def _trim_names(names):
+    names = list(names)
+    while names and names[-1] == '':
+        names.pop()
+    return names
+
+
+def _column_label(value, column):
+    # Το όνομα της στήλης για τα μηνύματα του log (το γράμμα της, αν δεν έχει όνομα)
+    label = '' if value is None else str(value).strip()
+    return label or f"{get_column_letter(column + 1)} (χωρίς όνομα)"
+
+
+@dataclass
+class ColumnMapping:
+    """
+    Η αντιστοίχιση των στηλών ενός προτύπου αρχείου στις στήλες του master.
+
+    Parameters:
+    - positions: για κάθε στήλη του master, η θέση της στο αρχείο (None αν λείπει)
+    - unknown_columns: στήλες του αρχείου που δεν υπάρχουν στο master (δεν συγχωνεύονται)
+    - missing_columns: στήλες του master που δεν υπάρχουν στο αρχείο (συμπληρώνονται με κενές τιμές)
+    - file_width: πλήθος στηλών της επικεφαλίδας του αρχείου
+    """
+    positions: tuple
+    unknown_columns: tuple = ()
+    missing_columns: tuple = ()
+    file_width: int = 0
+    _getter: object = field(default=None, init=False, repr=False)
+    _filler: int = field(default=None, init=False, repr=False)
+    _width: int = field(default=0, init=False, repr=False)
+
+    def __post_init__(self):
+        # Οι στήλες που λείπουν διαβάζονται από μια θέση αμέσως μετά τις στήλες του αρχείου,
+        # που στη γραμμή προς αντιστοίχιση είναι πάντα None
+        present = [position for position in self.positions if position is not None]
+        if None in self.positions:
+            self._filler = max(self.file_width, max(present, default=-1) + 1)
+            self._width = self._filler + 1
+        else:
+            self._width = max(present) + 1
+        indices = [self._filler if position is None else position for position in self.positions]
+        if len(indices) == 1:
+            index = indices[0]
+            self._getter = lambda row: (row[index],)
+        else:
+            self._getter = itemgetter(*indices)
+
+    @property
+    def identity(self):
+        """
+        True αν το αρχείο έχει ακριβώς τις στήλες του master με την ίδια σειρά (οι γραμμές μένουν ως έχουν).
+        """
+        return (not self.unknown_columns and not self.missing_columns
+                and self.positions == tuple(range(len(self.positions))))
+
+    def apply(self, rows):
+        """
+        Επιστρέφει τις γραμμές (line_number, row) με τις τιμές στη σειρά των στηλών του master.
+        """
+        if self.identity:
+            return rows
+        getter, width, filler = self._getter, self._width, self._filler
+        aligned = []
+        for line_number, row in rows:
+            if filler is None:
+                if len(row) < width:
+                    row = row + [None] * (width - len(row))
+            elif len(row) != width:
+                # Οι τιμές πέρα από την επικεφαλίδα του αρχείου δεν έχουν στήλη· κόβονται ώστε η θέση filler να είναι κενή
+                row = row[:filler] + [None] * (width - min(len(row), filler))
+            aligned.append((line_number, list(getter(row))))
+        return aligned
+
+
+class ColumnAligner:
+    """
+    Αντιστοιχίζει τις στήλες κάθε αρχείου στις στήλες του master με βάση το όνομα της επικεφαλίδας.
+    Κάθε διαφορετική επικεφαλίδα (υπογραφή) αντιστοιχίζεται μία φορά· τα αρχεία με το ίδιο πρότυπο
+    παίρνουν το ίδιο ColumnMapping, ώστε η ανά γραμμή δουλειά να είναι μόνο ένα itemgetter.
+
+    Parameters:
+    - master_header: η γραμμή του master με τα ονόματα των στηλών
+    """
+
+    def __init__(self, master_header):
+        self.master_names = _trim_names(normalize_column_name(value) for value in master_header)
+        self.master_labels = [_column_label(value, column) for column, value in
+                              zip(range(len(self.master_names)), master_header)]
+        self.mappings = {}
+
+    def mapping(self, file_header):
+        """
+        Επιστρέφει το ColumnMapping για τη γραμμή επικεφαλίδας ενός αρχείου.
+        """
+        names = _trim_names(normalize_column_name(value) for value in file_header)
+        signature = tuple(names)
+        if signature not in self.mappings:
+            self.mappings[signature] = self._build_mapping(names, file_header)
+        return self.mappings[signature]
+
+    def _build_mapping(self, names, file_header):
+        # Οι διπλές στήλες αντιστοιχίζονται με τη σειρά που εμφανίζονται (1η με 1η, 2η με 2η κ.ο.κ.)
+        available = defaultdict(deque)
+        for position, name in enumerate(names):
+            if name:
+                available[name].append(position)
+
+        positions, missing = [], []
+        used = set()
+        for column, name in enumerate(self.master_names):
+            if name:
+                position = available[name].popleft() if available[name] else None
+            else:
+                # Στήλη χωρίς όνομα στο master: ταιριάζει μόνο με στήλη χωρίς όνομα στην ίδια θέση
+                position = column if column < len(names) and names[column] == '' else None
+            positions.append(position)
+            if position is None:
+                missing.append(self.master_labels[column])
+            else:
+                used.add(position)
+
+        unknown = [_column_label(file_header[position], position)
+                   for position in range(len(names)) if position not in used]
+        return ColumnMapping(tuple(positions), tuple(unknown), tuple(missing), len(names))
+
+    @property
+    def signature_count(self):
+        return len(self.mappings)
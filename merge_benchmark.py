@@ -0,0 +1,323 @@
+import os
+import sys
+import json
+import random
+import shutil
+import argparse
+import platform
+import statistics
+import tempfile
+import time
+from datetime import datetime, timedelta
+from importlib import metadata
+from openpyxl import Workbook
+from openpyxl.cell import WriteOnlyCell
+from openpyxl.styles import Font
+from excel_reader import (AUTO_BACKEND, BACKENDS, available_backends, filter_rows, is_blank_row,
+                          iter_raw_rows, read_header_rows, resolve_backend)
+from merge_engine import OUTPUT_FORMATS, MergeConfig, list_source_files, resolve_output_format, run_merge
+from merge_writers import COLUMNAR_FORMATS, open_writer
+
+
+BENCHMARK_VERSION = 1
+SHEET_NAME = 'Δημοτικά'
+PHASES = ('scan', 'master', 'parse', 'filter', 'dataframe', 'write', 'stream_write')
+
+# Δείγματα ελληνικού κειμένου για τις συνθετικές γραμμές
+GREEK_WORDS = ('Σχολείο', 'Δημοτικό', 'Αθηνών', 'Θεσσαλονίκης', 'Πατρών', 'Ηρακλείου', 'τμήμα',
+               'μαθητές', 'εκπαιδευτικός', 'Διεύθυνση', 'Πρωτοβάθμιας', 'Εκπαίδευσης', 'ολοήμερο')
+
+
+# === Δημιουργία συνθετικού φακέλου υποβολών ===
+
+def synthetic_value(rng, column, row):
+    # Κάθε στήλη έχει σταθερό τύπο, ώστε τα δεδομένα να μοιάζουν με πραγματικές υποβολές
+    kind = column % 6
+    if kind == 0:
+        return ' '.join(rng.choice(GREEK_WORDS) for _ in range(3))
+    if kind == 1:
+        return rng.randint(1, 100000)
+    if kind == 2:
+        return round(rng.uniform(0, 1000), 2)
+    if kind == 3:
+        return datetime(2024, 9, 1) + timedelta(days=rng.randint(0, 365))
+    if kind == 4:
+        return rng.random() < 0.5
+    # Στήλη σχολίων: συνήθως κενή
+    return rng.choice(GREEK_WORDS) if rng.random() < 0.2 else None
+
+
+def generate_submission_folder(folder, files=20, rows=100, columns=10, corrupt=2, blank_rows=200,
+                               sheet_name=SHEET_NAME, seed=0):
+    """
+    Δημιουργεί φάκελο με master.xlsx και συνθετικά αρχεία υποβολών για μετρήσεις απόδοσης.
+
+    Parameters:
+    - folder: ο φάκελος που θα δημιουργηθεί (ή θα συμπληρωθεί)
+    - files: πλήθος αρχείων υποβολών
+    - rows: γραμμές δεδομένων ανά αρχείο
+    - columns: πλήθος στηλών (ελληνικό κείμενο, ακέραιοι, δεκαδικοί, ημερομηνίες, λογικές τιμές, σχόλια)
+    - corrupt: πόσα από τα αρχεία θα είναι κατεστραμμένα (δεν είναι έγκυρα zip)
+    - blank_rows: μορφοποιημένες κενές γραμμές στο τέλος κάθε αρχείου
+    - sheet_name: το όνομα του φύλλου
+    - seed: σπόρος της γεννήτριας τυχαίων αριθμών, για επαναλήψιμα δεδομένα
+
+    Returns:
+    - Λίστα με τα ονόματα των αρχείων υποβολών
+    """
+    os.makedirs(folder, exist_ok=True)
+    rng = random.Random(seed)
+    header = [f'Στήλη {column + 1}' for column in range(columns)]
+
+    def new_workbook():
+        workbook = Workbook(write_only=True)
+        sheet = workbook.create_sheet(sheet_name)
+        sheet.append(header)
+        return workbook, sheet
+
+    workbook, _ = new_workbook()
+    workbook.save(os.path.join(folder, 'master.xlsx'))
+
+    filenames = []
+    corrupt_indexes = set(rng.sample(range(files), min(corrupt, files)))
+    for index in range(files):
+        filename = f'submission_{index:04d}.xlsx'
+        filenames.append(filename)
+        path = os.path.join(folder, filename)
+        if index in corrupt_indexes:
+            with open(path, 'wb') as f:
+                f.write(b'PK\x03\x04' + bytes(rng.getrandbits(8) for _ in range(512)))
+            continue
+        workbook, sheet = new_workbook()
+        for row in range(rows):
+            sheet.append([synthetic_value(rng, column, row) for column in range(columns)])
+        # Κενά κελιά με μορφοποίηση, όπως αφήνει το Excel όταν κάποιος «βάφει» ολόκληρες στήλες
+        formatted = WriteOnlyCell(sheet, value=None)
+        formatted.font = Font(bold=True)
+        for _ in range(blank_rows):
+            sheet.append([formatted] * columns)
+        workbook.save(path)
+    return filenames
+
+
+# === Μέτρηση των φάσεων της συγχώνευσης ===
+
+def benchmark_phases(folder, sheet_name=SHEET_NAME, skip_rows=1, backend=AUTO_BACKEND, output_format='xlsx'):
+    """
+    Εκτελεί τα βήματα της συγχώνευσης ένα-ένα (σειριακά) και μετρά τον χρόνο κάθε φάσης.
+
+    Η φάση 'parse' μετρά μόνο την ανάγνωση των «ωμών» γραμμών από το backend (ως την πρώτη κενή γραμμή)
+    και η 'filter' την κανονικοποίηση και τον έλεγχο κενών γραμμών που ακολουθεί. Οι 'dataframe' και
+    'write' μετρούν την εγγραφή μέσω pandas (μόνο για xlsx/csv) και η 'stream_write' την εγγραφή
+    με streaming writer.
+
+    Returns:
+    - Λεξικό με τους χρόνους ανά φάση, τους χρόνους ανά αρχείο και τα πλήθη γραμμών/αρχείων
+    """
+    import pandas as pd
+
+    backend = resolve_backend(backend)
+    timings = {}
+    output_path = os.path.join(folder, f'benchmark_output.{output_format}')
+
+    start = time.perf_counter()
+    filenames = list_source_files(folder, ['master.xlsx', os.path.basename(output_path)])
+    timings['scan'] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    header = read_header_rows(os.path.join(folder, 'master.xlsx'), sheet_name, skip_rows)
+    timings['master'] = time.perf_counter() - start
+
+    merged_rows = []
+    file_seconds = {}
+    failed = 0
+    timings['parse'] = timings['filter'] = 0.0
+    for filename in filenames:
+        start = time.perf_counter()
+        raw_rows = []
+        try:
+            rows = iter_raw_rows(os.path.join(folder, filename), sheet_name, skip_rows, backend)
+            try:
+                for values in rows:
+                    raw_rows.append(values)
+                    if is_blank_row(values):
+                        break
+            finally:
+                rows.close()
+        except Exception:
+            failed += 1
+            raw_rows = []
+        parsed = time.perf_counter()
+        merged_rows.extend(values for _, values in filter_rows(raw_rows, skip_rows))
+        filtered = time.perf_counter()
+        timings['parse'] += parsed - start
+        timings['filter'] += filtered - parsed
+        file_seconds[filename] = filtered - start
+
+    # Τα δύο βήματα της write_output για xlsx/csv (χωρίς streaming), μετρημένα χωριστά
+    if output_format not in COLUMNAR_FORMATS:
+        start = time.perf_counter()
+        df = pd.DataFrame(header + merged_rows)
+        timings['dataframe'] = time.perf_counter() - start
+
+        start = time.perf_counter()
+        if output_format == 'csv':
+            df.to_csv(output_path, index=False, header=False, encoding='utf-8-sig')
+        else:
+            df.to_excel(output_path, index=False, header=False, engine='openpyxl')
+        timings['write'] = time.perf_counter() - start
+        os.remove(output_path)
+
+    start = time.perf_counter()
+    writer = open_writer(output_path, output_format)
+    writer.write_header(header)
+    writer.write_rows(merged_rows)
+    writer.close()
+    timings['stream_write'] = time.perf_counter() - start
+    os.remove(output_path)
+
+    return {
+        'backend': backend,
+        'phases': timings,
+        'files': file_seconds,
+        'file_count': len(filenames),
+        'failed_count': failed,
+        'row_count': len(merged_rows),
+    }
+
+
+def benchmark_merge(folder, sheet_name=SHEET_NAME, skip_rows=1, backend=AUTO_BACKEND, workers=1, output_format='xlsx'):
+    """
+    Εκτελεί ολόκληρη τη run_merge (χωρίς cache) και επιστρέφει τους χρόνους ανά φάση που καταγράφει.
+    """
+    output_filename = f'benchmark_output.{output_format}'
+    config = MergeConfig(folder, 'master.xlsx', output_filename, sheet_name, skip_rows=skip_rows,
+                         workers=workers, use_cache=False, output_format=output_format, log_rows=False,
+                         backend=backend)
+    result = run_merge(config)
+    if os.path.exists(config.output_path):
+        os.remove(config.output_path)
+    return dict(result.timings)
+
+
+def summarize(runs):
+    # Ελάχιστος και διάμεσος χρόνος ανά φάση από όλες τις επαναλήψεις
+    summary = {}
+    for phase in runs[0]:
+        values = [run[phase] for run in runs if phase in run]
+        summary[phase] = {'min': min(values), 'median': statistics.median(values)}
+    return summary
+
+
+def environment_info():
+    # Εκδόσεις και σύστημα, ώστε τα αποτελέσματα διαφορετικών εκδόσεων να είναι συγκρίσιμα
+    packages = {}
+    for name in ('openpyxl', 'pandas', 'python-calamine', 'lxml', 'xlsxwriter'):
+        try:
+            packages[name] = metadata.version(name)
+        except metadata.PackageNotFoundError:
+            packages[name] = None
+    return {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'packages': packages,
+        'backends': available_backends(),
+    }
+
+
+# === Γραμμή εντολών ===
+
+def build_parser():
+    """
+    Δημιουργεί τον argparse parser του benchmark.
+    """
+    parser = argparse.ArgumentParser(
+        description="Μέτρηση απόδοσης της συγχώνευσης σε συνθετικό φάκελο υποβολών· τα αποτελέσματα γράφονται σε JSON.")
+    parser.add_argument('--folder', help="υπάρχων φάκελος προς μέτρηση (αλλιώς δημιουργείται συνθετικός)")
+    parser.add_argument('--keep', action='store_true', help="να μη διαγραφεί ο συνθετικός φάκελος στο τέλος")
+    parser.add_argument('--files', type=int, default=50, help="πλήθος αρχείων υποβολών (προεπιλογή: 50)")
+    parser.add_argument('--rows', type=int, default=200, help="γραμμές δεδομένων ανά αρχείο (προεπιλογή: 200)")
+    parser.add_argument('--columns', type=int, default=12, help="πλήθος στηλών (προεπιλογή: 12)")
+    parser.add_argument('--corrupt', type=int, default=2, help="κατεστραμμένα αρχεία (προεπιλογή: 2)")
+    parser.add_argument('--blank-rows', type=int, default=200,
+                        help="μορφοποιημένες κενές γραμμές στο τέλος κάθε αρχείου (προεπιλογή: 200)")
+    parser.add_argument('--seed', type=int, default=0, help="σπόρος για επαναλήψιμα δεδομένα (προεπιλογή: 0)")
+    parser.add_argument('-s', '--sheet', default=SHEET_NAME, help=f"φύλλο προς συγχώνευση (προεπιλογή: {SHEET_NAME})")
+    parser.add_argument('--skip-rows', type=int, default=1, help="γραμμές επικεφαλίδας (προεπιλογή: 1)")
+    parser.add_argument('--repeat', type=int, default=3, help="επαναλήψεις κάθε μέτρησης (προεπιλογή: 3)")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="παράλληλες διεργασίες για τη μέτρηση της run_merge (προεπιλογή: πλήθος πυρήνων)")
+    parser.add_argument('--backend', choices=(AUTO_BACKEND,) + BACKENDS, default=AUTO_BACKEND,
+                        help="backend ανάγνωσης (προεπιλογή: auto)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='xlsx', dest='output_format',
+                        help="μορφή εξόδου (προεπιλογή: xlsx)")
+    parser.add_argument('--json', help="αρχείο αποτελεσμάτων (προεπιλογή: benchmark_<ημερομηνία>.json)")
+    return parser
+
+
+def main(argv=None):
+    """
+    Δημιουργεί (αν χρειάζεται) τον φάκελο, εκτελεί τις μετρήσεις και γράφει τα αποτελέσματα σε JSON.
+    """
+    args = build_parser().parse_args(argv)
+    output_format = resolve_output_format('', args.output_format)
+    json_path = args.json or f"benchmark_{datetime.now().strftime('%Y%m%d_%H%M%S')}.json"
+
+    folder = args.folder
+    generated = folder is None
+    if generated:
+        folder = tempfile.mkdtemp(prefix='merge_benchmark_')
+        print(f"🛠 Δημιουργία συνθετικού φακέλου: {folder}")
+        start = time.perf_counter()
+        generate_submission_folder(folder, args.files, args.rows, args.columns, args.corrupt,
+                                   args.blank_rows, args.sheet, args.seed)
+        print(f"   {args.files} αρχεία σε {time.perf_counter() - start:.1f} s")
+
+    try:
+        phase_runs, merge_runs = [], []
+        details = None
+        for repeat in range(max(1, args.repeat)):
+            details = benchmark_phases(folder, args.sheet, args.skip_rows, args.backend, output_format)
+            phase_runs.append(details['phases'])
+            merge_runs.append(benchmark_merge(folder, args.sheet, args.skip_rows, args.backend,
+                                              max(1, args.workers), output_format))
+            phases = ', '.join(f"{phase} {details['phases'][phase]:.3f}s" for phase in PHASES
+                               if phase in details['phases'])
+            print(f"⏱ Επανάληψη {repeat + 1}: {phases} | run_merge {merge_runs[-1]['total']:.3f}s")
+    finally:
+        if generated and not args.keep:
+            shutil.rmtree(folder, ignore_errors=True)
+
+    report = {
+        'version': BENCHMARK_VERSION,
+        'created': datetime.now().isoformat(timespec='seconds'),
+        'environment': environment_info(),
+        'params': {
+            'folder': None if generated else folder,
+            'files': details['file_count'],
+            'rows': args.rows if generated else None,
+            'columns': args.columns if generated else None,
+            'corrupt': args.corrupt if generated else None,
+            'blank_rows': args.blank_rows if generated else None,
+            'seed': args.seed if generated else None,
+            'sheet': args.sheet,
+            'skip_rows': args.skip_rows,
+            'backend': details['backend'],
+            'workers': max(1, args.workers),
+            'output_format': output_format,
+            'repeat': len(phase_runs),
+        },
+        'merged_rows': details['row_count'],
+        'failed_files': details['failed_count'],
+        'phases': {'runs': phase_runs, 'summary': summarize(phase_runs)},
+        'run_merge': {'runs': merge_runs, 'summary': summarize(merge_runs)},
+    }
+    with open(json_path, 'w', encoding='utf-8') as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+    print(f"📄 Τα αποτελέσματα αποθηκεύτηκαν στο {json_path}")
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
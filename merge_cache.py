@@ -0,0 +1,292 @@
+import os
+import hashlib
+from merge_codec import dumps, loads, valid_rows
+
+
+CACHE_FILENAME = ".merge_cache.json"
+CACHE_VERSION = 3
+
+# Οι γραμμές που αποθηκεύονται σε αυτή την εκτέλεση γράφονται αμέσως εδώ και μεταφέρονται στην cache στο save()
+ROWS_SUFFIX = ".rows"
+
+# Η cache των προηγούμενων εκδόσεων (pickle) δεν διαβάζεται ποτέ, γιατί βρίσκεται στον φάκελο των υποβολών
+# όπου μπορεί να γράψει οποιοσδήποτε· διαγράφεται στην πρώτη αποθήκευση της νέας
+LEGACY_CACHE_FILENAME = ".merge_cache.pkl"
+
+
+# Υπολογίζει το hash περιεχομένου ενός αρχείου (διαβάζεται σε κομμάτια για να μη φορτωθεί όλο στη μνήμη)
+
+def file_digest(filepath, chunk_size=1024 * 1024):
+    """
+    Επιστρέφει το BLAKE2b hash του περιεχομένου ενός αρχείου σε δεκαεξαδική μορφή.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου
+    - chunk_size: μέγεθος κάθε κομματιού ανάγνωσης σε bytes
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class MergeCache:
+    """
+    Μόνιμη cache (σε αρχείο μέσα στον φάκελο των αρχείων) με τις γραμμές που εξήχθησαν από κάθε αρχείο.
+
+    Κάθε εγγραφή αντιστοιχεί σε (όνομα αρχείου, φύλλο, skip_rows) και κρατά το mtime, το μέγεθος και
+    προαιρετικά το hash του αρχείου. Αν το αρχείο δεν έχει αλλάξει, οι γραμμές του δίνονται από την cache
+    χωρίς να ξαναδιαβαστεί. Αποθηκεύονται μόνο επιτυχημένες αναγνώσεις, ώστε ένα αρχείο που ήταν π.χ.
+    κλειδωμένο να ξαναδοκιμαστεί στην επόμενη εκτέλεση.
+
+    Το αρχείο έχει στην πρώτη γραμμή τον κατάλογο των εγγραφών (JSON) και μετά τις γραμμές κάθε εγγραφής, μία
+    γραμμή JSON ανά εγγραφή, ακολουθούμενη (αν αποθηκεύτηκαν) από τις γραμμές επικεφαλίδας του φύλλου σε μια
+    δεύτερη γραμμή JSON· ο κατάλογος κρατά τη θέση και το μήκος τους. Στη μνήμη κρατιέται μόνο ο κατάλογος:
+    οι γραμμές διαβάζονται από τον δίσκο όταν ζητηθούν (read_sheet) και όσες αποθηκεύονται γράφονται αμέσως σε
+    ένα βοηθητικό αρχείο, ώστε η cache να μη μεγαλώνει τη μνήμη μιας συγχώνευσης με streaming.
+
+    Parameters:
+    - folder: ο φάκελος των αρχείων Excel (εκεί αποθηκεύεται και η cache)
+    - use_hash: αν True, όταν αλλάξει το mtime/μέγεθος συγκρίνεται και το hash περιεχομένου πριν
+      θεωρηθεί το αρχείο τροποποιημένο
+    """
+
+    def __init__(self, folder, use_hash=False):
+        self.path = os.path.join(folder, CACHE_FILENAME)
+        self.rows_path = self.path + ROWS_SUFFIX
+        self.legacy_path = os.path.join(folder, LEGACY_CACHE_FILENAME)
+        self.use_hash = use_hash
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.evicted = 0
+        self._dirty = False
+        self._start = 0
+        # Τα ανοιχτά αρχεία από τα οποία διαβάζονται οι γραμμές: 'cache' (το αρχείο της cache), 'new' (όσες
+        # αποθηκεύτηκαν σε αυτή την εκτέλεση)
+        self._files = {}
+
+    def load(self):
+        """
+        Φορτώνει τον κατάλογο της cache από τον δίσκο. Αν το αρχείο λείπει, είναι κατεστραμμένο ή δεν έχει τη
+        μορφή της cache (σε οποιοδήποτε σημείο του καταλόγου), ξεκινά κενή.
+        """
+        self.close()
+        self.entries = {}
+        try:
+            with open(self.path, 'rb') as f:
+                data = loads(f.readline().decode('utf-8'))
+                self._start = f.tell()
+            if data.get('version') != CACHE_VERSION:
+                return self
+            entries = {}
+            for filename, sheet_name, skip_rows, mtime_ns, size, digest, offset, length in data['entries']:
+                if not (isinstance(filename, str) and isinstance(sheet_name, (str, type(None)))
+                        and type(skip_rows) is int and type(mtime_ns) is int and type(size) is int
+                        and isinstance(digest, (str, type(None))) and type(offset) is int
+                        and type(length) is int and offset >= 0 and length > 0):
+                    return self
+                entries[(filename, sheet_name, skip_rows)] = {
+                    'mtime_ns': mtime_ns,
+                    'size': size,
+                    'digest': digest,
+                    'file': 'cache',
+                    'offset': self._start + offset,
+                    'length': length,
+                }
+            self.entries = entries
+        except Exception:
+            self.entries = {}
+        return self
+
+    def _open(self, name):
+        f = self._files.get(name)
+        if f is None:
+            if name == 'new':
+                f = self._files[name] = open(self.rows_path, 'w+b')
+            else:
+                f = self._files[name] = open(self.path, 'rb')
+        return f
+
+    def close(self):
+        """
+        Κλείνει τα αρχεία από τα οποία διαβάζονται οι γραμμές και διαγράφει το βοηθητικό αρχείο.
+        """
+        for f in self._files.values():
+            f.close()
+        if 'new' in self._files:
+            try:
+                os.remove(self.rows_path)
+            except OSError:
+                pass
+        self._files = {}
+
+    def save(self):
+        """
+        Αποθηκεύει την cache στον δίσκο (μόνο αν άλλαξε). Η εγγραφή γίνεται σε προσωρινό αρχείο
+        και μετά αντικαθιστά το παλιό, ώστε μια διακοπή να μην αφήσει μισογραμμένη cache. Οι γραμμές
+        αντιγράφονται μία-μία εγγραφή, χωρίς να φορτωθούν όλες στη μνήμη.
+        """
+        if not self._dirty:
+            self.close()
+            return
+        entries, offset = [], 0
+        for (filename, sheet_name, skip_rows), entry in self.entries.items():
+            entries.append([filename, sheet_name, skip_rows, entry['mtime_ns'], entry['size'], entry['digest'],
+                            offset, entry['length']])
+            offset += entry['length']
+        tmp_path = self.path + ".tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(dumps({'version': CACHE_VERSION, 'entries': entries}).encode('utf-8') + b'\n')
+                for entry in self.entries.values():
+                    source = self._open(entry['file'])
+                    source.seek(entry['offset'])
+                    f.write(source.read(entry['length']))
+        finally:
+            self.close()
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+        if os.path.exists(self.legacy_path):
+            os.remove(self.legacy_path)
+
+    def _fresh(self, entry, filepath, stat):
+        # True αν το αρχείο δεν έχει αλλάξει από την αποθήκευση της εγγραφής
+        if stat is None:
+            try:
+                stat = os.stat(filepath)
+            except OSError:
+                return False
+        if entry['mtime_ns'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+            return True
+        # Το αρχείο «αγγίχτηκε» (π.χ. αντιγράφηκε ξανά) αλλά το περιεχόμενο ίσως είναι το ίδιο
+        if self.use_hash and entry['digest'] is not None and entry['size'] == stat.st_size:
+            if file_digest(filepath) == entry['digest']:
+                entry['mtime_ns'] = stat.st_mtime_ns
+                self._dirty = True
+                return True
+        return False
+
+    def contains(self, filepath, filename, sheet_name, skip_rows, stat=None):
+        """
+        True αν η cache έχει τις γραμμές ενός αρχείου που δεν έχει αλλάξει (οι γραμμές δεν διαβάζονται ακόμη,
+        βλ. read_sheet). Οι παράμετροι είναι ίδιες με της lookup.
+        """
+        entry = self.entries.get((filename, sheet_name, skip_rows))
+        if entry is not None and self._fresh(entry, filepath, stat):
+            self.hits += 1
+            return True
+        self.misses += 1
+        return False
+
+    def read_sheet(self, filename, sheet_name, skip_rows):
+        """
+        Διαβάζει από τον δίσκο τις γραμμές μιας εγγραφής και τις γραμμές επικεφαλίδας του φύλλου. Μια εγγραφή
+        που δεν διαβάζεται (π.χ. το αρχείο της cache άλλαξε στο μεταξύ) αφαιρείται και μετρά ως νέο αρχείο.
+
+        Returns:
+        - Tuple (λίστα από [αριθμός γραμμής, λίστα τιμών], γραμμές επικεφαλίδας ή None αν δεν αποθηκεύτηκαν)
+          ή None
+        """
+        key = (filename, sheet_name, skip_rows)
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        try:
+            f = self._open(entry['file'])
+            f.seek(entry['offset'])
+            lines = f.read(entry['length']).decode('utf-8').split('\n')
+            rows = loads(lines[0])
+            header = loads(lines[1]) if len(lines) > 2 else None
+            if valid_rows(rows) and (header is None or (isinstance(header, list)
+                                                        and all(isinstance(row, list) for row in header))):
+                return rows, header
+        except Exception:
+            pass
+        del self.entries[key]
+        self._dirty = True
+        self.hits -= 1
+        self.misses += 1
+        return None
+
+    def read_rows(self, filename, sheet_name, skip_rows):
+        """
+        Όπως η read_sheet, αλλά επιστρέφει μόνο τις γραμμές (ή None).
+        """
+        sheet = self.read_sheet(filename, sheet_name, skip_rows)
+        return sheet[0] if sheet is not None else None
+
+    def lookup(self, filepath, filename, sheet_name, skip_rows, stat=None):
+        """
+        Επιστρέφει τις αποθηκευμένες γραμμές ενός αρχείου αν δεν έχει αλλάξει, αλλιώς None.
+
+        Parameters:
+        - filepath: η πλήρης διαδρομή του αρχείου
+        - filename: το όνομα του αρχείου μέσα στον φάκελο (κλειδί της cache)
+        - sheet_name: το φύλλο που διαβάζεται
+        - skip_rows: πλήθος γραμμών επικεφαλίδας που αγνοούνται
+        - stat: το os.stat_result του αρχείου, αν είναι ήδη γνωστό (π.χ. από τη σάρωση του φακέλου)
+
+        Returns:
+        - Λίστα από (αριθμός γραμμής, λίστα τιμών) ή None αν δεν υπάρχει έγκυρη εγγραφή
+        """
+        if not self.contains(filepath, filename, sheet_name, skip_rows, stat):
+            return None
+        return self.read_rows(filename, sheet_name, skip_rows)
+
+    def store(self, filepath, filename, sheet_name, skip_rows, rows, stat=None, header=None):
+        """
+        Αποθηκεύει τις γραμμές που διαβάστηκαν από ένα αρχείο. Οι γραμμές γράφονται αμέσως στον δίσκο·
+        στη μνήμη μένει μόνο η θέση τους.
+
+        Parameters:
+        - filepath: η πλήρης διαδρομή του αρχείου
+        - filename: το όνομα του αρχείου μέσα στον φάκελο (κλειδί της cache)
+        - sheet_name: το φύλλο που διαβάστηκε
+        - skip_rows: πλήθος γραμμών επικεφαλίδας που αγνοήθηκαν
+        - rows: λίστα από (αριθμός γραμμής, λίστα τιμών)
+        - stat: το os.stat_result του αρχείου, αν είναι ήδη γνωστό (π.χ. από τη σάρωση του φακέλου)
+        - header: οι γραμμές επικεφαλίδας του φύλλου, αν διαβάστηκαν μαζί με τις γραμμές (None = δεν αποθηκεύονται)
+        """
+        try:
+            stat = stat if stat is not None else os.stat(filepath)
+            digest = file_digest(filepath) if self.use_hash else None
+            # Μια τιμή που δεν αποθηκεύεται σε JSON (σπάνιος τύπος κελιού) κρατά το αρχείο εκτός cache
+            data = dumps(rows).encode('utf-8') + b'\n'
+            if header is not None:
+                data += dumps(header).encode('utf-8') + b'\n'
+            f = self._open('new')
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            f.write(data)
+        except (OSError, TypeError):
+            return
+        self.entries[(filename, sheet_name, skip_rows)] = {
+            'mtime_ns': stat.st_mtime_ns,
+            'size': stat.st_size,
+            'digest': digest,
+            'file': 'new',
+            'offset': offset,
+            'length': len(data),
+        }
+        self._dirty = True
+
+    def prune(self, existing_filenames):
+        """
+        Αφαιρεί τις εγγραφές για αρχεία που δεν υπάρχουν πλέον στον φάκελο.
+
+        Parameters:
+        - existing_filenames: τα ονόματα των αρχείων που υπάρχουν τώρα στον φάκελο
+
+        Returns:
+        - Πλήθος εγγραφών που αφαιρέθηκαν
+        """
+        existing = set(existing_filenames)
+        stale = [key for key in self.entries if key[0] not in existing]
+        for key in stale:
+            del self.entries[key]
+        if stale:
+            self._dirty = True
+        self.evicted += len(stale)
+        return len(stale)
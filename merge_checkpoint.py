@@ -0,0 +1,306 @@
+import os
+import time
+import hashlib
+from dataclasses import asdict
+from merge_codec import dumps, loads, valid_rows
+
+
+CHECKPOINT_SUFFIX = '.checkpoint'
+CHECKPOINT_VERSION = 3
+CHECKPOINT_INTERVAL = 30.0
+
+
+# Το αρχείο checkpoint μιας συγχώνευσης: δίπλα στο αρχείο εξόδου, <αρχείο εξόδου>.checkpoint
+
+def checkpoint_path(config):
+    return config.output_path + CHECKPOINT_SUFFIX
+
+
+# Το αποτύπωμα όσων ρυθμίσεων αλλάζουν τις γραμμές ή τη σειρά τους: ένα checkpoint με άλλες ρυθμίσεις δεν ισχύει
+
+def merge_fingerprint(config, headers):
+    """
+    Επιστρέφει ένα hash από τις ρυθμίσεις της συγχώνευσης και τις γραμμές επικεφαλίδας του master.
+    """
+    key = repr((config.merge_sheets, config.skip_rows, config.include, config.exclude, config.recursive,
+                config.align_columns, config.dedup, config.dedup_columns, headers))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
+
+
+class MergeCheckpoint:
+    """
+    Ημερολόγιο (journal) της προόδου μιας συγχώνευσης, ώστε μια συγχώνευση που διακόπηκε (ακύρωση, σφάλμα,
+    τερματισμός της διεργασίας) να συνεχίσει από εκεί που σταμάτησε αντί να διαβάσει ξανά όλα τα αρχεία.
+
+    Για κάθε αρχείο που ολοκληρώνεται γράφεται στο τέλος του αρχείου checkpoint το αποτέλεσμά του (τα πεδία των
+    FileResult). Οι γραμμές του καταγράφονται με έναν από δύο τρόπους:
+    - Με partial_paths (csv με streaming, χωρίς αφαίρεση διπλών) οι γραμμές υπάρχουν ήδη στο προσωρινό αρχείο
+      εξόδου (.part), που μένει μετά τη διακοπή· καταγράφεται μόνο η θέση της εγγραφής μετά από κάθε αρχείο (βλ.
+      CsvStreamWriter.position). Στη συνέχεια ισχύουν τα ολοκληρωμένα αρχεία που βρίσκονται στην αρχή της σειράς
+      της σάρωσης και δεν άλλαξαν, ως το πρώτο προβληματικό· το προσωρινό αρχείο κόβεται μετά το τελευταίο από
+      αυτά (βλ. rewind) και η συγχώνευση συνεχίζει από το επόμενο.
+    - Αλλιώς γράφονται οι γραμμές που συγχωνεύτηκαν (όπως έφτασαν στο αρχείο εξόδου, πριν από την αφαίρεση
+      διπλών), που στη συνέχεια ξαναγράφονται από το checkpoint με την ίδια σειρά (βλ. replay).
+    Σε κάθε περίπτωση το αρχείο εξόδου βγαίνει ίδιο με μιας συγχώνευσης χωρίς διακοπή και τα αρχεία που είχαν
+    αποτύχει ξαναδοκιμάζονται.
+
+    Κάθε εγγραφή είναι μία γραμμή JSON (βλ. merge_codec), ώστε η ανάγνωση ενός checkpoint που άλλαξε κάποιος άλλος
+    να μην μπορεί να εκτελέσει κώδικα. Μια εγγραφή που έμεινε μισή από τη διακοπή (ή δεν έχει τη μορφή του
+    checkpoint) αγνοείται μαζί με όσες ακολουθούν.
+
+    Parameters:
+    - path: το αρχείο checkpoint
+    - fingerprint: το αποτύπωμα των ρυθμίσεων (βλ. merge_fingerprint)
+    - interval: κάθε πόσα δευτερόλεπτα το checkpoint γράφεται οριστικά στον δίσκο (fsync)
+    - partial_paths: τα προσωρινά αρχεία εξόδου των οποίων καταγράφεται η θέση (None = καταγράφονται οι γραμμές)
+    """
+
+    def __init__(self, path, fingerprint, interval=CHECKPOINT_INTERVAL, partial_paths=None):
+        self.path = path
+        self.fingerprint = fingerprint
+        self.interval = interval
+        self.partial_paths = partial_paths
+        self.entries = {}
+        self.failed = 0
+        # Η θέση του αρχείου εξόδου μετά την επικεφαλίδα και μετά το τελευταίο ολοκληρωμένο αρχείο (με partial_paths)
+        self.start_position = None
+        self.position = None
+        # Τα ολοκληρωμένα αρχεία με τη σειρά τους, ως (όνομα, τέλος της εγγραφής τους), και πόσα από αυτά
+        # βρέθηκαν ως τώρα στη σειρά της σάρωσης (βλ. completed)
+        self._order = []
+        self._matched = 0
+        self._start = 0
+        self._end = 0
+        self._file = None
+        self._reader = None
+        self._synced = time.monotonic()
+
+    def load(self):
+        """
+        Διαβάζει τα ολοκληρωμένα αρχεία ενός υπάρχοντος checkpoint με τις ίδιες ρυθμίσεις.
+        Οι γραμμές δεν φορτώνονται· κρατιέται μόνο η θέση τους μέσα στο αρχείο.
+        """
+        self.entries, self.failed, self._order, self._matched = {}, 0, [], 0
+        self._start = self._end = 0
+        try:
+            with open(self.path, 'rb') as f:
+                header = _read_record(f)
+                if (header is None or header[:3] != ['checkpoint', CHECKPOINT_VERSION, self.fingerprint]
+                        or (header[3] is None) != (self.partial_paths is None)):
+                    return self
+                self.start_position = self.position = header[3]
+                self._start = self._end = f.tell()
+                pending = []
+                while True:
+                    offset = f.tell()
+                    record = _read_record(f)
+                    if record is None:
+                        break
+                    if record[0] == 'rows':
+                        pending.append(offset)
+                    elif record[0] == 'file':
+                        _, name, size, mtime_ns, file_results, position = record
+                        self.entries[name] = (size, mtime_ns, pending, file_results, position)
+                        self._order.append((name, f.tell()))
+                        pending = []
+                        self._end = f.tell()
+                    else:
+                        break
+        except FileNotFoundError:
+            pass
+        except Exception:
+            # Η τελευταία εγγραφή έμεινε μισή· ισχύουν όσα αρχεία είχαν ολοκληρωθεί πριν από αυτήν
+            pass
+        failed = {name for name, (_, _, _, file_results, _) in self.entries.items()
+                  if any(fields.get('error') is not None for _, fields in file_results)}
+        self.failed = len(failed)
+        if self.partial_paths is None:
+            # Τα αρχεία που απέτυχαν δεν θεωρούνται ολοκληρωμένα
+            for name in failed:
+                del self.entries[name]
+            return self
+        # Με θέσεις ισχύουν τα αρχεία ως το πρώτο προβληματικό, όσο οι θέσεις τους υπάρχουν στο προσωρινό αρχείο
+        sizes = [_file_size(path) for path in self.partial_paths]
+        if self._start and not self._fits(self.start_position, sizes):
+            self.entries, self._order, self._start, self._end = {}, [], 0, 0
+            return self
+        kept = 0
+        while (kept < len(self._order) and self._order[kept][0] not in failed
+               and self._fits(self.entries[self._order[kept][0]][4], sizes)):
+            kept += 1
+        self._drop_from(kept)
+        return self
+
+    def start(self, resume=False, writer=None):
+        """
+        Ανοίγει το checkpoint για εγγραφή: στη συνέχεια μετά το τελευταίο ολοκληρωμένο αρχείο, αλλιώς από την αρχή.
+        Με partial_paths, ο writer του αρχείου εξόδου δίνει τη θέση μετά την επικεφαλίδα.
+        """
+        if resume and self._end:
+            self._file = open(self.path, 'r+b')
+            self._file.truncate(self._end)
+            self._file.seek(self._end)
+            self._reader = open(self.path, 'rb')
+        else:
+            self.entries, self.failed, self._order, self._matched = {}, 0, [], 0
+            self.start_position = self.position = writer.position() if self.partial_paths is not None else None
+            self._file = open(self.path, 'wb')
+            _write_record(self._file, ['checkpoint', CHECKPOINT_VERSION, self.fingerprint, self.start_position])
+            self._start = self._end = self._file.tell()
+        return self
+
+    def completed(self, source):
+        """
+        Επιστρέφει την εγγραφή ενός αρχείου που είχε ολοκληρωθεί, αν το αρχείο δεν άλλαξε από τότε, αλλιώς None.
+        Με partial_paths τα αρχεία ζητούνται με τη σειρά της σάρωσης και ισχύουν μόνο όσα ακολουθούν τη σειρά του
+        checkpoint· από το πρώτο που δεν την ακολουθεί (νέο, τροποποιημένο ή αφαιρεμένο) καμία εγγραφή δεν ισχύει.
+        """
+        entry = self.entries.get(source.name)
+        if entry is not None:
+            stat = source.stat or os.stat(source.path)
+            if (stat.st_size, stat.st_mtime_ns) != entry[:2]:
+                entry = None
+        if self.partial_paths is not None:
+            if (entry is None or self._matched >= len(self._order)
+                    or self._order[self._matched][0] != source.name):
+                self._drop_from(self._matched)
+                return None
+            self._matched += 1
+        return entry
+
+    def rewind(self):
+        """
+        Με partial_paths, πριν γραφτεί το πρώτο αρχείο που δεν ήταν ολοκληρωμένο: αφαιρεί από το checkpoint τα
+        ολοκληρωμένα αρχεία που δεν ξαναχρησιμοποιήθηκαν και επιστρέφει τη θέση του αρχείου εξόδου, στην οποία
+        πρέπει να επιστρέψει ο writer (βλ. CsvStreamWriter.rewind).
+        """
+        self._drop_from(self._matched)
+        if self._file.tell() != self._end:
+            self._file.truncate(self._end)
+            self._file.seek(self._end)
+        return self.position
+
+    def replay(self, entry):
+        """
+        Επιστρέφει (yield) τις γραμμές ενός ολοκληρωμένου αρχείου ως (θέση φύλλου, γραμμές), με τη σειρά που γράφτηκαν.
+        Με partial_paths οι γραμμές είναι ήδη στο αρχείο εξόδου και δεν επιστρέφεται καμία.
+        """
+        for offset in entry[2]:
+            self._reader.seek(offset)
+            _, index, rows = _read_record(self._reader)
+            yield index, rows
+
+    def write_rows(self, index, rows):
+        """
+        Καταγράφει γραμμές (λίστα από (αριθμός γραμμής, τιμές)) του φύλλου index του τρέχοντος αρχείου
+        (μόνο χωρίς partial_paths).
+        """
+        if rows and self.partial_paths is None:
+            _write_record(self._file, ['rows', index, rows])
+
+    def end_file(self, source, file_results, writer=None):
+        """
+        Ολοκληρώνει την εγγραφή ενός αρχείου με τα αποτελέσματά του (λίστα από (θέση φύλλου, FileResult)) και,
+        με partial_paths, με τη θέση του writer του αρχείου εξόδου. Στη συνέχεια (βλ. load) τα αποτελέσματα
+        επιστρέφονται ως (θέση φύλλου, dict με τα πεδία του FileResult).
+        """
+        stat = source.stat or os.stat(source.path)
+        # Κάθε αρχείο φτάνει στο λειτουργικό αμέσως (αντέχει τον τερματισμό της διεργασίας) και περιοδικά
+        # γράφεται και οριστικά στον δίσκο (αντέχει και διακοπή ρεύματος ή αποσύνδεση του δικτυακού φακέλου)·
+        # το αρχείο εξόδου γράφεται στον δίσκο πριν από τη θέση του
+        sync = time.monotonic() - self._synced >= self.interval
+        position = writer.position(sync) if self.partial_paths is not None else None
+        _write_record(self._file, ['file', source.name, stat.st_size, stat.st_mtime_ns,
+                                   [[index, asdict(file_result)] for index, file_result in file_results], position])
+        self._file.flush()
+        if sync:
+            os.fsync(self._file.fileno())
+            self._synced = time.monotonic()
+
+    def close(self):
+        """
+        Κλείνει το checkpoint και το κρατά για μια επόμενη συνέχεια.
+        """
+        for f in (self._file, self._reader):
+            if f is not None and not f.closed:
+                f.close()
+
+    def remove(self):
+        """
+        Κλείνει και διαγράφει το checkpoint (η συγχώνευση ολοκληρώθηκε).
+        """
+        self.close()
+        try:
+            os.remove(self.path)
+        except OSError:
+            pass
+
+    def _drop_from(self, count):
+        # Κρατά μόνο τα πρώτα count ολοκληρωμένα αρχεία (με partial_paths)
+        for name, _ in self._order[count:]:
+            del self.entries[name]
+        del self._order[count:]
+        self._end = self._order[-1][1] if self._order else self._start
+        self.position = self.entries[self._order[-1][0]][4] if self._order else self.start_position
+
+    def _fits(self, position, sizes):
+        # Αν η θέση (μία ανά προσωρινό αρχείο) υπάρχει στα προσωρινά αρχεία εξόδου
+        positions = position if len(self.partial_paths) > 1 else [position]
+        return (len(positions) == len(sizes)
+                and all(isinstance(item, list) and type(item[0]) is int and item[0] <= size
+                        for item, size in zip(positions, sizes)))
+
+
+def _file_size(path):
+    try:
+        return os.path.getsize(path)
+    except OSError:
+        return -1
+
+
+# Κάθε εγγραφή του checkpoint είναι μία γραμμή JSON
+
+def _write_record(f, record):
+    f.write(dumps(record).encode('utf-8') + b'\n')
+
+
+def _read_record(f):
+    """
+    Διαβάζει την επόμενη εγγραφή: ['checkpoint', έκδοση, αποτύπωμα, θέση], ['rows', θέση φύλλου, γραμμές] ή
+    ['file', όνομα, μέγεθος, mtime_ns, [[θέση φύλλου, πεδία FileResult], ...], θέση]. Η θέση του αρχείου εξόδου
+    είναι None ή [bytes, πλάτος, γραμμές] (μία ανά αρχείο εξόδου με πολλά αρχεία). Επιστρέφει None στο τέλος
+    του αρχείου, σε μισή εγγραφή ή σε εγγραφή που δεν έχει αυτή τη μορφή.
+    """
+    line = f.readline()
+    if not line.endswith(b'\n'):
+        return None
+    try:
+        record = loads(line.decode('utf-8'))
+    except (ValueError, TypeError):
+        return None
+    if not isinstance(record, list) or not record:
+        return None
+    kind = record[0]
+    if kind == 'checkpoint' and len(record) == 4 and _valid_position(record[3]):
+        return record
+    if kind == 'rows' and len(record) == 3 and type(record[1]) is int and valid_rows(record[2]):
+        return record
+    if (kind == 'file' and len(record) == 6 and isinstance(record[1], str) and type(record[2]) is int
+            and type(record[3]) is int and isinstance(record[4], list)
+            and all(isinstance(item, list) and len(item) == 2 and type(item[0]) is int
+                    and isinstance(item[1], dict) and all(isinstance(key, str) for key in item[1])
+                    for item in record[4])
+            and _valid_position(record[5])):
+        return record
+    return None
+
+
+def _valid_position(position):
+    if position is None:
+        return True
+    if not isinstance(position, list) or not position:
+        return False
+    if all(type(value) is int for value in position):
+        return len(position) == 3
+    return all(isinstance(item, list) and len(item) == 3 and all(type(value) is int for value in item)
+               for item in position)
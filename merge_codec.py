@@ -0,0 +1,65 @@
+import json
+from datetime import date, datetime, time, timedelta
+
+
+# Κωδικοποίηση των γραμμών σε JSON για τα αρχεία που ξαναδιαβάζει η εφαρμογή (cache, checkpoint).
+# Σε αντίθεση με το pickle, η ανάγνωση ενός τέτοιου αρχείου δεν μπορεί να εκτελέσει κώδικα, οπότε ένα αρχείο
+# που τοποθέτησε κάποιος άλλος στον φάκελο των υποβολών δίνει το πολύ λάθος δεδομένα (και απορρίπτεται).
+# Οι τιμές που δεν υπάρχουν στο JSON γράφονται ως {"$<τύπος>": τιμή}.
+
+def _encode_value(value):
+    if isinstance(value, datetime):
+        return {'$datetime': value.isoformat()}
+    if isinstance(value, date):
+        return {'$date': value.isoformat()}
+    if isinstance(value, time):
+        return {'$time': value.isoformat()}
+    if isinstance(value, timedelta):
+        return {'$timedelta': [value.days, value.seconds, value.microseconds]}
+    raise TypeError(f"Η τιμή {value!r} ({type(value).__name__}) δεν μπορεί να αποθηκευτεί")
+
+
+_DECODERS = {
+    '$datetime': datetime.fromisoformat,
+    '$date': date.fromisoformat,
+    '$time': time.fromisoformat,
+    '$timedelta': lambda parts: timedelta(*parts),
+}
+
+
+def _decode_object(obj):
+    if len(obj) == 1:
+        (key, value), = obj.items()
+        decoder = _DECODERS.get(key)
+        if decoder is not None:
+            return decoder(value)
+    return obj
+
+
+def dumps(data):
+    """
+    Επιστρέφει τα δεδομένα (λίστες, dict, str, αριθμοί, bool, None, ημερομηνίες/ώρες) ως κείμενο JSON.
+
+    Raises:
+    - TypeError για τιμή άλλου τύπου
+    """
+    return json.dumps(data, default=_encode_value, ensure_ascii=False, separators=(',', ':'))
+
+
+def loads(text):
+    """
+    Διαβάζει δεδομένα που γράφτηκαν με τη dumps (τα tuple επιστρέφονται ως λίστες).
+
+    Raises:
+    - ValueError (ή TypeError) αν το κείμενο δεν είναι έγκυρο
+    """
+    return json.loads(text, object_hook=_decode_object)
+
+
+def valid_rows(rows):
+    """
+    True αν τα rows έχουν τη μορφή των γραμμών ενός φύλλου: λίστα από [αριθμός γραμμής, λίστα τιμών].
+    """
+    return isinstance(rows, list) and all(
+        isinstance(row, list) and len(row) == 2 and type(row[0]) is int and isinstance(row[1], list)
+        for row in rows)
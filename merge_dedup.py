@@ -0,0 +1,194 @@
+import re
+import hashlib
+from itertools import compress
+from openpyxl.utils import column_index_from_string
+from merge_alignment import normalize_column_name
+
+
+# Πολιτικές για τις διπλές γραμμές: κρατιέται η πρώτη, η τελευταία ή αυτή από το πιο πρόσφατο αρχείο (mtime)
+KEEP_FIRST = 'first'
+KEEP_LAST = 'last'
+KEEP_NEWEST = 'newest'
+DEDUP_POLICIES = (KEEP_FIRST, KEEP_LAST, KEEP_NEWEST)
+
+# Μέγεθος (bytes) του hash του κλειδιού μιας γραμμής: 128 bits, ώστε μια σύγκρουση να είναι πρακτικά αδύνατη
+KEY_DIGEST_SIZE = 16
+
+# Η θέση μιας γραμμής στο ευρετήριο: (αρχείο << LINE_BITS) | αριθμός γραμμής, σε έναν μόνο ακέραιο
+LINE_BITS = 32
+LINE_MASK = (1 << LINE_BITS) - 1
+
+# Αντιστρέφει τις σημαίες 0/1 ενός bytearray (για το itertools.compress)
+_KEEP_FLAGS = bytes([1, 0]) + bytes(254)
+
+_COLUMN_LETTERS = re.compile(r'[A-Za-z]{1,3}')
+
+
+# Βρίσκει τις στήλες-κλειδιά με βάση το όνομά τους στην επικεφαλίδα του master (ή το γράμμα τους)
+
+def resolve_key_columns(header_row, columns):
+    """
+    Επιστρέφει τις θέσεις (0, 1, ...) των στηλών-κλειδιών.
+
+    Parameters:
+    - header_row: η γραμμή του master με τα ονόματα των στηλών
+    - columns: ονόματα στηλών (χωρίς διάκριση κεφαλαίων/πεζών και κενών) ή γράμματα στηλών (π.χ. 'C')
+
+    Returns:
+    - Tuple με τις θέσεις των στηλών
+
+    Raises:
+    - ValueError αν κάποια στήλη δεν υπάρχει στο master
+    """
+    names = [normalize_column_name(value) for value in header_row]
+    positions = []
+    for column in columns:
+        name = normalize_column_name(column)
+        if name in names:
+            positions.append(names.index(name))
+        elif _COLUMN_LETTERS.fullmatch(column.strip()):
+            positions.append(column_index_from_string(column.strip().upper()) - 1)
+        else:
+            raise ValueError(f"Η στήλη-κλειδί '{column}' δεν υπάρχει στην επικεφαλίδα του master")
+    return tuple(dict.fromkeys(positions))
+
+
+class RowDeduplicator:
+    """
+    Εντοπίζει τις διπλές γραμμές μιας συγχώνευσης με ένα ευρετήριο στη μνήμη.
+    Το ευρετήριο κρατά για κάθε διαφορετικό κλειδί μόνο το hash του (blake2b, KEY_DIGEST_SIZE bytes) και τη
+    θέση της γραμμής, όχι τις ίδιες τις τιμές, ώστε να μένει μικρό και σε εκατομμύρια γραμμές. Σε αντίθεση με
+    το hash() της Python, το hash δεν εξαρτάται από το PYTHONHASHSEED και δεν δίνει συγκρούσεις στην πράξη.
+
+    Με KEEP_FIRST οι διπλές γραμμές αφαιρούνται αμέσως (η συγχώνευση μένει streaming). Με KEEP_LAST και
+    KEEP_NEWEST μια γραμμή μπορεί να αντικατασταθεί από μια μεταγενέστερη, άρα όλες οι γραμμές κρατιούνται
+    ως το τέλος και οι διπλές αφαιρούνται με την survivors().
+
+    Parameters:
+    - key_positions: οι θέσεις των στηλών-κλειδιών (None = ολόκληρη η γραμμή)
+    - policy: KEEP_FIRST, KEEP_LAST ή KEEP_NEWEST
+    """
+
+    def __init__(self, key_positions=None, policy=KEEP_FIRST):
+        if policy not in DEDUP_POLICIES:
+            raise ValueError(f"Άγνωστη πολιτική διπλών γραμμών '{policy}' (επιλογές: {', '.join(DEDUP_POLICIES)})")
+        self.key_positions = tuple(key_positions) if key_positions else None
+        self.policy = policy
+        self.index = {}
+        self.files = []
+        self.dropped = []
+        self.examples = {}
+        self._priorities = []
+        self._starts = []
+        self._first_lines = []
+        self._removed = bytearray()
+        self._file = -1
+
+    @property
+    def buffered(self):
+        """
+        True αν οι γραμμές πρέπει να κρατηθούν ως το τέλος (KEEP_LAST, KEEP_NEWEST).
+        """
+        return self.policy != KEEP_FIRST
+
+    @property
+    def duplicate_count(self):
+        return sum(self.dropped)
+
+    def _key(self, values):
+        # Το hash του κλειδιού μιας γραμμής, ή None αν το κλειδί είναι κενό (τέτοιες γραμμές δεν θεωρούνται διπλές)
+        if self.key_positions is None:
+            end = len(values)
+            while end and values[end - 1] is None:
+                end -= 1
+            key = values[:end]
+        else:
+            key = [values[position] if position < len(values) else None for position in self.key_positions]
+        if not any(value is not None for value in key):
+            return None
+        return hashlib.blake2b(repr(key).encode('utf-8'), digest_size=KEY_DIGEST_SIZE).digest()
+
+    def start_file(self, label, priority=0):
+        """
+        Δηλώνει ότι οι επόμενες γραμμές ανήκουν σε νέο αρχείο.
+
+        Parameters:
+        - label: το όνομα του αρχείου για τα μηνύματα
+        - priority: με KEEP_NEWEST κερδίζει η γραμμή του αρχείου με τη μεγαλύτερη τιμή (π.χ. mtime)
+        """
+        self._file = len(self.files)
+        self.files.append(label)
+        self.dropped.append(0)
+        self._priorities.append(priority)
+        self._starts.append(len(self._removed))
+        self._first_lines.append(None)
+
+    def _drop(self, file, line, location):
+        self.dropped[file] += 1
+        if file not in self.examples:
+            self.examples[file] = (line, location >> LINE_BITS, location & LINE_MASK)
+
+    def _position(self, location):
+        # Η θέση μιας γραμμής στις κρατημένες γραμμές (οι γραμμές κάθε αρχείου είναι διαδοχικές)
+        file = location >> LINE_BITS
+        return self._starts[file] + (location & LINE_MASK) - self._first_lines[file]
+
+    def filter(self, rows):
+        """
+        Περνά τις γραμμές του τρέχοντος αρχείου από το ευρετήριο.
+
+        Parameters:
+        - rows: λίστα από (αριθμός γραμμής, λίστα τιμών)
+
+        Returns:
+        - Οι γραμμές που συγχωνεύονται: με KEEP_FIRST χωρίς τις διπλές, αλλιώς όλες (βλ. survivors)
+        """
+        if not rows:
+            return rows
+        file, index, key_of = self._file, self.index, self._key
+        if self._first_lines[file] is None:
+            self._first_lines[file] = rows[0][0]
+
+        if not self.buffered:
+            kept = []
+            for line, values in rows:
+                key = key_of(values)
+                location = index.get(key) if key is not None else None
+                if location is None:
+                    if key is not None:
+                        index[key] = (file << LINE_BITS) | line
+                    kept.append((line, values))
+                else:
+                    self._drop(file, line, location)
+            return kept
+
+        newest = self.policy == KEEP_NEWEST
+        for line, values in rows:
+            position = len(self._removed)
+            self._removed.append(0)
+            key = key_of(values)
+            if key is None:
+                continue
+            current = (file << LINE_BITS) | line
+            location = index.get(key)
+            if location is None:
+                index[key] = current
+            elif newest and self._priorities[file] < self._priorities[location >> LINE_BITS]:
+                # Η γραμμή που υπάρχει ήδη είναι από πιο πρόσφατο αρχείο
+                self._removed[position] = 1
+                self._drop(file, line, location)
+            else:
+                self._removed[self._position(location)] = 1
+                self._drop(location >> LINE_BITS, location & LINE_MASK, current)
+                index[key] = current
+        return rows
+
+    def survivors(self, rows):
+        """
+        Επιστρέφει τις κρατημένες γραμμές χωρίς όσες αντικαταστάθηκαν (μόνο για KEEP_LAST / KEEP_NEWEST).
+
+        Parameters:
+        - rows: όλες οι γραμμές που πέρασαν από τη filter(), με την ίδια σειρά (list ή ColumnarRows· το
+          αποτέλεσμα έχει τον ίδιο τύπο)
+        """
+        return type(rows)(compress(rows, self._removed.translate(_KEEP_FLAGS)))
@@ -0,0 +1,1526 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from fnmatch import fnmatch
+from itertools import islice
+from excel_reader import (AUTO_BACKEND, NO_DATA_ERROR, get_workbook_metadata, iter_source_chunks, open_source,
+                          read_header_rows, read_source_sheets, resolve_backend)
+from merge_alignment import ColumnAligner
+from merge_cache import MergeCache
+from merge_checkpoint import MergeCheckpoint, checkpoint_path, merge_fingerprint
+from merge_dedup import RowDeduplicator, resolve_key_columns
+from merge_manifest import OutputManifest, merge_signature
+from merge_prefetch import DEFAULT_PREFETCH_BYTES, DEFAULT_PREFETCH_FILES, FilePrefetcher
+from merge_profiling import Measurement, PhaseStats, format_stats, memory_tracing, profiled
+from merge_rowstore import ColumnarRows
+from merge_writers import (COLUMNAR_FORMATS, DEFAULT_CHUNK_ROWS, PARTIAL_SUFFIX, CsvAppendWriter, open_writer,
+                           sheet_output_path)
+
+
+DEFAULT_INCLUDE = ('*.xlsx', '*.xlsm')
+
+# Το Excel δημιουργεί δίπλα σε κάθε ανοιχτό αρχείο ένα αρχείο κλειδώματος ~$<όνομα> που δεν είναι βιβλίο εργασίας
+LOCK_FILE_PREFIX = '~$'
+OUTPUT_FORMATS = ('xlsx', 'csv', 'parquet', 'feather')
+
+# Καταλήξεις αρχείων εξόδου και η μορφή που αντιστοιχεί σε καθεμία
+OUTPUT_EXTENSIONS = {
+    'xlsx': 'xlsx',
+    'csv': 'csv',
+    'parquet': 'parquet',
+    'pq': 'parquet',
+    'feather': 'feather',
+    'arrow': 'feather',
+}
+
+# Εκτιμήσεις για το όριο μνήμης (μετρημένες με tracemalloc σε αρχεία με κείμενα, αριθμούς και ημερομηνίες):
+# οι γραμμές ενός αρχείου xlsx πιάνουν στη μνήμη περίπου 11 φορές το μέγεθός του στον δίσκο, δηλαδή
+# περίπου 80 bytes ανά κελί και λίγα ακόμη για τη λίστα κάθε γραμμής
+XLSX_MEMORY_FACTOR = 12
+CELL_BYTES = 80
+ROW_BYTES = 64
+MIN_CHUNK_ROWS = 500
+
+# Καταστάσεις αρχείου στο αποτέλεσμα της συγχώνευσης
+STATUS_MERGED = 'merged'
+STATUS_CACHED = 'cached'
+STATUS_REUSED = 'reused'
+STATUS_FAILED = 'failed'
+
+# Με σειριακή ανάγνωση η σάρωση του φακέλου δεν ολοκληρώνεται πριν από την ανάγνωση: πριν από κάθε αρχείο
+# προχωρά κατά τόσα αρχεία, ώστε η ανάλυση να ξεκινά αμέσως και το πλήθος των αρχείων (για την πρόοδο) να
+# είναι γνωστό πολύ πριν τελειώσει η ανάγνωση
+SCAN_AHEAD_FILES = 64
+
+# Πόσες από τις τιμές ενός αρχείου που γράφτηκαν κενές στο parquet/feather, επειδή δεν ταίριαζαν με τον τύπο
+# της στήλης τους, κρατιούνται ως παραδείγματα στο FileResult
+CONFLICT_EXAMPLES = 10
+
+# Ονόματα των φάσεων για το log, με τη σειρά που εμφανίζονται στη σύνοψη
+PHASE_LABELS = {
+    'master': 'επικεφαλίδα master',
+    'scan': 'σάρωση φακέλου και cache',
+    'read': 'ανάγνωση αρχείων',
+    'write': 'εγγραφή αρχείου εξόδου',
+    'log': 'καταγραφή μηνυμάτων (log)',
+    'total': 'σύνολο',
+}
+
+
+@dataclass
+class MergeConfig:
+    """
+    Οι ρυθμίσεις μιας συγχώνευσης.
+
+    Parameters:
+    - folder: φάκελος όπου βρίσκονται τα αρχεία Excel
+    - master_filename: το όνομα του αρχείου που περιέχει την επικεφαλίδα
+    - output_filename: το όνομα του αρχείου εξόδου
+    - sheet_name: το φύλλο που θα διαβαστεί από κάθε αρχείο
+    - sheet_names: για συγχώνευση πολλών φύλλων, όλα τα φύλλα (κάθε αρχείο ανοίγει μία φορά για όλα)·
+      αν είναι κενό συγχωνεύεται μόνο το sheet_name
+    - skip_rows: πλήθος γραμμών επικεφαλίδας (από το master) που αγνοούνται στα υπόλοιπα αρχεία
+    - workers: πλήθος παράλληλων διεργασιών για την ανάγνωση των αρχείων (1 = σειριακά)
+    - use_cache: αν True, τα αρχεία που δεν άλλαξαν από την προηγούμενη εκτέλεση δίνονται από την cache
+    - cache_hash: αν True, η cache συγκρίνει και το hash περιεχομένου όταν αλλάξει το mtime ενός αρχείου
+    - include: μοτίβα glob για τα αρχεία που συγχωνεύονται (π.χ. '*.xlsx')
+    - exclude: μοτίβα glob για αρχεία (ή υποφακέλους) που αγνοούνται
+    - recursive: αν True, συγχωνεύονται και τα αρχεία των υποφακέλων
+    - output_format: 'xlsx', 'csv', 'parquet' ή 'feather' (None = από την κατάληξη του αρχείου εξόδου)
+    - compression: συμπίεση για parquet/feather (π.χ. 'snappy', 'zstd', 'lz4', 'none'· None = προεπιλογή)
+    - write_output: αν False, δεν γράφεται αρχείο εξόδου (οι γραμμές υπάρχουν μόνο στο MergeResult)
+    - streaming: αν True, οι γραμμές γράφονται στο αρχείο εξόδου καθώς διαβάζονται και δεν κρατιούνται
+      στο MergeResult, ώστε η μνήμη να μη μεγαλώνει με το πλήθος των γραμμών
+    - log_rows: αν False, δεν καταγράφεται κάθε συγχωνευμένη γραμμή (μόνο σφάλματα και στατιστικά)
+    - backend: τρόπος ανάγνωσης των αρχείων ('auto', 'calamine', 'xml' ή 'openpyxl')
+    - trace_memory: αν True, μετράται και η μέγιστη μνήμη ανά φάση και ανά αρχείο (με tracemalloc, πιο αργά)
+    - profile_path: αν δοθεί, η συγχώνευση εκτελείται με cProfile και τα αποτελέσματα γράφονται εκεί (pstats)
+    - slowest_files: πόσα από τα πιο αργά αρχεία εμφανίζονται στη σύνοψη του log
+    - align_columns: αν True, οι στήλες κάθε αρχείου αντιστοιχίζονται στις στήλες του master με βάση το όνομα
+      της επικεφαλίδας (τελευταία από τις skip_rows γραμμές) αντί για τη θέση τους
+    - memory_budget: όριο μνήμης (MB) για τις γραμμές που κρατιούνται ταυτόχρονα (None = χωρίς όριο)· ισχύει
+      με streaming και ορίζει το μέγεθος των κομματιών και πόσα αρχεία διαβάζονται ταυτόχρονα (βλ. plan_memory_budget)
+    - dedup: πολιτική για τις διπλές γραμμές ('first', 'last' ή 'newest'· None = δεν αφαιρούνται)· με 'last' και
+      'newest' οι γραμμές κρατιούνται στη μνήμη ως το τέλος, όπως χωρίς streaming
+    - dedup_columns: οι στήλες-κλειδιά (ονόματα της επικεφαλίδας του master ή γράμματα)· κενό = ολόκληρη η γραμμή
+    - append: αν True, ένα υπάρχον αρχείο εξόδου csv ενημερώνεται αντί να ξαναφτιαχτεί: με βάση το manifest του
+      (βλ. merge_manifest) οι γραμμές των αρχείων που δεν άλλαξαν μένουν ως έχουν και διαβάζονται μόνο τα νέα
+      και τα τροποποιημένα αρχεία (μόνο για csv ενός φύλλου, με streaming και χωρίς dedup)
+    - checkpoint: αν True, η πρόοδος της συγχώνευσης καταγράφεται (<αρχείο εξόδου>.checkpoint, βλ. MergeCheckpoint)
+      ώστε μια συγχώνευση που διακόπηκε να μπορεί να συνεχίσει· το checkpoint διαγράφεται όταν ολοκληρωθεί
+    - resume: αν True, η συγχώνευση συνεχίζει από το checkpoint μιας προηγούμενης που διακόπηκε: τα αρχεία που
+      είχαν ολοκληρωθεί (και δεν άλλαξαν) δεν ξαναδιαβάζονται· η πρόοδος καταγράφεται και χωρίς checkpoint=True
+    - prefetch: με σειριακή ανάγνωση (workers = 1), πόσα από τα επόμενα αρχεία διαβάζονται στη μνήμη (σε νήματα)
+      όσο αναλύεται το τρέχον (0 = κανένα)· βλ. FilePrefetcher
+    """
+    folder: str
+    master_filename: str = 'master.xlsx'
+    output_filename: str = 'merged_output.xlsx'
+    sheet_name: str = None
+    sheet_names: tuple = ()
+    skip_rows: int = 1
+    workers: int = 1
+    use_cache: bool = True
+    cache_hash: bool = False
+    include: tuple = DEFAULT_INCLUDE
+    exclude: tuple = ()
+    recursive: bool = False
+    output_format: str = None
+    compression: str = None
+    write_output: bool = True
+    streaming: bool = True
+    log_rows: bool = True
+    backend: str = AUTO_BACKEND
+    trace_memory: bool = False
+    profile_path: str = None
+    slowest_files: int = 5
+    align_columns: bool = False
+    memory_budget: int = None
+    dedup: str = None
+    dedup_columns: tuple = ()
+    append: bool = False
+    checkpoint: bool = False
+    resume: bool = False
+    prefetch: int = DEFAULT_PREFETCH_FILES
+
+    @property
+    def output_path(self):
+        return os.path.join(self.folder, self.output_filename)
+
+    @property
+    def master_path(self):
+        return os.path.join(self.folder, self.master_filename)
+
+    @property
+    def merge_sheets(self):
+        return tuple(self.sheet_names) or (self.sheet_name,)
+
+
+@dataclass
+class FileResult:
+    """
+    Το αποτέλεσμα για ένα αρχείο πηγής.
+
+    Parameters:
+    - filename: το όνομα του αρχείου
+    - status: STATUS_MERGED, STATUS_CACHED, STATUS_REUSED (οι γραμμές του έμειναν στο υπάρχον αρχείο εξόδου)
+      ή STATUS_FAILED
+    - row_count: πλήθος γραμμών που συγχωνεύτηκαν
+    - error: το μήνυμα σφάλματος (μόνο για STATUS_FAILED)
+    - seconds: χρόνος ανάγνωσης του αρχείου σε δευτερόλεπτα
+    - backend: το backend που διάβασε το αρχείο (None αν δόθηκε από την cache ή το υπάρχον αρχείο εξόδου)
+    - cpu_seconds: χρόνος CPU της ανάγνωσης
+    - peak_memory: μέγιστη μνήμη της ανάγνωσης σε bytes (None αν δεν μετρήθηκε)
+    - unknown_columns: στήλες του αρχείου που δεν υπάρχουν στο master (μόνο με align_columns)
+    - missing_columns: στήλες του master που λείπουν από το αρχείο και έμειναν κενές (μόνο με align_columns)
+    - sheet: το φύλλο του αρχείου (μόνο στη συγχώνευση πολλών φύλλων, αλλιώς None)
+    - duplicate_rows: γραμμές του αρχείου που αφαιρέθηκαν ως διπλές (μόνο με dedup· δεν μετρούν στο row_count)
+    - conflict_count: τιμές που δεν ταιριάζουν με τον τύπο της στήλης τους στο parquet/feather και γράφτηκαν κενές
+    - conflicts: οι πρώτες CONFLICT_EXAMPLES από αυτές, ως "γραμμή N, στήλη 'όνομα': τιμή"
+    """
+    filename: str
+    status: str
+    row_count: int = 0
+    error: str = None
+    seconds: float = 0.0
+    backend: str = None
+    cpu_seconds: float = 0.0
+    peak_memory: int = None
+    unknown_columns: tuple = ()
+    missing_columns: tuple = ()
+    sheet: str = None
+    duplicate_rows: int = 0
+    conflict_count: int = 0
+    conflicts: tuple = ()
+
+    @property
+    def label(self):
+        return self.filename if self.sheet is None else f"{self.filename} [{self.sheet}]"
+
+
+@dataclass
+class MergeResult:
+    """
+    Το δομημένο αποτέλεσμα μιας συγχώνευσης: επικεφαλίδα, γραμμές, κατάσταση ανά αρχείο και χρόνοι.
+
+    Parameters:
+    - header: οι γραμμές επικεφαλίδας από το master αρχείο
+    - rows: οι συγχωνευμένες γραμμές δεδομένων (χωρίς την επικεφαλίδα), ως ColumnarRows (συμπεριφέρεται σαν
+      λίστα γραμμών)· κενό αν γράφτηκαν με streaming
+    - files: λίστα FileResult, με τη σειρά που διαβάστηκαν τα αρχεία
+    - timings: χρόνος (δευτερόλεπτα) ανά φάση της συγχώνευσης
+    - phase_stats: PhaseStats (χρόνος, CPU, μέγιστη μνήμη) ανά φάση· οι φάσεις 'log' και (με streaming) 'write'
+      περιέχονται στις υπόλοιπες
+    - cancelled: True αν η συγχώνευση ακυρώθηκε
+    - error: μήνυμα μοιραίου σφάλματος (master ή αρχείο εξόδου), αλλιώς None
+    - sheets: στη συγχώνευση πολλών φύλλων, ένα MergeResult (επικεφαλίδα, γραμμές, αρχεία) ανά φύλλο·
+      τότε τα header/rows μένουν κενά και τα files περιέχουν τα αρχεία όλων των φύλλων
+    """
+    header: list = field(default_factory=list)
+    rows: list = field(default_factory=list)
+    files: list = field(default_factory=list)
+    timings: dict = field(default_factory=dict)
+    phase_stats: dict = field(default_factory=dict)
+    cancelled: bool = False
+    error: str = None
+    sheets: dict = field(default_factory=dict)
+
+    @property
+    def total(self):
+        return len(self.files)
+
+    @property
+    def success_count(self):
+        return sum(1 for f in self.files if f.status != STATUS_FAILED)
+
+    @property
+    def row_count(self):
+        return sum(f.row_count for f in self.files)
+
+    @property
+    def duplicate_count(self):
+        return sum(f.duplicate_rows for f in self.files)
+
+    @property
+    def failed_files(self):
+        return [(f.label, f.error) for f in self.files if f.status == STATUS_FAILED]
+
+    def to_dataframe(self):
+        """
+        Επιστρέφει τις συγχωνευμένες γραμμές (με την επικεφαλίδα) ως pandas DataFrame.
+        """
+        if isinstance(self.rows, ColumnarRows):
+            return self.rows.to_dataframe(self.header)
+
+        import pandas as pd
+
+        return pd.DataFrame(self.header + self.rows)
+
+
+@dataclass
+class SourceFile:
+    """
+    Ένα αρχείο πηγής όπως βρέθηκε στη σάρωση του φακέλου.
+
+    Parameters:
+    - name: η διαδρομή μέσα στον φάκελο με '/' (π.χ. 'Α_Αθήνας/σχολείο.xlsx')· είναι και το κλειδί της cache
+    - path: η πλήρης διαδρομή του αρχείου
+    - stat: το os.stat_result της σάρωσης (mtime, μέγεθος), ώστε η cache να μην ξανακάνει stat
+    """
+    name: str
+    path: str
+    stat: os.stat_result = None
+
+
+def _matches(entry_name, relative_name, patterns):
+    # Ένα μοτίβο ταιριάζει είτε στο όνομα του αρχείου είτε σε όλη τη διαδρομή του (π.χ. 'παλιά/*')
+    return any(fnmatch(entry_name, pattern) or fnmatch(relative_name, pattern) for pattern in patterns)
+
+
+# Το FileResult ενός αρχείου όπως το κατέγραψε το checkpoint (τα πεδία του, με τις λίστες ξανά ως tuple)
+
+def checkpoint_file_result(fields):
+    """
+    Επιστρέφει ένα FileResult από τα πεδία του (dict). Raises TypeError για άγνωστο ή ελλιπές πεδίο.
+    """
+    fields = dict(fields)
+    for name in ('unknown_columns', 'missing_columns', 'conflicts'):
+        if isinstance(fields.get(name), list):
+            fields[name] = tuple(fields[name])
+    return FileResult(**fields)
+
+
+# Σαρώνει τον φάκελο με os.scandir και επιστρέφει (yield) τα αρχεία πηγής μόλις βρεθούν, ώστε η ανάγνωση
+# να μπορεί να ξεκινήσει πριν ολοκληρωθεί η σάρωση ενός μεγάλου δέντρου φακέλων
+
+def iter_source_files(folder, skip_filenames=(), include=DEFAULT_INCLUDE, exclude=(), recursive=False):
+    """
+    Επιστρέφει (yield) τα αρχεία του φακέλου που θα συγχωνευτούν, ταξινομημένα κατά όνομα μέσα σε κάθε φάκελο.
+    Τα αρχεία κλειδώματος του Excel (~$...) αγνοούνται πάντα.
+
+    Parameters:
+    - folder: ο φάκελος των αρχείων Excel
+    - skip_filenames: αρχεία που δεν συγχωνεύονται ποτέ (master, αρχείο εξόδου), σχετικά με τον φάκελο
+    - include: μοτίβα glob που πρέπει να ταιριάζει το όνομα (ή η διαδρομή) του αρχείου
+    - exclude: μοτίβα glob που αποκλείουν ένα αρχείο ή έναν υποφάκελο
+    - recursive: αν True, σαρώνονται και οι υποφάκελοι (οι συμβολικοί σύνδεσμοι σε φακέλους δεν ακολουθούνται)
+
+    Yields:
+    - SourceFile
+    """
+    skip = {name.replace(os.sep, '/') for name in skip_filenames}
+    pending = [('', folder)]
+    while pending:
+        prefix, path = pending.pop()
+        try:
+            with os.scandir(path) as scan:
+                entries = sorted(scan, key=lambda entry: entry.name)
+        except OSError:
+            if not prefix:
+                raise
+            continue  # Υποφάκελος χωρίς δικαίωμα ανάγνωσης
+        subfolders = []
+        for entry in entries:
+            name = prefix + entry.name
+            if entry.name.startswith(LOCK_FILE_PREFIX):
+                continue
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    if recursive and not _matches(entry.name, name, exclude):
+                        subfolders.append((name + '/', entry.path))
+                    continue
+                if not entry.is_file():
+                    continue
+                if (name in skip or not _matches(entry.name, name, include)
+                        or _matches(entry.name, name, exclude)):
+                    continue
+                yield SourceFile(name, entry.path, entry.stat())
+            except OSError:
+                continue  # Το αρχείο διαγράφηκε ή δεν είναι προσβάσιμο κατά τη σάρωση
+        # Οι υποφάκελοι σαρώνονται μετά τα αρχεία του φακέλου, με αλφαβητική σειρά
+        pending.extend(reversed(subfolders))
+
+
+# Επιστρέφει τα ονόματα των αρχείων του φακέλου που ταιριάζουν στα μοτίβα include και όχι στα exclude
+
+def list_source_files(folder, skip_filenames, include=DEFAULT_INCLUDE, exclude=(), recursive=False):
+    """
+    Επιστρέφει τα αρχεία του φακέλου που θα συγχωνευτούν (βλ. iter_source_files).
+
+    Returns:
+    - Λίστα με τα ονόματα των αρχείων, σχετικά με τον φάκελο (list of str)
+    """
+    return [source.name for source in iter_source_files(folder, skip_filenames, include, exclude, recursive)]
+
+
+# Βρίσκει τη μορφή του αρχείου εξόδου από την κατάληξή του, αν δεν δόθηκε ρητά
+
+def resolve_output_format(output_filename, output_format=None):
+    """
+    Επιστρέφει τη μορφή εξόδου ('xlsx', 'csv', 'parquet' ή 'feather').
+
+    Parameters:
+    - output_filename: το όνομα του αρχείου εξόδου
+    - output_format: ρητή μορφή ή None για αυτόματη επιλογή από την κατάληξη
+    """
+    if output_format:
+        return output_format
+    extension = os.path.splitext(output_filename)[1].lower().lstrip('.')
+    return OUTPUT_EXTENSIONS.get(extension, 'xlsx')
+
+
+# Γράφει τις συγχωνευμένες γραμμές στο αρχείο εξόδου.
+# Το pandas φορτώνεται μόνο εδώ, ώστε η γραμμή εντολών να ξεκινά γρήγορα.
+
+def write_output(merged_data, output_path, output_format=None, header_count=0, compression=None, header=None):
+    """
+    Αποθηκεύει τις συγχωνευμένες γραμμές (επικεφαλίδα + δεδομένα) σε αρχείο xlsx, csv, parquet ή feather.
+
+    Parameters:
+    - merged_data: λίστα με τις γραμμές (list of list), ή ColumnarRows με μόνο τις γραμμές δεδομένων
+    - output_path: η διαδρομή του αρχείου εξόδου
+    - output_format: 'xlsx', 'csv', 'parquet', 'feather' ή None για αυτόματη επιλογή από την κατάληξη
+    - header_count: πόσες από τις πρώτες γραμμές είναι επικεφαλίδα (για parquet/feather γίνονται ονόματα στηλών)
+    - compression: συμπίεση για parquet/feather (None = προεπιλογή της μορφής)
+    - header: οι γραμμές επικεφαλίδας, αν δεν περιέχονται στο merged_data (τότε το header_count αγνοείται)
+    """
+    if header is None:
+        header, merged_data = merged_data[:header_count], merged_data[header_count:]
+    output_format = resolve_output_format(output_path, output_format)
+    if output_format in COLUMNAR_FORMATS:
+        # Όλες οι γραμμές σε ένα κομμάτι, ώστε οι τύποι των στηλών να βρεθούν από ολόκληρα τα δεδομένα
+        writer = open_writer(output_path, output_format, compression, chunk_rows=len(merged_data))
+        try:
+            writer.write_header(header)
+            writer.write_rows(merged_data)
+            writer.close()
+        except Exception:
+            writer.abort()
+            raise
+        return
+
+    import pandas as pd
+
+    if isinstance(merged_data, ColumnarRows):
+        _write_typed_frames(header, merged_data, output_path, output_format)
+        return
+    df = pd.DataFrame(header + merged_data)
+    if output_format == 'csv':
+        # utf-8-sig ώστε το Excel να αναγνωρίζει σωστά τους ελληνικούς χαρακτήρες
+        df.to_csv(output_path, index=False, header=False, encoding='utf-8-sig')
+    else:
+        df.to_excel(output_path, index=False, header=False, engine='openpyxl')
+
+
+# Γράφει ένα ColumnarRows σε csv/xlsx: η επικεφαλίδα γράφεται χωριστά, ώστε οι στήλες των δεδομένων να μείνουν
+# typed (βλ. ColumnarRows.to_dataframe) αντί να γίνουν object μαζί με το κείμενο της επικεφαλίδας
+
+def _write_typed_frames(header, rows, output_path, output_format):
+    import pandas as pd
+
+    width = max([len(row) for row in header] + [rows.width])
+    frames = [pd.DataFrame(header, dtype=object).reindex(columns=pd.RangeIndex(width))] if header else []
+    data = rows.to_dataframe().reindex(columns=pd.RangeIndex(width))
+    frames.append(data)
+    if output_format == 'csv':
+        # Οι ημερομηνίες γράφονται όπως το str(datetime) του csv writer (το pandas παραλείπει την ώρα όταν είναι
+        # παντού 00:00)· μια στήλη με κλάσματα δευτερολέπτου γράφεται ως αντικείμενα για τον ίδιο λόγο
+        for position in data.columns[(data.dtypes == 'datetime64[us]').to_numpy()]:
+            if (data[position].dt.microsecond != 0).any():
+                data[position] = data[position].astype(object)
+        with open(output_path, 'w', newline='', encoding='utf-8-sig') as f:
+            for frame in frames:
+                frame.to_csv(f, index=False, header=False, date_format='%Y-%m-%d %H:%M:%S')
+    else:
+        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
+            start = 0
+            for frame in frames:
+                frame.to_excel(writer, index=False, header=False, startrow=start)
+                start += len(frame)
+
+
+# Γράφει τα συγχωνευμένα φύλλα: στο xlsx ως φύλλα του ίδιου αρχείου, στις άλλες μορφές σε ένα αρχείο ανά φύλλο
+
+def write_sheets_output(sheets, output_path, output_format=None, compression=None):
+    """
+    Αποθηκεύει τη συγχώνευση πολλών φύλλων.
+
+    Parameters:
+    - sheets: dict {όνομα φύλλου: MergeResult με την επικεφαλίδα και τις γραμμές του}
+    - output_path: η διαδρομή του αρχείου εξόδου
+    - output_format: 'xlsx', 'csv', 'parquet', 'feather' ή None για αυτόματη επιλογή από την κατάληξη
+    - compression: συμπίεση για parquet/feather (None = προεπιλογή της μορφής)
+    """
+    output_format = resolve_output_format(output_path, output_format)
+    # Όλες οι γραμμές κάθε φύλλου σε ένα κομμάτι, ώστε οι τύποι των στηλών να βρεθούν από ολόκληρα τα δεδομένα
+    chunk_rows = max([len(sheet.rows) for sheet in sheets.values()] + [1])
+    writer = open_writer(output_path, output_format, compression, chunk_rows, sheet_titles=list(sheets))
+    try:
+        for index, sheet in enumerate(sheets.values()):
+            writer.write_header(sheet.header, index)
+            writer.write_rows(sheet.rows, index)
+        writer.close()
+    except Exception:
+        writer.abort()
+        raise
+
+
+# Τα αρχεία που γράφει η συγχώνευση (ένα ανά φύλλο όταν η μορφή εξόδου δεν έχει φύλλα)
+
+def output_filenames(config):
+    """
+    Επιστρέφει τα ονόματα των αρχείων εξόδου μιας συγχώνευσης (σχετικά με τον φάκελο).
+    """
+    sheet_names = config.merge_sheets
+    if len(sheet_names) > 1 and resolve_output_format(config.output_filename, config.output_format) != 'xlsx':
+        return [sheet_output_path(config.output_filename, sheet_name) for sheet_name in sheet_names]
+    return [config.output_filename]
+
+
+# Η ενημέρωση του υπάρχοντος αρχείου εξόδου (βλ. MergeConfig.append) γίνεται μόνο σε csv ενός φύλλου, με streaming
+# και χωρίς αφαίρεση διπλών γραμμών
+
+def supports_append(config):
+    """
+    Επιστρέφει True αν το αρχείο εξόδου μπορεί να ενημερωθεί αντί να ξαναφτιαχτεί από την αρχή (βλ. CsvAppendWriter).
+    """
+    return (config.write_output and config.streaming and not config.dedup and len(config.merge_sheets) == 1
+            and resolve_output_format(config.output_filename, config.output_format) == 'csv')
+
+
+# Μοιράζει το όριο μνήμης: το μισό για τα αρχεία που διαβάζονται παράλληλα ή περιμένουν να γραφτούν
+# και το άλλο μισό για το κομμάτι που διαβάζεται και την προσωρινή μνήμη του writer κάθε φύλλου
+
+def plan_memory_budget(memory_budget, width=1, sheet_count=1):
+    """
+    Επιστρέφει το μέγεθος των κομματιών και τη μνήμη για τα αρχεία σε ανάγνωση, για ένα όριο μνήμης.
+
+    Parameters:
+    - memory_budget: το όριο μνήμης σε MB
+    - width: πλήθος στηλών των γραμμών (από την επικεφαλίδα του master)
+    - sheet_count: πλήθος φύλλων που συγχωνεύονται (κάθε φύλλο έχει δικό του writer)
+
+    Returns:
+    - Tuple (γραμμές ανά κομμάτι, bytes για τα αρχεία σε ανάγνωση)
+    """
+    budget = int(memory_budget * 1024 * 1024)
+    row_bytes = ROW_BYTES + CELL_BYTES * max(1, width)
+    chunk_rows = (budget // 2) // ((1 + sheet_count) * row_bytes)
+    return min(DEFAULT_CHUNK_ROWS, max(MIN_CHUNK_ROWS, chunk_rows)), budget // 2
+
+
+# Διαβάζει ένα αρχείο πηγής και μετρά χρόνο, CPU και μνήμη της ανάγνωσης (εκτελείται και σε ξεχωριστή διεργασία).
+# Όλα τα φύλλα διαβάζονται με ένα άνοιγμα του αρχείου.
+
+def timed_read_source_sheets(filepath, sheet_names, skip_rows=1, backend='openpyxl', trace_memory=False, header=False,
+                             data=None):
+    """
+    Καλεί τη read_source_sheets και επιστρέφει επιπλέον τις μετρήσεις της ανάγνωσης.
+
+    Parameters:
+    - trace_memory: αν True, μετράται και η μέγιστη μνήμη (με tracemalloc, άρα πιο αργά)
+    - header: αν True, κάθε φύλλο επιστρέφεται μαζί με τις γραμμές επικεφαλίδας του (βλ. read_source_sheets)
+    - data: τα bytes του αρχείου, αν έχουν ήδη διαβαστεί στη μνήμη (τότε μετριέται μόνο η ανάλυση)
+
+    Returns:
+    - Tuple (λίστα από (rows, error) ή (rows, error, γραμμές επικεφαλίδας) ανά φύλλο, PhaseStats)
+    """
+    with memory_tracing(trace_memory), Measurement() as measurement:
+        results = read_source_sheets(filepath, sheet_names, skip_rows, backend, data, header)
+    return results, measurement.stats
+
+
+class _SerialResults:
+    # Τα αποτελέσματα της σειριακής ανάγνωσης. Το sources διαβάζεται σταδιακά: χωρίς prefetch ένα αρχείο τη φορά,
+    # με prefetch όσα χρειάζεται το παράθυρο του FilePrefetcher (τα bytes των επόμενων αρχείων διαβάζονται σε
+    # νήματα όσο αναλύεται το τρέχον, ώστε η αναμονή του δίσκου ή του δικτύου να μην καθυστερεί την ανάλυση).
+
+    def __init__(self, sources, args, prefetch=0, prefetch_bytes=DEFAULT_PREFETCH_BYTES):
+        self._sources = iter(sources)
+        self._window = deque()
+        self._args = args
+        self._prefetcher = None
+        if prefetch > 0:
+            self._prefetcher = FilePrefetcher(self._lookahead(), prefetch, prefetch_bytes)
+
+    def _lookahead(self):
+        # Τα αρχεία που έχει ζητήσει ο FilePrefetcher περιμένουν στο παράθυρο ως τη σειρά τους
+        for filepath, sheet_names in self._sources:
+            self._window.append((filepath, sheet_names))
+            yield filepath
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self._prefetcher is not None:
+            data = next(self._prefetcher)
+            filepath, sheet_names = self._window.popleft()
+        else:
+            filepath, sheet_names = next(self._sources)
+            data = None
+        return timed_read_source_sheets(filepath, sheet_names, *self._args, data=data)
+
+    def close(self):
+        if self._prefetcher is not None:
+            self._prefetcher.close()
+            self._prefetcher = None
+        self._sources = iter(())
+        self._window.clear()
+
+
+class _PoolResults:
+    # Τα αποτελέσματα της παράλληλης ανάγνωσης, με τη σειρά που υποβλήθηκαν τα αρχεία.
+    # Η ομάδα διεργασιών ξεκινά με το πρώτο αρχείο, άρα μια σάρωση χωρίς αρχεία δεν ξεκινά διεργασίες.
+    # Με όριο μνήμης, ένα αρχείο στέλνεται για ανάγνωση μόνο όταν η εκτιμώμενη μνήμη των γραμμών του χωρά μαζί
+    # με όσα διαβάζονται ή περιμένουν να γραφτούν· τα υπόλοιπα περιμένουν στη σειρά (το πρώτο στέλνεται πάντα).
+
+    def __init__(self, sources, workers, args, max_in_flight_bytes=None):
+        self._executor = None
+        self._workers = workers
+        self._args = args
+        self._limit = max_in_flight_bytes
+        self._futures = deque()
+        self._waiting = deque()
+        self._in_flight = 0
+        self._consumed = 0
+        try:
+            for filepath, sheet_names in sources:
+                self._waiting.append((filepath, sheet_names, self._cost(filepath)))
+                self._submit_waiting()
+        except BaseException:
+            self.close()
+            raise
+
+    def _cost(self, filepath):
+        if self._limit is None:
+            return 0
+        try:
+            return os.path.getsize(filepath) * XLSX_MEMORY_FACTOR
+        except OSError:
+            return 0
+
+    def _submit_waiting(self):
+        while self._waiting:
+            filepath, sheet_names, cost = self._waiting[0]
+            if self._limit is not None and self._in_flight and self._in_flight + cost > self._limit:
+                return
+            self._waiting.popleft()
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(max_workers=self._workers)
+            self._futures.append((self._executor.submit(timed_read_source_sheets, filepath, sheet_names,
+                                                        *self._args), cost))
+            self._in_flight += cost
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        # Οι γραμμές του προηγούμενου αρχείου έχουν γραφτεί, άρα η μνήμη τους ελευθερώνεται για το επόμενο
+        self._in_flight -= self._consumed
+        self._consumed = 0
+        self._submit_waiting()
+        if not self._futures:
+            raise StopIteration
+        future, self._consumed = self._futures.popleft()
+        return future.result()
+
+    def close(self):
+        # Αν η ανάγνωση διακοπεί (ακύρωση), τα αρχεία που δεν έχουν ξεκινήσει δεν διαβάζονται καθόλου
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._waiting.clear()
+
+
+# Επιστρέφει τα αποτελέσματα ανάγνωσης των αρχείων με τη σειρά που δόθηκαν.
+# Με workers > 1 η ανάγνωση μοιράζεται σε ομάδα διεργασιών (process pool).
+
+def iter_source_results(sources, skip_rows=1, workers=1, backend='openpyxl', trace_memory=False,
+                        max_in_flight_bytes=None, prefetch=0, header=False):
+    """
+    Διαβάζει τα αρχεία πηγής σειριακά ή παράλληλα και επιστρέφει iterator με τα αποτελέσματα
+    της timed_read_source_sheets, με την ίδια σειρά που δόθηκαν τα αρχεία.
+
+    Με workers = 1 το sources διαβάζεται σταδιακά, λίγα αρχεία μπροστά από αυτό που αναλύεται (όσα χρειάζεται
+    το prefetch). Με workers > 1 καταναλώνεται αμέσως και κάθε αρχείο στέλνεται για ανάγνωση μόλις το δώσει.
+    Και στις δύο περιπτώσεις, αν το sources είναι η σάρωση του φακέλου, η ανάγνωση ξεκινά πριν τελειώσει η σάρωση.
+    Ο iterator πρέπει να κλείνει με close() (σταματά τις διεργασίες).
+
+    Parameters:
+    - sources: iterable από (διαδρομή αρχείου Excel, tuple με τα φύλλα που θα διαβαστούν)
+    - skip_rows: πλήθος γραμμών επικεφαλίδας που αγνοούνται
+    - workers: πλήθος παράλληλων διεργασιών (1 = σειριακή ανάγνωση)
+    - backend: το backend ανάγνωσης (ήδη επιλεγμένο, ώστε όλες οι διεργασίες να χρησιμοποιούν το ίδιο)
+    - trace_memory: αν True, μετράται και η μέγιστη μνήμη κάθε ανάγνωσης
+    - max_in_flight_bytes: με workers > 1, η εκτιμώμενη μνήμη των αρχείων που διαβάζονται ή περιμένουν
+      να καταναλωθούν (None = όλα τα αρχεία στέλνονται αμέσως)
+    - prefetch: με workers = 1, πόσα από τα επόμενα αρχεία διαβάζονται εκ των προτέρων στη μνήμη (0 = κανένα)·
+      με workers > 1 κάθε διεργασία διαβάζει μόνη της τα αρχεία της, άρα η αναμονή επικαλύπτεται ήδη
+    - header: αν True, κάθε φύλλο επιστρέφεται μαζί με τις γραμμές επικεφαλίδας του (βλ. read_source_sheets)
+    """
+    if workers <= 1:
+        return _SerialResults(sources, (skip_rows, backend, trace_memory, header), prefetch)
+    return _PoolResults(sources, workers, (skip_rows, backend, trace_memory, header), max_in_flight_bytes)
+
+
+# Καταγράφει στο log τους χρόνους ανά φάση και τα πιο αργά αρχεία
+
+def log_performance_summary(result, log_message, slowest_files=5):
+    """
+    Γράφει στο log τις μετρήσεις κάθε φάσης και τα slowest_files πιο αργά αρχεία.
+
+    Parameters:
+    - result: το MergeResult
+    - log_message: συνάρτηση καταγραφής
+    - slowest_files: πόσα από τα πιο αργά αρχεία εμφανίζονται (0 = κανένα)
+    """
+    log_message("⏱ Χρόνοι ανά φάση:")
+    for phase, label in PHASE_LABELS.items():
+        if phase in result.phase_stats:
+            log_message(f"  - {label}: {format_stats(result.phase_stats[phase])}")
+
+    read_files = [f for f in result.files if f.status not in (STATUS_CACHED, STATUS_REUSED)]
+    if slowest_files > 0 and read_files:
+        slowest = sorted(read_files, key=lambda f: f.seconds, reverse=True)[:slowest_files]
+        log_message(f"🐢 Τα {len(slowest)} πιο αργά αρχεία:")
+        for f in slowest:
+            stats = PhaseStats(f.seconds, f.cpu_seconds, f.peak_memory)
+            log_message(f"  - {f.label}: {format_stats(stats)}")
+
+
+# Κύρια συνάρτηση συγχώνευσης: διαβάζει τη 2η γραμμή (και κάτω) από κάθε αρχείο Excel στον φάκελο
+# και τις προσθέτει κάτω από την επικεφαλίδα του master αρχείου. Δεν εξαρτάται από κάποιο GUI.
+
+def run_merge(config, log=None, progress=None, cancel_event=None):
+    """
+    Συγχωνεύει τις πρώτες skip_rows γραμμές του master αρχείου με τις γραμμές δεδομένων
+    των υπόλοιπων αρχείων Excel του φακέλου και (προαιρετικά) γράφει το αρχείο εξόδου.
+    Δεν αγγίζει κανένα widget, ώστε να μπορεί να εκτελεστεί σε νήμα, από τη γραμμή εντολών ή από άλλο πρόγραμμα.
+
+    Parameters:
+    - config: MergeConfig με τις ρυθμίσεις
+    - log: optional συνάρτηση που δέχεται ένα μήνυμα (str) για καταγραφή
+    - progress: optional συνάρτηση που δέχεται το ποσοστό προόδου (0-100)
+    - cancel_event: optional threading.Event· όταν οριστεί, η συγχώνευση σταματά πριν από το επόμενο αρχείο
+
+    Returns:
+    - MergeResult (με config.sheet_names, τα αποτελέσματα κάθε φύλλου βρίσκονται στο MergeResult.sheets)
+    """
+    # Ο profiler καταγράφει το νήμα που εκτελεί τη συγχώνευση (όχι τις διεργασίες ανάγνωσης)
+    with profiled(config.profile_path), memory_tracing(config.trace_memory):
+        return _MergeRun(config, log, progress, cancel_event).run()
+
+
+class _MergeRun:
+    # Μία εκτέλεση της run_merge. Οι φάσεις της είναι χωριστές μέθοδοι που μοιράζονται την κατάσταση της
+    # συγχώνευσης (αποτέλεσμα, αρχείο εξόδου, checkpoint, cache, σάρωση):
+    # - prepare: επικεφαλίδες του master, αντιστοίχιση στηλών, διπλές γραμμές, όριο μνήμης, ενημέρωση
+    # - open_outputs / start_scan: αρχείο εξόδου (με streaming), checkpoint, σάρωση του φακέλου
+    # - read_sources: ο βρόχος των αρχείων, που περνούν από το emit_rows (checkpoint, διπλές, εγγραφή)
+    # - finalise: διπλές γραμμές 'last'/'newest', cache, εγγραφή χωρίς streaming και τελική καταγραφή
+    # Κάθε φάση που αποτυγχάνει καταγράφει το σφάλμα στο result.error και επιστρέφει False.
+
+    def __init__(self, config, log, progress, cancel_event):
+        self.config = config
+        self.log = log
+        self.progress = progress
+        self.cancel_event = cancel_event
+        self.result = MergeResult()
+        self.total = Measurement().start()
+        self.log_stats = self.result.phase_stats['log'] = PhaseStats()
+        self.sheet_names = config.merge_sheets
+        self.multi_sheet = len(self.sheet_names) > 1
+        self.output_format = resolve_output_format(config.output_filename, config.output_format)
+        self.backend = None
+        self.headers = []
+        self.sheet_results = []
+        self.aligners = []
+        self.deduplicators = []
+        self.streaming = config.streaming
+        self.chunk_rows = self.max_in_flight_bytes = None
+        self.chunked = False
+        # Ενημέρωση του υπάρχοντος αρχείου εξόδου (βλ. prepare_append)
+        self.signature = self.previous = None
+        self.previous_entries = {}
+        self.reused = {}
+        self.writer = None
+        self.write_stats = None
+        self.checkpoint = None
+        self.resumed = {}
+        self.rewound = False
+        self.cache = None
+        # Η σάρωση του φακέλου (βλ. scan)
+        self.found = None
+        self.sources = []
+        self.scanned = deque()
+        self.scan_complete = False
+        self.cached_sheets = set()
+        self.sheets_to_read = {}
+        self.results = None
+        # Τα αποτελέσματα του αρχείου που συγχωνεύεται, ως (θέση φύλλου, FileResult), για το checkpoint
+        self.current_results = []
+        # Οι τιμές του φύλλου που συγχωνεύεται που γράφτηκαν κενές, ως (αριθμός γραμμής, στήλη, τιμή)
+        self.conflicts = []
+
+    def log_message(self, message):
+        if self.log is not None:
+            # Ο χρόνος του log μετρά χωριστά, ώστε να φαίνεται αν το GUI καθυστερεί τη συγχώνευση
+            wall, cpu = time.perf_counter(), time.process_time()
+            self.log(message)
+            self.log_stats.wall += time.perf_counter() - wall
+            self.log_stats.cpu += time.process_time() - cpu
+
+    def fail(self, message, error):
+        self.log_message(message)
+        self.result.error = str(error)
+        return False
+
+    def end_phase(self, name, measurement):
+        self.result.phase_stats[name] = measurement.stop()
+        self.result.timings[name] = measurement.stats.wall
+
+    def finish(self):
+        self.end_phase('total', self.total)
+        self.result.timings['log'] = self.log_stats.wall
+        return self.result
+
+    def label(self, index, filename):
+        return f"{filename} [{self.sheet_names[index]}]" if self.multi_sheet else filename
+
+    def run(self):
+        if not (self.prepare() and self.open_outputs() and self.start_scan() and self.open_append_output()):
+            return self.finish()
+        self.read_sources()
+        return self.finalise()
+
+    # === Προετοιμασία ===
+
+    def prepare(self):
+        config = self.config
+        try:
+            self.backend = resolve_backend(config.backend)
+        except ValueError as e:
+            return self.fail(f"❌ {e}", e)
+
+        # Διαβάζουμε την επικεφαλίδα κάθε φύλλου από το αρχείο master
+        phase = Measurement().start()
+        for sheet_name in self.sheet_names:
+            try:
+                # Παίρνουμε τις πρώτες skip_rows γραμμές ως επικεφαλίδα (χωρίς να διαβαστεί όλο το φύλλο)
+                self.headers.append(read_header_rows(config.master_path, sheet_name, config.skip_rows))
+            except Exception as e:
+                phase.stop()
+                return self.fail(f"❌ Σφάλμα στο αρχείο master ή στο φύλλο '{sheet_name}': {e}", e)
+        self.end_phase('master', phase)
+
+        # Με πολλά φύλλα κάθε φύλλο έχει το δικό του MergeResult (επικεφαλίδα, γραμμές, αρχεία) στο result.sheets
+        result = self.result
+        if self.multi_sheet:
+            result.sheets = {sheet_name: MergeResult(header=header)
+                             for sheet_name, header in zip(self.sheet_names, self.headers)}
+            self.sheet_results = list(result.sheets.values())
+        else:
+            result.header = self.headers[0]
+            self.sheet_results = [result]
+        # Οι γραμμές που κρατιούνται ως το τέλος (χωρίς streaming) αποθηκεύονται ανά στήλη (βλ. ColumnarRows)
+        for sheet_result in self.sheet_results:
+            sheet_result.rows = ColumnarRows()
+
+        self.aligners = [None] * len(self.sheet_names)
+        if config.align_columns:
+            for index, header in enumerate(self.headers):
+                aligner = ColumnAligner(header[-1] if header else [])
+                if aligner.master_names:
+                    self.aligners[index] = aligner
+                else:
+                    self.log_message(f"⚠ Το φύλλο '{self.sheet_names[index]}' του master δεν έχει ονόματα στηλών· "
+                                     f"οι στήλες του συγχωνεύονται με βάση τη θέση τους.")
+
+        # Ένα ευρετήριο διπλών γραμμών ανά φύλλο· με 'last'/'newest' οι γραμμές κρατιούνται ως το τέλος
+        self.deduplicators = [None] * len(self.sheet_names)
+        if config.dedup:
+            for index, header in enumerate(self.headers):
+                try:
+                    key_positions = resolve_key_columns(header[-1] if header else [], config.dedup_columns)
+                    self.deduplicators[index] = RowDeduplicator(key_positions, config.dedup)
+                except ValueError as e:
+                    where = f" (φύλλο '{self.sheet_names[index]}')" if self.multi_sheet else ""
+                    return self.fail(f"❌ {e}{where}", e)
+        if self.streaming and any(dedup is not None and dedup.buffered for dedup in self.deduplicators):
+            self.streaming = False
+            self.log_message(f"ℹ️ Με την πολιτική '{config.dedup}' οι γραμμές κρατιούνται στη μνήμη και γράφονται "
+                             "στο τέλος.")
+
+        # Με όριο μνήμης, οι γραμμές διαβάζονται και γράφονται σε κομμάτια σταθερού μεγέθους (σειριακά) ή
+        # διαβάζονται ταυτόχρονα μόνο όσα αρχεία χωρούν στο όριο (παράλληλα)
+        if config.memory_budget is not None and config.memory_budget > 0:
+            if config.write_output and self.streaming:
+                width = max([len(row) for header in self.headers for row in header] + [1])
+                self.chunk_rows, self.max_in_flight_bytes = plan_memory_budget(config.memory_budget, width,
+                                                                               len(self.sheet_names))
+            else:
+                self.log_message("⚠ Το όριο μνήμης ισχύει μόνο όταν οι γραμμές γράφονται με streaming· αγνοείται.")
+        self.chunked = self.chunk_rows is not None and config.workers <= 1
+        self.prepare_append()
+        return True
+
+    def prepare_append(self):
+        # Ενημέρωση του υπάρχοντος αρχείου εξόδου: το manifest του λέει ποιο αρχείο πηγής έδωσε ποιες γραμμές,
+        # ώστε να διαβαστούν μόνο τα νέα και τα τροποποιημένα αρχεία (βλ. CsvAppendWriter)
+        config = self.config
+        if not config.append:
+            return
+        if supports_append(config):
+            self.signature = merge_signature(config, self.result.header)
+            previous = OutputManifest.load(config.output_path)
+            if previous is not None and not previous.matches(config.output_path, self.signature):
+                previous = None
+            if previous is None and os.path.exists(config.output_path):
+                self.log_message("ℹ️ Το αρχείο εξόδου δεν έχει έγκυρο manifest (ή άλλαξε μετά τη συγχώνευση ή "
+                                 "άλλαξαν οι ρυθμίσεις)· ξαναφτιάχνεται ολόκληρο.")
+            if previous is not None:
+                self.previous = previous
+                self.previous_entries = {entry.name: entry for entry in previous.entries}
+        else:
+            self.log_message("ℹ️ Η ενημέρωση του υπάρχοντος αρχείου γίνεται μόνο σε έξοδο csv ενός φύλλου, με "
+                             "streaming και χωρίς αφαίρεση διπλών γραμμών· γίνεται πλήρης συγχώνευση.")
+
+    def open_output(self, factory):
+        # Ανοίγει το αρχείο εξόδου και γράφει τις επικεφαλίδες (εκτός αν συνεχίζει από checkpoint)· False (με μήνυμα)
+        # αν απέτυχε
+        output = None
+        try:
+            output = factory()
+            for index, sheet_result in enumerate(self.sheet_results):
+                output.write_header(sheet_result.header, index)
+        except Exception as e:
+            if output is not None:
+                output.abort()
+            return self.fail(f"❌ Σφάλμα κατά την αποθήκευση του αρχείου: {e}", e)
+        self.writer = output
+        return True
+
+    def open_outputs(self):
+        # Το checkpoint (με checkpoint ή resume) καταγράφει την πρόοδο, ώστε μια συγχώνευση που διακόπηκε να
+        # συνεχίσει από εκεί που σταμάτησε. Με csv σε streaming καταγράφει μόνο τη θέση του αρχείου εξόδου, που
+        # στη συνέχεια ανοίγει από εκείνη τη θέση· αλλιώς καταγράφει και τις γραμμές (βλ. MergeCheckpoint).
+        config = self.config
+        checkpoint = position = None
+        resume = False
+        if config.write_output and (config.checkpoint or config.resume):
+            partial_paths = None
+            if self.streaming and self.signature is None and self.output_format == 'csv' and not config.dedup:
+                partial_paths = [os.path.join(config.folder, filename) + PARTIAL_SUFFIX
+                                 for filename in output_filenames(config)]
+            checkpoint = MergeCheckpoint(checkpoint_path(config), merge_fingerprint(config, self.headers),
+                                         partial_paths=partial_paths)
+            if config.resume:
+                resume = bool(checkpoint.load().entries)
+                if not resume:
+                    self.log_message("ℹ️ Δεν βρέθηκε checkpoint με αυτές τις ρυθμίσεις· η συγχώνευση ξεκινά από "
+                                     "την αρχή.")
+                elif partial_paths is not None:
+                    position = checkpoint.position
+        elif config.resume:
+            self.log_message("⚠ Η συνέχεια απαιτεί αρχείο εξόδου· η συγχώνευση ξεκινά από την αρχή.")
+
+        # Με streaming το αρχείο εξόδου ανοίγει πριν από την ανάγνωση και κάθε αρχείο γράφεται μόλις διαβαστεί
+        # (στην ενημέρωση, μετά τη σάρωση, όταν είναι γνωστά τα αρχεία που άλλαξαν)
+        if config.write_output and self.streaming:
+            self.write_stats = self.result.phase_stats['write'] = PhaseStats()
+            if self.signature is None and not self.open_output(
+                    lambda: open_writer(config.output_path, self.output_format, config.compression,
+                                        chunk_rows=self.chunk_rows or DEFAULT_CHUNK_ROWS,
+                                        sheet_titles=self.sheet_names if self.multi_sheet else None,
+                                        resume=position)):
+                return False
+
+        if checkpoint is not None:
+            try:
+                checkpoint.start(resume, self.writer)
+                self.checkpoint = checkpoint
+            except OSError as e:
+                self.log_message(f"⚠ Δεν ήταν δυνατή η δημιουργία checkpoint: {e}")
+                if position is not None:
+                    # Χωρίς checkpoint όλα τα αρχεία ξαναγράφονται μετά την επικεφαλίδα
+                    self.writer.rewind(checkpoint.start_position)
+        return True
+
+    # === Σάρωση του φακέλου ===
+
+    def scan(self, count=None):
+        # Προχωρά τη σάρωση κατά count αρχεία (None = ως το τέλος)· False αν η σάρωση είχε ήδη ολοκληρωθεί.
+        # Τα φύλλα που δεν άλλαξαν δίνονται από την cache και τα υπόλοιπα μπαίνουν στο scanned για ανάγνωση.
+        if self.scan_complete:
+            return False
+        config = self.config
+        seen = 0
+        for source in islice(self.found, count):
+            seen += 1
+            self.sources.append(source)
+            if self.previous is not None:
+                entry = self.previous_entries.get(source.name)
+                if entry is not None and self.previous.unchanged(entry, source):
+                    self.reused[source.name] = entry
+                    continue
+            if self.checkpoint is not None:
+                entry = self.checkpoint.completed(source)
+                if entry is not None:
+                    self.resumed[source.name] = entry
+                    continue
+            if self.cache is not None:
+                # Οι γραμμές από την cache διαβάζονται από τον δίσκο μόνο όταν έρθει η σειρά του αρχείου
+                for sheet_name in self.sheet_names:
+                    if self.cache.contains(source.path, source.name, sheet_name, config.skip_rows, source.stat):
+                        self.cached_sheets.add((source.name, sheet_name))
+            # Κάθε αρχείο ανοίγει μία φορά, για όλα τα φύλλα του που δεν βρέθηκαν στην cache
+            missing = tuple(sheet_name for sheet_name in self.sheet_names
+                            if (source.name, sheet_name) not in self.cached_sheets)
+            if missing:
+                if not self.sheets_to_read:
+                    self.log_message(f"⚙ Backend ανάγνωσης: {self.backend}")
+                self.sheets_to_read[source.name] = missing
+                self.scanned.append((source.path, missing))
+        if count is None or seen < count:
+            self.scan_complete = True
+        return True
+
+    def pending_reads(self):
+        # Τα αρχεία προς ανάγνωση με τη σειρά της σάρωσης· η σάρωση προχωρά όσο τα ζητά ο αναγνώστης
+        while self.scanned or self.scan(1):
+            if self.scanned:
+                yield self.scanned.popleft()
+
+    def iter_sources(self):
+        # Όλα τα αρχεία με τη σειρά της σάρωσης, με τη σάρωση SCAN_AHEAD_FILES αρχεία μπροστά από τον βρόχο
+        position = 0
+        while True:
+            self.scan(SCAN_AHEAD_FILES)
+            if position >= len(self.sources):
+                return
+            yield self.sources[position]
+            position += 1
+
+    def start_scan(self):
+        # Τα αρχεία Excel του φακέλου εκτός του master και του αρχείου εξόδου· ξεκινά η σάρωση και ο αναγνώστης
+        config = self.config
+        phase = Measurement().start()
+        self.cache = MergeCache(config.folder, use_hash=config.cache_hash).load() if config.use_cache else None
+        self.found = iter_source_files(config.folder, [config.master_filename] + output_filenames(config),
+                                       config.include, config.exclude, config.recursive)
+        try:
+            if self.chunked or self.previous is not None:
+                # Τα αρχεία διαβάζονται κομμάτι-κομμάτι στον κύριο βρόχο ή (στην ενημέρωση) με τη σειρά που
+                # έχουν οι γραμμές τους στο αρχείο εξόδου, με τα νέα αρχεία στο τέλος· η σάρωση ολοκληρώνεται πρώτα
+                self.scan()
+                to_read = list(self.scanned)
+                self.scanned.clear()
+                if self.previous is not None:
+                    order = {name: position for position, name in enumerate(self.previous_entries)}
+                    self.sources.sort(key=lambda source: order.get(source.name, len(order)))
+                    to_read = [(source.path, self.sheets_to_read[source.name]) for source in self.sources
+                               if source.name in self.sheets_to_read]
+            else:
+                # Με workers > 1 ο αναγνώστης ζητά όλα τα αρχεία αμέσως· σειριακά η σάρωση προχωρά μαζί με την
+                # ανάγνωση (το πρώτο βήμα γίνεται εδώ, ώστε ένα σφάλμα του φακέλου να αναφέρεται ως σφάλμα σάρωσης)
+                self.scan(SCAN_AHEAD_FILES)
+                to_read = self.pending_reads()
+            if self.chunked:
+                # Τα αρχεία διαβάζονται στον κύριο βρόχο· εδώ ξεκινά μόνο η προφόρτωση των bytes τους, μέσα στη
+                # μνήμη του ορίου που προορίζεται για αρχεία σε ανάγνωση
+                self.results = FilePrefetcher([filepath for filepath, _ in to_read], config.prefetch,
+                                              self.max_in_flight_bytes) if config.prefetch > 0 else None
+            else:
+                self.results = iter_source_results(to_read, skip_rows=config.skip_rows, workers=config.workers,
+                                                   backend=self.backend, trace_memory=config.trace_memory,
+                                                   max_in_flight_bytes=self.max_in_flight_bytes,
+                                                   prefetch=config.prefetch, header=True)
+        except OSError as e:
+            phase.stop()
+            self.stop_output()
+            return self.fail(f"❌ Σφάλμα κατά τη σάρωση του φακέλου '{config.folder}': {e}", e)
+        self.end_phase('scan', phase)
+
+        if self.checkpoint is not None and self.checkpoint.entries:
+            retried = f", {self.checkpoint.failed} προβληματικά ξαναδοκιμάζονται" if self.checkpoint.failed else ""
+            self.log_message(f"♻️ Συνέχεια από το checkpoint: {len(self.checkpoint.entries)} αρχεία είχαν ήδη "
+                             f"ολοκληρωθεί{retried}")
+        if self.chunk_rows is not None:
+            if self.chunked:
+                self.log_message(f"🧮 Όριο μνήμης {config.memory_budget} MB: ανάγνωση και εγγραφή σε κομμάτια των "
+                                 f"{self.chunk_rows} γραμμών")
+            else:
+                self.log_message(f"🧮 Όριο μνήμης {config.memory_budget} MB: έως "
+                                 f"{self.max_in_flight_bytes / (1024 * 1024):g} MB (εκτίμηση) σε αρχεία που "
+                                 f"διαβάζονται ταυτόχρονα")
+        return True
+
+    def open_append_output(self):
+        # Στην ενημέρωση το αρχείο εξόδου ανοίγει μετά τη σάρωση, όταν είναι γνωστά τα αρχεία που άλλαξαν
+        if self.signature is None:
+            return True
+        in_place = False
+        previous = self.previous
+        if previous is not None:
+            names = {source.name for source in self.sources}
+            removed = sum(1 for name in self.previous_entries if name not in names)
+            replaced = sum(1 for name in self.previous_entries if name in names and name not in self.reused)
+            added = len(self.sources) - len(self.reused) - replaced
+            # Αν δεν άλλαξε ούτε αφαιρέθηκε κανένα αρχείο, οι νέες γραμμές απλώς προστίθενται στο τέλος
+            in_place = not removed and not replaced
+            how = ("οι νέες γραμμές προστίθενται στο τέλος" if in_place else
+                   "οι γραμμές των αρχείων χωρίς αλλαγές αντιγράφονται από το υπάρχον αρχείο")
+            self.log_message(f"🧩 Ενημέρωση του αρχείου εξόδου: {len(self.reused)} αρχεία χωρίς αλλαγές, {added} "
+                             f"νέα (ή χωρίς γραμμές), {replaced} τροποποιημένα, {removed} αφαιρέθηκαν· {how}")
+        if not self.open_output(lambda: CsvAppendWriter(self.config.output_path, self.signature, previous,
+                                                        in_place)):
+            if self.results is not None:
+                self.results.close()
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+            if self.cache is not None:
+                self.cache.close()
+            return False
+        return True
+
+    # === Εγγραφή των γραμμών κάθε φύλλου (checkpoint, διπλές γραμμές, αρχείο εξόδου ή μνήμη) ===
+
+    def column_mapping(self, index, source, label, file_header=None):
+        # Η αντιστοίχιση των στηλών ενός φύλλου ενός αρχείου στις στήλες του master (None χωρίς --align-columns).
+        # Η επικεφαλίδα του αρχείου έρχεται από την ίδια ανάγνωση με τις γραμμές (ή από την cache)· μόνο μια
+        # εγγραφή της cache χωρίς επικεφαλίδα διαβάζει την επικεφαλίδα από το αρχείο.
+        aligner = self.aligners[index]
+        if aligner is None:
+            return None
+        skip_rows = self.config.skip_rows
+        if file_header is None:
+            try:
+                file_header = get_workbook_metadata(source.path).header_rows(self.sheet_names[index], skip_rows)
+            except Exception as e:
+                self.log_message(f"⚠ {label}: δεν διαβάστηκε η επικεφαλίδα ({e})· οι στήλες μένουν με τη σειρά "
+                                 f"τους")
+                return None
+        mapping = aligner.mapping(file_header[-1] if len(file_header) == skip_rows else [])
+        if mapping.unknown_columns:
+            self.log_message(f"⚠ {label}: στήλες που δεν υπάρχουν στο master και αγνοήθηκαν: "
+                             f"{', '.join(mapping.unknown_columns)}")
+        if mapping.missing_columns:
+            self.log_message(f"ℹ️ {label}: στήλες του master που λείπουν (κενές τιμές): "
+                             f"{', '.join(mapping.missing_columns)}")
+        return mapping
+
+    def emit_rows(self, index, label, rows, record=True):
+        # Γράφει (ή κρατά) τις γραμμές ενός φύλλου και τις καταγράφει. Επιστρέφει πόσες γραμμές συγχωνεύτηκαν
+        # (χωρίς όσες αφαιρέθηκαν ως διπλές) ή None αν απέτυχε η εγγραφή.
+        if self.checkpoint is not None and record:
+            try:
+                self.checkpoint.write_rows(index, rows)
+            except Exception as e:
+                self.fail(f"❌ Σφάλμα κατά την αποθήκευση του checkpoint: {e}", e)
+                return None
+        if self.deduplicators[index] is not None:
+            rows = self.deduplicators[index].filter(rows)
+        if self.writer is not None:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                conflicts = self.writer.write_rows((row for _, row in rows), index)
+            except Exception as e:
+                self.fail(f"❌ Σφάλμα κατά την αποθήκευση του αρχείου: {e}", e)
+                return None
+            self.write_stats.wall += time.perf_counter() - wall
+            self.write_stats.cpu += time.process_time() - cpu
+            if conflicts:
+                self.conflicts.extend((rows[position][0], name, value) for position, name, value in conflicts)
+        else:
+            self.sheet_results[index].rows.extend(row for _, row in rows)
+        # Καταγραφή επιτυχούς γραμμής
+        if self.config.log_rows:
+            for line_number, row in rows:
+                self.log_message(f"✅ {label} ➔ Γραμμή {line_number}: {row}")
+        return len(rows)
+
+    def take_conflicts(self, label):
+        # Οι τιμές του φύλλου που γράφτηκαν κενές (βλ. ColumnarStreamWriter), ως πεδία του FileResult
+        conflicts, self.conflicts = self.conflicts, []
+        if not conflicts:
+            return {}
+        examples = tuple(f"γραμμή {line}, στήλη '{name}': {value!r}"
+                         for line, name, value in conflicts[:CONFLICT_EXAMPLES])
+        self.log_message(f"⚠ {label}: {len(conflicts)} τιμές δεν ταιριάζουν με τον τύπο της στήλης τους και "
+                         f"γράφτηκαν κενές (π.χ. {examples[0]})")
+        return {'conflict_count': len(conflicts), 'conflicts': examples}
+
+    def start_dedup(self, index, source):
+        if self.deduplicators[index] is not None:
+            self.deduplicators[index].start_file(source.name,
+                                                 source.stat.st_mtime_ns if source.stat is not None else 0)
+
+    def add_file_result(self, index, file_result):
+        self.current_results.append((index, file_result))
+        if self.multi_sheet:
+            file_result.sheet = self.sheet_names[index]
+            self.result.files.append(file_result)
+        self.sheet_results[index].files.append(file_result)
+
+    def merge_sheet(self, index, source, rows, error, status, file_backend, stats, file_header=None):
+        # Προσθέτει τις γραμμές ενός φύλλου ενός αρχείου στο αποτέλεσμα· False αν απέτυχε η εγγραφή
+        label = self.label(index, source.name)
+        mapping = self.column_mapping(index, source, label, file_header) if error is None else None
+        if error is None:
+            if mapping is not None:
+                rows = mapping.apply(rows)
+            self.start_dedup(index, source)
+            written = self.emit_rows(index, label, rows)
+            if written is None:
+                return False
+            file_result = FileResult(source.name, status, written, seconds=stats.wall, backend=file_backend,
+                                     cpu_seconds=stats.cpu, peak_memory=stats.peak_memory,
+                                     unknown_columns=mapping.unknown_columns if mapping else (),
+                                     missing_columns=mapping.missing_columns if mapping else (),
+                                     duplicate_rows=len(rows) - written, **self.take_conflicts(label))
+        else:
+            file_result = FileResult(source.name, STATUS_FAILED, error=error, seconds=stats.wall,
+                                     backend=file_backend, cpu_seconds=stats.cpu, peak_memory=stats.peak_memory)
+        self.add_file_result(index, file_result)
+        return True
+
+    def merge_sheet_chunks(self, index, source, reader, stats):
+        # Όπως η merge_sheet, αλλά οι γραμμές διαβάζονται και γράφονται σε κομμάτια των chunk_rows γραμμών.
+        # Ο χρόνος του αρχείου μετρά μόνο την ανάγνωση· η cache κρατά μόνο φύλλα που χωρούν σε ένα κομμάτι.
+        sheet_name = self.sheet_names[index]
+        label = self.label(index, source.name)
+        file_header = []
+        chunks = iter_source_chunks(reader, sheet_name, self.config.skip_rows, self.chunk_rows, file_header)
+        mapping = first_chunk = error = None
+        count = read_count = 0
+        try:
+            while True:
+                wall, cpu = time.perf_counter(), time.process_time()
+                try:
+                    chunk = next(chunks, None)
+                except Exception as e:
+                    chunk, error = None, str(e)
+                stats.wall += time.perf_counter() - wall
+                stats.cpu += time.process_time() - cpu
+                if chunk is None:
+                    break
+                if read_count == 0:
+                    first_chunk = chunk
+                    mapping = self.column_mapping(index, source, label, file_header)
+                    self.start_dedup(index, source)
+                else:
+                    first_chunk = None
+                read_count += len(chunk)
+                if mapping is not None:
+                    chunk = mapping.apply(chunk)
+                written = self.emit_rows(index, label, chunk)
+                if written is None:
+                    return False
+                count += written
+        finally:
+            chunks.close()
+
+        if error is None and read_count == 0:
+            error = NO_DATA_ERROR
+        if error is not None:
+            if count:
+                # Οι γραμμές πριν από το σφάλμα έχουν ήδη γραφτεί και δεν αφαιρούνται από το αρχείο εξόδου
+                error = f"{error} (μετά από {count} γραμμές που γράφτηκαν ήδη)"
+            file_result = FileResult(source.name, STATUS_FAILED, error=error, seconds=stats.wall,
+                                     backend=self.backend, cpu_seconds=stats.cpu)
+        else:
+            if self.cache is not None and first_chunk is not None:
+                self.cache.store(source.path, source.name, sheet_name, self.config.skip_rows, first_chunk,
+                                 source.stat, file_header)
+            file_result = FileResult(source.name, STATUS_MERGED, count, seconds=stats.wall, backend=self.backend,
+                                     cpu_seconds=stats.cpu, duplicate_rows=read_count - count,
+                                     unknown_columns=mapping.unknown_columns if mapping else (),
+                                     missing_columns=mapping.missing_columns if mapping else (),
+                                     **self.take_conflicts(label))
+        self.add_file_result(index, file_result)
+        return True
+
+    # === Βρόχος που διατρέχει όλα τα Excel αρχεία προς συγχώνευση ===
+
+    def read_sources(self):
+        phase = Measurement().start()
+        checkpoint, progress = self.checkpoint, self.progress
+        for idx, source in enumerate(self.iter_sources()):
+            filename = source.name
+            # Η ακύρωση ελέγχεται μόνο ανάμεσα στα αρχεία, ώστε κάθε αρχείο να μπαίνει ολόκληρο ή καθόλου
+            if self.cancel_event is not None and self.cancel_event.is_set():
+                self.result.cancelled = True
+                break
+
+            if filename in self.reused:
+                if not self.reuse_source(source):
+                    break
+                if progress:
+                    progress(int(((idx + 1) / len(self.sources)) * 100))
+                continue
+            if self.signature is not None:
+                self.writer.begin_source()
+
+            self.current_results.clear()
+            if filename in self.resumed:
+                self.replay_source(source, self.resumed[filename])
+            elif self.rewind_output():
+                self.read_source(source)
+            if self.signature is not None and self.result.error is None:
+                self.end_source(source)
+            if checkpoint is not None and self.result.error is None and filename not in self.resumed:
+                try:
+                    checkpoint.end_file(source, list(self.current_results), self.writer)
+                except Exception as e:
+                    self.fail(f"❌ Σφάλμα κατά την αποθήκευση του checkpoint: {e}", e)
+            if self.result.error is not None:
+                break
+
+            # Ενημέρωση προόδου (αν ζητήθηκε)
+            if progress:
+                progress(int(((idx + 1) / len(self.sources)) * 100))
+        else:
+            # Αν όλα τα αρχεία είχαν ολοκληρωθεί πριν από τη διακοπή, από το αρχείο εξόδου αφαιρούνται οι γραμμές
+            # των ολοκληρωμένων αρχείων που δεν υπάρχουν πια
+            self.rewind_output()
+        if self.results is not None:
+            self.results.close()
+        self.end_phase('read', phase)
+        if self.config.workers > 1 and self.sheets_to_read:
+            # Με παράλληλη ανάγνωση ο χρόνος CPU καταναλώνεται στις διεργασίες ανάγνωσης, όχι σε αυτήν
+            self.result.phase_stats['read'].cpu += sum(f.cpu_seconds for f in self.result.files)
+
+    def read_source(self, source):
+        # Διαβάζει (ή παίρνει από την cache) όλα τα φύλλα ενός αρχείου και τα προσθέτει στο αποτέλεσμα
+        filename = source.name
+        sheets_to_read = self.sheets_to_read.get(filename, ())
+        read_results, stats, reader = {}, PhaseStats(), None
+        if sheets_to_read and self.chunked:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                reader = open_source(source.path, self.backend,
+                                     next(self.results) if self.results is not None else None)
+            except Exception as e:
+                read_results = {sheet_name: ([], str(e), None) for sheet_name in sheets_to_read}
+            stats = PhaseStats(time.perf_counter() - wall, time.process_time() - cpu)
+        elif sheets_to_read:
+            sheet_reads, stats = next(self.results)
+            read_results = dict(zip(sheets_to_read, sheet_reads))
+
+        for index, sheet_name in enumerate(self.sheet_names):
+            if reader is not None and sheet_name in sheets_to_read:
+                # Ο χρόνος ανοίγματος του αρχείου καταγράφεται στο πρώτο φύλλο του
+                file_stats, stats = stats, PhaseStats()
+                if not self.merge_sheet_chunks(index, source, reader, file_stats):
+                    break
+                continue
+            if sheet_name not in read_results:
+                cached = self.cache.read_sheet(filename, sheet_name, self.config.skip_rows)
+                if cached is None:
+                    # Η εγγραφή της cache δεν διαβάστηκε: το φύλλο διαβάζεται τώρα από το αρχείο
+                    (read_results[sheet_name],), stats = timed_read_source_sheets(
+                        source.path, [sheet_name], self.config.skip_rows, self.backend, self.config.trace_memory,
+                        header=True)
+                else:
+                    rows, file_header = cached
+            if sheet_name in read_results:
+                rows, error, file_header = read_results[sheet_name]
+                status, file_backend = STATUS_MERGED, self.backend
+                if self.cache is not None and error is None:
+                    self.cache.store(source.path, filename, sheet_name, self.config.skip_rows, rows, source.stat,
+                                     file_header)
+            else:
+                error, status, file_backend = None, STATUS_CACHED, None
+            # Ο χρόνος ανάγνωσης του αρχείου καταγράφεται στο πρώτο φύλλο που διαβάστηκε από αυτό
+            file_stats = stats if status == STATUS_MERGED else PhaseStats()
+            if status == STATUS_MERGED:
+                stats = PhaseStats()
+            if not self.merge_sheet(index, source, rows, error, status, file_backend, file_stats, file_header):
+                break
+        if reader is not None:
+            reader.close()
+
+    def replay_source(self, source, entry):
+        # Ένα αρχείο που είχε ολοκληρωθεί πριν από τη διακοπή: οι γραμμές του ξαναγράφονται από το checkpoint
+        started = set()
+        try:
+            file_results = [(index, checkpoint_file_result(fields)) for index, fields in entry[3]]
+            for index, rows in self.checkpoint.replay(entry):
+                if index not in started:
+                    started.add(index)
+                    self.start_dedup(index, source)
+                if self.emit_rows(index, self.label(index, source.name), rows, record=False) is None:
+                    return
+        except Exception as e:
+            self.fail(f"❌ Σφάλμα κατά την ανάγνωση του checkpoint: {e}", e)
+            return
+        # Οι τιμές που γράφτηκαν κενές υπάρχουν ήδη στα FileResult του checkpoint
+        self.conflicts = []
+        for index, file_result in file_results:
+            self.add_file_result(index, file_result)
+
+    def reuse_source(self, source):
+        # Οι γραμμές ενός αρχείου που δεν άλλαξε μένουν (ή αντιγράφονται) από το υπάρχον αρχείο εξόδου
+        entry = self.reused[source.name]
+        wall, cpu = time.perf_counter(), time.process_time()
+        try:
+            self.writer.copy_source(entry)
+        except Exception as e:
+            return self.fail(f"❌ Σφάλμα κατά την αποθήκευση του αρχείου: {e}", e)
+        self.write_stats.wall += time.perf_counter() - wall
+        self.write_stats.cpu += time.process_time() - cpu
+        self.add_file_result(0, FileResult(source.name, STATUS_REUSED, entry.rows))
+        return True
+
+    def rewind_output(self):
+        # Με checkpoint θέσεων, πριν γραφτεί το πρώτο αρχείο που δεν είχε ολοκληρωθεί: το αρχείο εξόδου επιστρέφει
+        # στο τέλος των ολοκληρωμένων αρχείων που ξαναχρησιμοποιήθηκαν (βλ. MergeCheckpoint.rewind)
+        checkpoint = self.checkpoint
+        if checkpoint is None or checkpoint.partial_paths is None or self.rewound:
+            return True
+        self.rewound = True
+        try:
+            self.writer.rewind(checkpoint.rewind())
+        except Exception as e:
+            return self.fail(f"❌ Σφάλμα κατά την αποθήκευση του αρχείου: {e}", e)
+        return True
+
+    def end_source(self, source):
+        # Καταγράφει στο manifest τις γραμμές που μόλις γράφτηκαν από ένα αρχείο
+        file_result = self.result.files[-1]
+        try:
+            self.writer.end_source(source, file_result.row_count, file_result.status != STATUS_FAILED)
+        except Exception as e:
+            self.fail(f"❌ Σφάλμα κατά την αποθήκευση του αρχείου: {e}", e)
+
+    # === Ολοκλήρωση ===
+
+    def stop_output(self):
+        # Η συγχώνευση σταματά πριν ολοκληρωθεί. Με checkpoint θέσεων το προσωρινό αρχείο εξόδου μένει για τη
+        # συνέχεια, αλλιώς διαγράφεται.
+        if self.writer is not None:
+            if self.checkpoint is not None and self.checkpoint.partial_paths is not None:
+                self.writer.suspend()
+            else:
+                self.writer.abort()
+        if self.checkpoint is not None:
+            self.checkpoint.close()
+
+    def finalise(self):
+        result = self.result
+        for sheet_name, aligner in zip(self.sheet_names, self.aligners):
+            if aligner is not None:
+                where = f" ({sheet_name})" if self.multi_sheet else ""
+                self.log_message(f"🧭 Αντιστοίχιση στηλών{where}: {aligner.signature_count} διαφορετικές "
+                                 f"επικεφαλίδες")
+        self.finish_dedup()
+        self.save_cache()
+
+        if result.cancelled or result.error is not None:
+            self.stop_output()
+            if self.checkpoint is not None:
+                self.log_message("💾 Η πρόοδος αποθηκεύτηκε στο checkpoint· η συγχώνευση μπορεί να συνεχίσει από "
+                                 "εκεί που σταμάτησε (--resume).")
+            if result.cancelled:
+                self.log_message("⏹ Η συγχώνευση ακυρώθηκε από τον χρήστη. Το αρχείο εξόδου έμεινε όπως ήταν."
+                                 if self.previous is not None else
+                                 "⏹ Η συγχώνευση ακυρώθηκε από τον χρήστη. Δεν δημιουργήθηκε αρχείο εξόδου.")
+            return self.finish()
+
+        if not self.write_result():
+            if self.checkpoint is not None:
+                self.checkpoint.close()
+            return self.finish()
+        # Η συγχώνευση ολοκληρώθηκε, άρα το checkpoint δεν χρειάζεται πια
+        if self.checkpoint is not None:
+            self.checkpoint.remove()
+        self.log_summary()
+        self.finish()
+        log_performance_summary(result, self.log_message, self.config.slowest_files)
+        return result
+
+    def finish_dedup(self):
+        # Οι διπλές γραμμές κάθε αρχείου· με 'last'/'newest' αφαιρούνται τώρα από τις κρατημένες γραμμές
+        for sheet_name, sheet_result, dedup in zip(self.sheet_names, self.sheet_results, self.deduplicators):
+            if dedup is None:
+                continue
+            if dedup.buffered:
+                sheet_result.rows = dedup.survivors(sheet_result.rows)
+            file_results = {f.filename: f for f in sheet_result.files}
+            for file, dropped in enumerate(dedup.dropped):
+                if not dropped:
+                    continue
+                filename = dedup.files[file]
+                if dedup.buffered:
+                    file_results[filename].row_count -= dropped
+                    file_results[filename].duplicate_rows = dropped
+                line, other, other_line = dedup.examples[file]
+                where = "στο ίδιο αρχείο" if other == file else f"στο {dedup.files[other]}"
+                label = f"{filename} [{sheet_name}]" if self.multi_sheet else filename
+                self.log_message(f"🔁 {label}: {dropped} διπλές γραμμές αφαιρέθηκαν "
+                                 f"(π.χ. η γραμμή {line} υπάρχει και {where}, γραμμή {other_line})")
+
+    def save_cache(self):
+        cache = self.cache
+        if cache is None:
+            return
+        # Οι εγγραφές των αρχείων που δεν υπάρχουν πια αφαιρούνται μόνο αν η σάρωση ολοκληρώθηκε
+        if self.scan_complete:
+            cache.prune(source.name for source in self.sources)
+        try:
+            cache.save()
+        except Exception as e:
+            self.log_message(f"⚠ Δεν ήταν δυνατή η αποθήκευση της cache: {e}")
+        self.log_message(f"🗃️ Cache: {cache.hits} από την cache, {cache.misses} νέα ή τροποποιημένα, "
+                         f"{cache.evicted} εγγραφές διαγραμμένων αρχείων αφαιρέθηκαν")
+
+    def write_result(self):
+        # === Αποθήκευση όλων των συγχωνευμένων γραμμών σε νέο αρχείο ===
+        config, result = self.config, self.result
+        if self.writer is not None:
+            wall, cpu = time.perf_counter(), time.process_time()
+            try:
+                self.writer.close()
+                self.log_message(f"📂 Το αρχείο συγχωνεύτηκε με επιτυχία: {', '.join(output_filenames(config))}")
+            except Exception as e:
+                self.writer.abort()
+                return self.fail(f"❌ Σφάλμα κατά την αποθήκευση του αρχείου: {e}", e)
+            self.write_stats.wall += time.perf_counter() - wall
+            self.write_stats.cpu += time.process_time() - cpu
+            result.timings['write'] = self.write_stats.wall
+        elif config.write_output:
+            phase = Measurement().start()
+            try:
+                if self.multi_sheet:
+                    write_sheets_output(result.sheets, config.output_path, self.output_format, config.compression)
+                else:
+                    write_output(result.rows, config.output_path, config.output_format,
+                                 compression=config.compression, header=result.header)
+                self.log_message(f"📂 Το αρχείο συγχωνεύτηκε με επιτυχία: {', '.join(output_filenames(config))}")
+            except Exception as e:
+                phase.stop()
+                return self.fail(f"❌ Σφάλμα κατά την αποθήκευση του αρχείου: {e}", e)
+            self.end_phase('write', phase)
+        return True
+
+    def log_summary(self):
+        # === Τελική καταγραφή στατιστικών συγχώνευσης στο log ===
+        result = self.result
+        for sheet_name, sheet_result in result.sheets.items():
+            self.log_message(f"📑 {sheet_name}: {sheet_result.success_count} από {sheet_result.total} αρχεία, "
+                             f"{sheet_result.row_count} γραμμές")
+        self.log_message(f"📊 Συνολικά αρχεία: {result.total}")
+        self.log_message(f"✅ Επιτυχώς συγχωνεύθηκαν: {result.success_count}")
+        if self.config.dedup:
+            self.log_message(f"🔁 Διπλές γραμμές που αφαιρέθηκαν: {result.duplicate_count}")
+        self.log_message(f"⚠ Προβληματικά αρχεία: {len(result.failed_files)}")
+        for f, reason in result.failed_files:
+            self.log_message(f"  - {f}: {reason}")
+        conflicting = [f for f in result.files if f.conflict_count]
+        if conflicting:
+            self.log_message(f"⚠ Αρχεία με τιμές που γράφτηκαν κενές (άλλος τύπος από τη στήλη): {len(conflicting)}")
+            for f in conflicting:
+                self.log_message(f"  - {f.label}: {f.conflict_count} τιμές ({'; '.join(f.conflicts)})")
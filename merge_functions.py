@@ -1,131 +1,254 @@
 import os
-import pandas as pd
+import sys
+import argparse
 from datetime import datetime
+from multiprocessing import freeze_support
+from excel_reader import AUTO_BACKEND, BACKENDS, compare_backends, read_excel_sheets
+from merge_dedup import DEDUP_POLICIES, KEEP_FIRST
+from merge_engine import DEFAULT_INCLUDE, OUTPUT_FORMATS, MergeConfig, list_source_files, output_filenames, run_merge
+from merge_prefetch import DEFAULT_PREFETCH_FILES
+from merge_preflight import run_preflight
+from merge_watch import DEFAULT_DEBOUNCE, DEFAULT_INTERVAL, run_watch
+
+
+# Κωδικοί εξόδου της γραμμής εντολών (το argparse χρησιμοποιεί το 2 για λάθος ορίσματα)
+EXIT_OK = 0
+EXIT_ERROR = 1
+EXIT_PARTIAL = 3
+
+
+# Ρωτά τον χρήστη (μόνο σε διαδραστικό τερματικό) αν θα αντικατασταθούν τα υπάρχοντα αρχεία εξόδου
+
+def confirm_overwrite(output_paths, policy):
+    """
+    Εφαρμόζει την πολιτική αντικατάστασης για τα αρχεία εξόδου που υπάρχουν ήδη.
+
+    Parameters:
+    - output_paths: οι διαδρομές όλων των αρχείων εξόδου (με πολλά φύλλα σε csv/parquet/feather ένα αρχείο
+      ανά φύλλο, βλ. output_filenames)
+    - policy: 'ask' (ερώτηση, μόνο σε τερματικό), 'always' (αντικατάσταση) ή 'never' (διακοπή)
+
+    Returns:
+    - True αν η συγχώνευση μπορεί να συνεχίσει
+    """
+    existing = [path for path in output_paths if os.path.exists(path)]
+    if not existing or policy == 'always':
+        return True
+    if policy == 'ask' and sys.stdin.isatty():
+        names = ', '.join(f"'{path}'" for path in existing)
+        question = (f"Το αρχείο {names} υπάρχει ήδη. Θέλεις να αντικατασταθεί;" if len(existing) == 1 else
+                    f"Τα αρχεία {names} υπάρχουν ήδη. Θέλεις να αντικατασταθούν;")
+        answer = input(f"❓ {question} (ν/ο): ").strip().lower()
+        return answer in ('ν', 'y')
+    return False
+
+
+# Διαβάζει κάθε αρχείο του φακέλου με όλα τα διαθέσιμα backends και αναφέρει όσα δεν συμφωνούν με το openpyxl
+
+def check_backends(config, log):
+    """
+    Ελέγχει ότι τα γρήγορα backends εξάγουν τις ίδιες γραμμές με το openpyxl για όλα τα αρχεία του φακέλου.
+
+    Parameters:
+    - config: MergeConfig με τον φάκελο, το φύλλο και τα μοτίβα αρχείων
+    - log: συνάρτηση καταγραφής μηνυμάτων
+
+    Returns:
+    - EXIT_OK αν όλα τα backends συμφωνούν, αλλιώς EXIT_ERROR
+    """
+    filenames = list_source_files(config.folder, [config.master_filename, config.output_filename],
+                                  config.include, config.exclude, config.recursive)
+    mismatch_count = 0
+    for filename in filenames:
+        for sheet_name in config.merge_sheets:
+            for backend, difference in compare_backends(os.path.join(config.folder, filename),
+                                                        sheet_name, config.skip_rows):
+                log(f"❌ {filename} [{backend}]: {difference}")
+                mismatch_count += 1
+    log(f"📊 Έλεγχος backends: {len(filenames)} αρχεία, {mismatch_count} διαφορές")
+    return EXIT_OK if mismatch_count == 0 else EXIT_ERROR
+
+
+# Ορίζει τα ορίσματα της γραμμής εντολών
+
+def build_parser():
+    """
+    Δημιουργεί τον argparse parser της γραμμής εντολών.
+    """
+    parser = argparse.ArgumentParser(
+        description="Συγχώνευση γραμμών από αρχεία Excel κάτω από την επικεφαλίδα ενός master αρχείου (χωρίς GUI).")
+    parser.add_argument('-f', '--folder', default='merge_files', help="φάκελος με τα αρχεία Excel (προεπιλογή: merge_files)")
+    parser.add_argument('-m', '--master', default='master.xlsx', help="αρχείο με την επικεφαλίδα (προεπιλογή: master.xlsx)")
+    parser.add_argument('-o', '--output', default='merged_output.xlsx', help="αρχείο εξόδου (προεπιλογή: merged_output.xlsx)")
+    parser.add_argument('-s', '--sheet', action='append',
+                        help="φύλλο προς συγχώνευση (προεπιλογή: το 1ο φύλλο του master)· μπορεί να δοθεί πολλές φορές "
+                             "για συγχώνευση πολλών φύλλων με ένα άνοιγμα κάθε αρχείου")
+    parser.add_argument('--all-sheets', action='store_true', help="συγχώνευση όλων των φύλλων του master")
+    parser.add_argument('--skip-rows', type=int, default=1, help="γραμμές επικεφαλίδας που αγνοούνται (προεπιλογή: 1)")
+    parser.add_argument('--include', action='append', metavar='GLOB',
+                        help="μοτίβο αρχείων προς συγχώνευση, μπορεί να δοθεί πολλές φορές (προεπιλογή: *.xlsx και *.xlsm)")
+    parser.add_argument('--exclude', action='append', default=[], metavar='GLOB',
+                        help="μοτίβο αρχείων ή υποφακέλων που αγνοούνται, μπορεί να δοθεί πολλές φορές")
+    parser.add_argument('-r', '--recursive', action='store_true', help="συγχώνευση και των αρχείων των υποφακέλων")
+    parser.add_argument('-w', '--workers', type=int, default=os.cpu_count() or 1,
+                        help="παράλληλες διεργασίες ανάγνωσης (προεπιλογή: πλήθος πυρήνων)")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, dest='output_format',
+                        help="μορφή εξόδου (προεπιλογή: από την κατάληξη του αρχείου εξόδου)")
+    parser.add_argument('--compression', choices=('snappy', 'zstd', 'gzip', 'lz4', 'none'),
+                        help="συμπίεση για parquet/feather (προεπιλογή: snappy για parquet, lz4 για feather)")
+    parser.add_argument('--overwrite', choices=('ask', 'always', 'never'), default='ask',
+                        help="τι γίνεται αν υπάρχει ήδη το αρχείο εξόδου (προεπιλογή: ask, ή never χωρίς τερματικό)")
+    parser.add_argument('--backend', choices=(AUTO_BACKEND,) + BACKENDS, default=AUTO_BACKEND,
+                        help="τρόπος ανάγνωσης των αρχείων (προεπιλογή: auto, το γρηγορότερο διαθέσιμο)")
+    parser.add_argument('--check-backends', action='store_true',
+                        help="έλεγχος ότι όλα τα backends δίνουν τις ίδιες γραμμές (χωρίς συγχώνευση)")
+    parser.add_argument('--align-columns', action='store_true',
+                        help="αντιστοίχιση των στηλών κάθε αρχείου στο master με βάση το όνομα της επικεφαλίδας")
+    parser.add_argument('--dedup', choices=DEDUP_POLICIES, nargs='?', const=KEEP_FIRST,
+                        help="αφαίρεση διπλών γραμμών: κρατιέται η πρώτη (first, προεπιλογή), η τελευταία (last) "
+                             "ή αυτή από το πιο πρόσφατο αρχείο (newest)")
+    parser.add_argument('--dedup-key', action='append', default=[], metavar='COLUMN',
+                        help="στήλη-κλειδί για τις διπλές γραμμές (όνομα στο master ή γράμμα· μπορεί να δοθεί πολλές φορές)· "
+                             "χωρίς αυτή συγκρίνεται ολόκληρη η γραμμή")
+    parser.add_argument('--preflight', action='store_true',
+                        help="γρήγορος έλεγχος όλων των αρχείων (φύλλο, επικεφαλίδα, zip) πριν από τη συγχώνευση")
+    parser.add_argument('--preflight-only', action='store_true',
+                        help="μόνο ο γρήγορος έλεγχος των αρχείων, χωρίς συγχώνευση")
+    parser.add_argument('--watch', action='store_true',
+                        help="παρακολούθηση του φακέλου: νέα συγχώνευση σε κάθε αλλαγή, με ανάγνωση μόνο των νέων/τροποποιημένων αρχείων (Ctrl+C για τέλος)")
+    parser.add_argument('--watch-interval', type=float, default=DEFAULT_INTERVAL, metavar='SECONDS',
+                        help=f"κάθε πόσα δευτερόλεπτα ελέγχεται ο φάκελος (προεπιλογή: {DEFAULT_INTERVAL:g})")
+    parser.add_argument('--debounce', type=float, default=DEFAULT_DEBOUNCE, metavar='SECONDS',
+                        help=f"δευτερόλεπτα χωρίς νέες αλλαγές πριν από τη συγχώνευση (προεπιλογή: {DEFAULT_DEBOUNCE:g})")
+    parser.add_argument('--append', action='store_true',
+                        help="ενημέρωση του υπάρχοντος αρχείου εξόδου csv: διαβάζονται μόνο τα νέα/τροποποιημένα αρχεία "
+                             "και αφαιρούνται οι γραμμές των διαγραμμένων (με βάση το <αρχείο εξόδου>.manifest.json)")
+    parser.add_argument('--checkpoint', action='store_true',
+                        help="καταγραφή της προόδου στο <αρχείο εξόδου>.checkpoint, ώστε μια συγχώνευση που "
+                             "διακόπηκε να συνεχίσει με --resume")
+    parser.add_argument('--resume', action='store_true',
+                        help="συνέχεια μιας συγχώνευσης που διακόπηκε, από το <αρχείο εξόδου>.checkpoint")
+    parser.add_argument('--no-streaming', action='store_true',
+                        help="συγκέντρωση όλων των γραμμών στη μνήμη και εγγραφή στο τέλος (αντί για streaming)")
+    parser.add_argument('--memory-budget', type=int, metavar='MB',
+                        help="όριο μνήμης για τις γραμμές: μεγάλα φύλλα γράφονται σε κομμάτια και διαβάζονται "
+                             "ταυτόχρονα μόνο όσα αρχεία χωρούν στο όριο")
+    parser.add_argument('--prefetch', type=int, default=DEFAULT_PREFETCH_FILES, metavar='N',
+                        help=f"με -w 1, πόσα από τα επόμενα αρχεία διαβάζονται στη μνήμη όσο αναλύεται το τρέχον "
+                             f"(0 = κανένα, προεπιλογή: {DEFAULT_PREFETCH_FILES})")
+    parser.add_argument('--no-cache', action='store_true', help="να μη χρησιμοποιηθεί η cache γραμμών")
+    parser.add_argument('--cache-hash', action='store_true', help="σύγκριση hash περιεχομένου όταν αλλάξει το mtime")
+    parser.add_argument('--trace-memory', action='store_true',
+                        help="μέτρηση μέγιστης μνήμης ανά φάση και ανά αρχείο (πιο αργή εκτέλεση)")
+    parser.add_argument('--slowest', type=int, default=5, metavar='N',
+                        help="πόσα από τα πιο αργά αρχεία εμφανίζονται στη σύνοψη (προεπιλογή: 5)")
+    parser.add_argument('--profile', metavar='FILE', help="αποθήκευση προφίλ cProfile της συγχώνευσης (pstats)")
+    parser.add_argument('-q', '--quiet', action='store_true', help="να μην εμφανίζεται κάθε συγχωνευμένη γραμμή")
+    parser.add_argument('--log-file', help="αποθήκευση του log και σε αρχείο κειμένου")
+    return parser
+
+
+# Σημείο εισόδου της γραμμής εντολών· επιστρέφει κωδικό εξόδου (0 = επιτυχία)
+
+def main(argv=None):
+    """
+    Εκτελεί τη συγχώνευση από τη γραμμή εντολών.
+
+    Returns:
+    - EXIT_OK αν όλα τα αρχεία συγχωνεύτηκαν, EXIT_PARTIAL αν κάποια απέτυχαν (ή, με --preflight-only,
+      αν ο έλεγχος βρήκε προβλήματα),
+      EXIT_ERROR σε μοιραίο σφάλμα (φάκελος, master, αρχείο εξόδου)
+    """
+    args = build_parser().parse_args(argv)
+
+    log_file = None
+    if args.log_file:
+        try:
+            # Στην παρακολούθηση το log γράφεται αμέσως, ώστε η σύνοψη στο αρχείο να είναι πάντα τρέχουσα
+            log_file = open(args.log_file, 'w', encoding='utf-8', buffering=1 if args.watch else -1)
+        except OSError as e:
+            print(f"❌ Σφάλμα κατά το άνοιγμα του αρχείου log: {e}", file=sys.stderr)
+            return EXIT_ERROR
 
-def merge_excel_rows(folder_path, master_filename, output_filename, sheet_name):
-    master_path = os.path.join(folder_path, master_filename)
-    log_lines = []
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_lines.append(f"=== Αναφορά συγχώνευσης αρχείων Excel ({timestamp}) ===\n")
-
-    try:
-        master_df = pd.read_excel(master_path, header=None, nrows=1, sheet_name=sheet_name, engine='openpyxl')
-    except Exception as e:
-        error_msg = f"❌ Σφάλμα στο master αρχείο '{master_filename}' (φύλλο '{sheet_name}'): {e}"
-        print(error_msg)
-        log_lines.append(error_msg)
-        write_log(folder_path, log_lines)
-        return
-
-    merged_data = [master_df.iloc[0].tolist()]
-    total_files = 0
-    success_count = 0
-    failed_files = []
-
-    for filename in os.listdir(folder_path):
-        if not filename.endswith('.xlsx') or filename == master_filename:
-            continue
-
-        total_files += 1
-        file_path = os.path.join(folder_path, filename)
+    def log(message):
+        print(message)
+        if log_file is not None:
+            log_file.write(message + '\n')
 
-        try:
-            df = pd.read_excel(file_path, header=None, sheet_name=sheet_name, engine='openpyxl')
-
-            if len(df) >= 2:
-                row_data = df.iloc[1].tolist()
-                merged_data.append(row_data)
-                success_count += 1
-
-                msg = f"✅ Επεξεργασία αρχείου: {filename}"
-                row_msg = f"   ➤ 2η γραμμή: {row_data}"
-                print(msg)
-                print(row_msg)
-                log_lines.append(msg)
-                log_lines.append(row_msg)
-            else:
-                reason = "Λιγότερες από 2 γραμμές"
-                failed_files.append((filename, reason))
-                msg = f"⚠ Το αρχείο '{filename}' δεν έχει τουλάχιστον 2 γραμμές. Παραλείπεται."
-                print(msg)
-                log_lines.append(msg)
-
-        except ValueError:
-            reason = "Φύλλο δεν βρέθηκε"
-            failed_files.append((filename, reason))
-            msg = f"⚠ Το φύλλο '{sheet_name}' δεν βρέθηκε στο αρχείο '{filename}'. Παραλείπεται."
-            print(msg)
-            log_lines.append(msg)
-        except Exception as e:
-            reason = str(e)
-            failed_files.append((filename, reason))
-            msg = f"⚠ Σφάλμα στο αρχείο '{filename}': {e}. Παραλείπεται."
-            print(msg)
-            log_lines.append(msg)
-
-    # Αποθήκευση αποτελεσμάτων
-    output_path = os.path.join(folder_path, output_filename)
-    try:
-        merged_df = pd.DataFrame(merged_data)
-        merged_df.to_excel(output_path, header=False, index=False)
-        success_msg = f"\n✅ Το αρχείο εξόδου δημιουργήθηκε επιτυχώς: {output_path}"
-        print(success_msg)
-        log_lines.append(success_msg)
-    except Exception as e:
-        error_msg = f"❌ Σφάλμα κατά την αποθήκευση του αρχείου εξόδου: {e}"
-        print(error_msg)
-        log_lines.append(error_msg)
-
-    # Τελική αναφορά
-    report = [
-        "\n📊 Αναφορά:",
-        f"🔢 Συνολικά αρχεία (εκτός master): {total_files}",
-        f"✅ Επιτυχώς διαβασμένα: {success_count}",
-        f"❌ Προβληματικά αρχεία: {len(failed_files)}"
-    ]
-    print('\n'.join(report))
-    log_lines.extend(report)
-
-    if failed_files:
-        log_lines.append("📌 Λίστα προβληματικών:")
-        for fname, reason in failed_files:
-            line = f" - {fname}: {reason}"
-            print(line)
-            log_lines.append(line)
-
-    write_log(folder_path, log_lines)
-
-def write_log(folder_path, lines):
-    log_path = os.path.join(folder_path, 'merge_log.txt')
     try:
-        with open(log_path, 'w', encoding='utf-8') as f:
-            for line in lines:
-                f.write(line + '\n')
-        print(f"\n📝 Αρχείο καταγραφής δημιουργήθηκε: {log_path}")
-    except Exception as e:
-        print(f"❌ Σφάλμα κατά την αποθήκευση του αρχείου log: {e}")
-
-def main():
-    folder_path = 'merge_files'
-    master_filename = 'master.xlsx'
-    output_filename = 'merged_output.xlsx'
-    sheet_name = 'Δημοτικά'
-    
-    output_path = os.path.join(folder_path, output_filename)
-
-    # 🔁 Έλεγχος αν υπάρχει ήδη το αρχείο εξόδου
-    if os.path.exists(output_path):
-        answer = input(f"❓ Το αρχείο '{output_filename}' υπάρχει ήδη. Θέλεις να διαγραφεί; (ν/ο): ").strip().lower()
-        if answer == 'ν':
+        if not os.path.isdir(args.folder):
+            log(f"❌ Ο φάκελος '{args.folder}' δεν υπάρχει.")
+            return EXIT_ERROR
+        master_path = os.path.join(args.folder, args.master)
+        if not os.path.exists(master_path):
+            log(f"❌ Το αρχείο master '{master_path}' δεν βρέθηκε.")
+            return EXIT_ERROR
+
+        sheet_names = args.sheet
+        if not sheet_names or args.all_sheets:
+            master_sheets = read_excel_sheets(master_path)
+            if not master_sheets:
+                log(f"❌ Το αρχείο '{args.master}' δεν περιέχει αναγνώσιμα φύλλα.")
+                return EXIT_ERROR
+            sheet_names = master_sheets if args.all_sheets else master_sheets[:1]
+        # Τα φύλλα που δόθηκαν δύο φορές συγχωνεύονται μία φορά
+        sheet_names = list(dict.fromkeys(sheet_names))
+
+        config = MergeConfig(args.folder, args.master, args.output, sheet_names[0],
+                             sheet_names=tuple(sheet_names) if len(sheet_names) > 1 else (),
+                             skip_rows=args.skip_rows, workers=max(1, args.workers),
+                             use_cache=not args.no_cache, cache_hash=args.cache_hash,
+                             include=tuple(args.include or DEFAULT_INCLUDE), exclude=tuple(args.exclude),
+                             recursive=args.recursive,
+                             output_format=args.output_format, compression=args.compression,
+                             streaming=not args.no_streaming,
+                             log_rows=not args.quiet,
+                             backend=args.backend, trace_memory=args.trace_memory,
+                             profile_path=args.profile, slowest_files=max(0, args.slowest),
+                             align_columns=args.align_columns, memory_budget=args.memory_budget,
+                             dedup=args.dedup or (KEEP_FIRST if args.dedup_key else None),
+                             dedup_columns=tuple(args.dedup_key), append=args.append,
+                             checkpoint=args.checkpoint, resume=args.resume,
+                             prefetch=max(0, args.prefetch))
+        if args.check_backends:
+            return check_backends(config, log)
+        if args.preflight or args.preflight_only:
+            preflight = run_preflight(config, log=log)
+            if preflight.error is not None:
+                return EXIT_ERROR
+            if args.preflight_only:
+                return EXIT_OK if preflight.ok else EXIT_PARTIAL
+
+        # Η ενημέρωση του αρχείου εξόδου δεν χρειάζεται επιβεβαίωση αντικατάστασης
+        # Με πολλά φύλλα σε csv/parquet/feather γράφεται ένα αρχείο ανά φύλλο (<όνομα>_<φύλλο>.<κατάληξη>)
+        output_paths = [os.path.join(args.folder, filename) for filename in output_filenames(config)]
+        if not args.append and not confirm_overwrite(output_paths, args.overwrite):
+            existing = ', '.join(f"'{filename}'" for filename, path in zip(output_filenames(config), output_paths)
+                                 if os.path.exists(path))
+            log(f"ℹ️ Το αρχείο εξόδου υπάρχει ήδη και δεν αντικαταστάθηκε: {existing}")
+            return EXIT_ERROR
+
+        if args.watch:
             try:
-                os.remove(output_path)
-                print(f"🗑️ Το αρχείο '{output_filename}' διαγράφηκε.")
-            except Exception as e:
-                print(f"❌ Σφάλμα κατά τη διαγραφή του αρχείου: {e}")
+                result = run_watch(config, log=log, interval=max(0.1, args.watch_interval),
+                                   debounce=max(0.0, args.debounce))
+            except KeyboardInterrupt:
+                log("⏹ Η παρακολούθηση του φακέλου σταμάτησε.")
+                return EXIT_OK
         else:
-            print("ℹ️ Το αρχείο δεν διαγράφηκε. Ενδέχεται να γίνει αντικατάσταση εάν δημιουργηθεί νέο.")
+            log(f"=== Συγχώνευση αρχείων Excel ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')}) ===")
+            result = run_merge(config, log=log)
+    finally:
+        if log_file is not None:
+            log_file.close()
+
+    if result.error is not None:
+        return EXIT_ERROR
+    if result.failed_files:
+        return EXIT_PARTIAL
+    return EXIT_OK
 
-    merge_excel_rows(folder_path, master_filename, output_filename, sheet_name)
 
 if __name__ == '__main__':
-    main()
+    freeze_support()
+    sys.exit(main())
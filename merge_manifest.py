@@ -0,0 +1,127 @@
+import os
+import json
+import hashlib
+from dataclasses import asdict, dataclass, field
+from merge_cache import file_digest
+
+
+MANIFEST_SUFFIX = '.manifest.json'
+MANIFEST_VERSION = 1
+
+
+@dataclass
+class ManifestEntry:
+    """
+    Οι γραμμές που έδωσε ένα αρχείο πηγής στο αρχείο εξόδου.
+
+    Parameters:
+    - name: η διαδρομή του αρχείου μέσα στον φάκελο (όπως το SourceFile.name)
+    - size, mtime_ns: το μέγεθος και το mtime του αρχείου όταν διαβάστηκε (size -1 = οι γραμμές του γράφτηκαν
+      μόνο εν μέρει, οπότε το αρχείο θεωρείται πάντα τροποποιημένο)
+    - digest: το hash περιεχομένου του αρχείου (βλ. file_digest)
+    - start, end: η θέση (σε bytes) των γραμμών του μέσα στο αρχείο εξόδου
+    - rows: πλήθος γραμμών
+    """
+    name: str
+    size: int
+    mtime_ns: int
+    digest: str
+    start: int
+    end: int
+    rows: int = 0
+
+
+@dataclass
+class OutputManifest:
+    """
+    Το αρχείο που συνοδεύει ένα αρχείο εξόδου csv (<αρχείο εξόδου>.manifest.json) και καταγράφει ποιο αρχείο
+    πηγής έδωσε ποιες γραμμές, ώστε μια επόμενη συγχώνευση να ενημερώσει μόνο τις γραμμές των αρχείων που
+    προστέθηκαν, άλλαξαν ή διαγράφηκαν.
+
+    Parameters:
+    - signature: το αποτύπωμα των ρυθμίσεων που καθορίζουν τις γραμμές (βλ. merge_signature)
+    - header_end: πού τελειώνει η επικεφαλίδα μέσα στο αρχείο εξόδου (bytes)
+    - width: το πλάτος της φαρδύτερης γραμμής που έχει γραφτεί (το csv συμπληρώνει τις γραμμές ως αυτό)
+    - output_size, output_mtime_ns: το αρχείο εξόδου όπως γράφτηκε· αν αλλάξει (π.χ. ανοίχτηκε και
+      αποθηκεύτηκε στο Excel), το manifest δεν ισχύει πια
+    - entries: ένα ManifestEntry για κάθε αρχείο πηγής, με τη σειρά που βρίσκονται οι γραμμές τους
+    """
+    signature: str
+    header_end: int = 0
+    width: int = 0
+    output_size: int = 0
+    output_mtime_ns: int = 0
+    entries: list = field(default_factory=list)
+
+    @classmethod
+    def load(cls, output_path):
+        """
+        Διαβάζει το manifest ενός αρχείου εξόδου. Επιστρέφει None αν λείπει ή είναι κατεστραμμένο.
+        """
+        try:
+            with open(manifest_path(output_path), encoding='utf-8') as f:
+                data = json.load(f)
+            if data.get('version') != MANIFEST_VERSION:
+                return None
+            entries = [ManifestEntry(**entry) for entry in data['entries']]
+            return cls(data['signature'], data['header_end'], data['width'], data['output_size'],
+                       data['output_mtime_ns'], entries)
+        except Exception:
+            return None
+
+    def save(self, output_path):
+        """
+        Αποθηκεύει το manifest δίπλα στο αρχείο εξόδου (μέσω προσωρινού αρχείου, όπως η cache).
+        """
+        path = manifest_path(output_path)
+        data = asdict(self)
+        data['version'] = MANIFEST_VERSION
+        with open(path + '.tmp', 'w', encoding='utf-8') as f:
+            json.dump(data, f, ensure_ascii=False, indent=1)
+        os.replace(path + '.tmp', path)
+
+    def matches(self, output_path, signature):
+        """
+        True αν το manifest αντιστοιχεί στις ίδιες ρυθμίσεις και στο αρχείο εξόδου όπως βρίσκεται στον δίσκο.
+        """
+        try:
+            stat = os.stat(output_path)
+        except OSError:
+            return False
+        return (self.signature == signature and stat.st_size == self.output_size
+                and stat.st_mtime_ns == self.output_mtime_ns)
+
+    def unchanged(self, entry, source):
+        """
+        True αν το αρχείο πηγής είναι το ίδιο με αυτό που έδωσε τις γραμμές της εγγραφής. Όταν αλλάξει το
+        mtime/μέγεθος (π.χ. το αρχείο αντιγράφηκε ξανά), συγκρίνεται και το hash περιεχομένου.
+
+        Parameters:
+        - entry: το ManifestEntry του αρχείου
+        - source: το SourceFile της σάρωσης
+        """
+        if entry.size < 0:
+            return False
+        stat = source.stat or os.stat(source.path)
+        if stat.st_size == entry.size and stat.st_mtime_ns == entry.mtime_ns:
+            return True
+        if stat.st_size != entry.size:
+            return False
+        try:
+            return file_digest(source.path) == entry.digest
+        except OSError:
+            return False
+
+
+def manifest_path(output_path):
+    return output_path + MANIFEST_SUFFIX
+
+
+# Το αποτύπωμα όσων ρυθμίσεων αλλάζουν τις γραμμές του αρχείου εξόδου: αν διαφέρει, το αρχείο ξαναφτιάχνεται
+
+def merge_signature(config, header_rows):
+    """
+    Επιστρέφει ένα hash από το φύλλο, τις γραμμές επικεφαλίδας του master, το skip_rows και την αντιστοίχιση στηλών.
+    """
+    key = repr((config.merge_sheets[0], config.skip_rows, config.align_columns, header_rows))
+    return hashlib.blake2b(key.encode('utf-8'), digest_size=16).hexdigest()
@@ -0,0 +1,85 @@
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+
+
+# Πόσα από τα επόμενα αρχεία διαβάζονται εκ των προτέρων και πόσα bytes μπορούν να περιμένουν στη μνήμη
+DEFAULT_PREFETCH_FILES = 4
+DEFAULT_PREFETCH_BYTES = 256 * 1024 * 1024
+
+
+def read_file_bytes(filepath):
+    with open(filepath, 'rb') as f:
+        return f.read()
+
+
+class FilePrefetcher:
+    """
+    Διαβάζει στη μνήμη (σε νήματα) τα περιεχόμενα των επόμενων αρχείων όσο αναλύεται το τρέχον, ώστε σε φάκελο
+    δικτύου (SMB) ο χρόνος ανοίγματος και ανάγνωσης ενός αρχείου να επικαλύπτεται με την ανάλυση των προηγούμενων.
+
+    Δίνει (iterator) τα bytes κάθε αρχείου με τη σειρά του filepaths, ή None για ένα αρχείο που δεν προφορτώθηκε
+    (μεγαλύτερο από το όριο ή σφάλμα ανάγνωσης)· τότε ο αναγνώστης ανοίγει ο ίδιος το αρχείο και αναφέρει το σφάλμα.
+    Πρέπει να κλείνει με close().
+
+    Parameters:
+    - filepaths: οι διαδρομές των αρχείων με τη σειρά που θα χρειαστούν (iterable)· διαβάζεται σταδιακά, το
+      πολύ max_files διαδρομές μπροστά από το αρχείο που δόθηκε τελευταίο
+    - max_files: πόσα αρχεία διαβάζονται ή περιμένουν ταυτόχρονα (και πόσα νήματα ανάγνωσης)
+    - max_bytes: όριο για τα bytes που περιμένουν στη μνήμη (χωρίς το αρχείο που αναλύεται)· το πρώτο αρχείο
+      του παραθύρου διαβάζεται πάντα, εκτός αν είναι από μόνο του μεγαλύτερο από το όριο
+    """
+
+    def __init__(self, filepaths, max_files=DEFAULT_PREFETCH_FILES, max_bytes=DEFAULT_PREFETCH_BYTES):
+        self.max_files = max(1, max_files)
+        self.max_bytes = max_bytes
+        self._filepaths = iter(filepaths)
+        self._next = None
+        self._window = deque()
+        self._in_flight = 0
+        self._executor = ThreadPoolExecutor(max_workers=self.max_files, thread_name_prefix='prefetch')
+        self._fill()
+
+    def _fill(self):
+        while len(self._window) < self.max_files:
+            if self._next is None:
+                self._next = next(self._filepaths, None)
+                if self._next is None:
+                    return
+            filepath = self._next
+            try:
+                size = os.path.getsize(filepath)
+            except OSError:
+                size = 0
+            if size > self.max_bytes:
+                future = None
+            elif self._window and self._in_flight + size > self.max_bytes:
+                break
+            else:
+                future = self._executor.submit(read_file_bytes, filepath)
+                self._in_flight += size
+            self._next = None
+            self._window.append((size, future))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if not self._window:
+            raise StopIteration
+        size, future = self._window.popleft()
+        data = None
+        if future is not None:
+            self._in_flight -= size
+            try:
+                data = future.result()
+            except OSError:
+                data = None
+        self._fill()
+        return data
+
+    def close(self):
+        # Τα αρχεία που δεν έχουν ξεκινήσει δεν διαβάζονται· όσα διαβάζονται ήδη ολοκληρώνονται στο παρασκήνιο
+        self._filepaths, self._next = iter(()), None
+        self._window.clear()
+        self._executor.shutdown(wait=False, cancel_futures=True)
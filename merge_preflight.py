@@ -0,0 +1,210 @@
+import os
+import time
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from itertools import repeat
+from openpyxl.utils import get_column_letter, range_boundaries
+from excel_reader import get_workbook_metadata, read_header_rows
+from merge_engine import list_source_files, output_filenames
+
+
+@dataclass
+class PreflightResult:
+    """
+    Το αποτέλεσμα του προκαταρκτικού ελέγχου ενός φακέλου.
+
+    Parameters:
+    - files: τα αρχεία που ελέγχθηκαν
+    - problems: λίστα από (όνομα αρχείου, περιγραφή προβλήματος)
+    - seconds: διάρκεια του ελέγχου
+    - error: μήνυμα μοιραίου σφάλματος (π.χ. το master δεν διαβάζεται), αλλιώς None
+    - cancelled: True αν ο έλεγχος ακυρώθηκε
+    """
+    files: list = field(default_factory=list)
+    problems: list = field(default_factory=list)
+    seconds: float = 0.0
+    error: str = None
+    cancelled: bool = False
+
+    @property
+    def problem_files(self):
+        return sorted({filename for filename, _ in self.problems})
+
+    @property
+    def ok(self):
+        return self.error is None and not self.problems
+
+
+# Οι επικεφαλίδες συγκρίνονται ως κείμενο, χωρίς κενά στην αρχή/στο τέλος και χωρίς κενά κελιά στο τέλος
+
+def normalize_header_row(values):
+    """
+    Επιστρέφει τη γραμμή επικεφαλίδας ως λίστα κειμένων για σύγκριση.
+    """
+    cells = ['' if value is None else str(value).strip() for value in values]
+    while cells and cells[-1] == '':
+        cells.pop()
+    return cells
+
+
+def _header_differences(expected_rows, actual_rows):
+    problems = []
+    for row_number, expected in enumerate(expected_rows, start=1):
+        actual = normalize_header_row(actual_rows[row_number - 1]) if row_number <= len(actual_rows) else []
+        if actual == expected:
+            continue
+        width = max(len(actual), len(expected))
+        differences = [column for column in range(width)
+                       if (actual[column] if column < len(actual) else '') !=
+                       (expected[column] if column < len(expected) else '')]
+        column = differences[0]
+        found = actual[column] if column < len(actual) else ''
+        wanted = expected[column] if column < len(expected) else ''
+        message = (f"Η γραμμή επικεφαλίδας {row_number} διαφέρει από το master στη στήλη "
+                   f"{get_column_letter(column + 1)}: '{found}' αντί για '{wanted}'")
+        if len(differences) > 1:
+            message += f" (και σε άλλες {len(differences) - 1} στήλες)"
+        problems.append(message)
+    return problems
+
+
+# Ελέγχει ένα αρχείο χωρίς να διαβάσει τα δεδομένα του: μόνο τον κατάλογο του zip, το xl/workbook.xml
+# και την αρχή του φύλλου.
+
+def check_source_file(filepath, sheet_name, expected_header):
+    """
+    Επιστρέφει τα προβλήματα ενός αρχείου πηγής (κενή λίστα αν είναι εντάξει).
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+    - sheet_name: το φύλλο που θα συγχωνευτεί
+    - expected_header: οι κανονικοποιημένες γραμμές επικεφαλίδας του master (βλ. normalize_header_row)
+    """
+    try:
+        metadata = get_workbook_metadata(filepath)
+    except zipfile.BadZipFile:
+        return ["Το αρχείο είναι κατεστραμμένο ή δεν είναι αρχείο xlsx"]
+    except Exception as e:
+        return [f"Δεν ήταν δυνατή η ανάγνωση του αρχείου: {e}"]
+
+    if sheet_name not in metadata.sheet_paths:
+        return [f"Δεν υπάρχει το φύλλο '{sheet_name}' (φύλλα: {', '.join(metadata.sheet_names) or '-'})"]
+
+    try:
+        problems = _header_differences(expected_header, metadata.header_rows(sheet_name, len(expected_header)))
+        # Η διάσταση που δηλώνει το φύλλο δείχνει χωρίς ανάγνωση αν υπάρχουν γραμμές μετά την επικεφαλίδα
+        dimension = metadata.dimension(sheet_name)
+    except Exception as e:
+        return [f"Δεν ήταν δυνατή η ανάγνωση του φύλλου '{sheet_name}': {e}"]
+    if dimension:
+        try:
+            last_row = range_boundaries(dimension)[3]
+        except (TypeError, ValueError):
+            last_row = None
+        if last_row is not None and last_row <= len(expected_header):
+            problems.append("Το φύλλο δεν φαίνεται να έχει γραμμές δεδομένων μετά την επικεφαλίδα")
+    return problems
+
+
+# Ελέγχει όλα τα φύλλα ενός αρχείου (το zip ανοίγει μία φορά, τα μεταδεδομένα του κρατιούνται στη cache)
+
+def check_source_sheets(filepath, sheet_headers):
+    """
+    Επιστρέφει τα προβλήματα ενός αρχείου πηγής για κάθε φύλλο.
+
+    Parameters:
+    - filepath: η διαδρομή του αρχείου Excel
+    - sheet_headers: λίστα από (φύλλο, κανονικοποιημένες γραμμές επικεφαλίδας του master)
+    """
+    if len(sheet_headers) == 1:
+        return check_source_file(filepath, *sheet_headers[0])
+    problems = []
+    for sheet_name, expected_header in sheet_headers:
+        problems.extend(f"[{sheet_name}] {problem}" for problem in
+                        check_source_file(filepath, sheet_name, expected_header))
+    return problems
+
+
+def iter_check_results(filepaths, sheet_headers, workers=1):
+    """
+    Ελέγχει τα αρχεία σειριακά ή παράλληλα και επιστρέφει (yield) τα προβλήματα κάθε αρχείου
+    με τη σειρά της λίστας filepaths.
+    """
+    workers = min(workers, len(filepaths))
+    if workers <= 1:
+        for filepath in filepaths:
+            yield check_source_sheets(filepath, sheet_headers)
+        return
+
+    # Νήματα όπως στην προανάγνωση (merge_prefetch): ο έλεγχος κάθε αρχείου διαρκεί λίγα ms και είναι κυρίως
+    # ανάγνωση από τον δίσκο, οπότε το κόστος εκκίνησης διεργασιών θα ήταν μεγαλύτερο από τον ίδιο τον έλεγχο
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='preflight')
+    try:
+        yield from executor.map(check_source_sheets, filepaths, repeat(sheet_headers))
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+# Προκαταρκτικός έλεγχος: εντοπίζει όλα τα προβληματικά αρχεία πριν ξεκινήσει η (αργή) συγχώνευση
+
+def run_preflight(config, log=None, progress=None, cancel_event=None):
+    """
+    Ελέγχει ότι κάθε αρχείο του φακέλου ανοίγει, έχει το επιλεγμένο φύλλο και την ίδια επικεφαλίδα
+    (πρώτες skip_rows γραμμές) με το master, χωρίς να διαβάσει τα δεδομένα.
+
+    Parameters:
+    - config: MergeConfig με τις ρυθμίσεις της συγχώνευσης
+    - log: optional συνάρτηση που δέχεται ένα μήνυμα (str) για καταγραφή
+    - progress: optional συνάρτηση που δέχεται το ποσοστό προόδου (0-100)
+    - cancel_event: optional threading.Event για ακύρωση
+
+    Returns:
+    - PreflightResult
+    """
+    result = PreflightResult()
+    started = time.perf_counter()
+
+    def log_message(message):
+        if log is not None:
+            log(message)
+
+    sheet_headers = []
+    for sheet_name in config.merge_sheets:
+        try:
+            sheet_headers.append((sheet_name, [normalize_header_row(row) for row in
+                                               read_header_rows(config.master_path, sheet_name, config.skip_rows)]))
+        except Exception as e:
+            log_message(f"❌ Σφάλμα στο αρχείο master ή στο φύλλο '{sheet_name}': {e}")
+            result.error = str(e)
+            return result
+
+    result.files = list_source_files(config.folder, [config.master_filename] + output_filenames(config),
+                                     config.include, config.exclude, config.recursive)
+    sheet_list = ', '.join(f"'{sheet_name}'" for sheet_name, _ in sheet_headers)
+    log_message(f"🔍 Έλεγχος {len(result.files)} αρχείων (φύλλα {sheet_list})..." if len(sheet_headers) > 1
+                else f"🔍 Έλεγχος {len(result.files)} αρχείων (φύλλο {sheet_list})...")
+    filepaths = [os.path.join(config.folder, f) for f in result.files]
+    checks = iter_check_results(filepaths, sheet_headers, config.workers)
+    try:
+        for index, (filename, problems) in enumerate(zip(result.files, checks)):
+            for problem in problems:
+                result.problems.append((filename, problem))
+                log_message(f"⚠ {filename}: {problem}")
+            if progress:
+                progress(int(((index + 1) / len(result.files)) * 100))
+            if cancel_event is not None and cancel_event.is_set():
+                result.cancelled = True
+                break
+    finally:
+        checks.close()
+
+    result.seconds = time.perf_counter() - started
+    if result.cancelled:
+        log_message("⏹ Ο έλεγχος ακυρώθηκε.")
+    elif result.problems:
+        log_message(f"🔍 Έλεγχος σε {result.seconds:.1f} s: {len(result.problem_files)} από "
+                    f"{len(result.files)} αρχεία έχουν προβλήματα")
+    else:
+        log_message(f"🔍 Έλεγχος σε {result.seconds:.1f} s: όλα τα {len(result.files)} αρχεία είναι εντάξει")
+    return result
@@ -0,0 +1,145 @@
+import time
+import cProfile
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import dataclass
+
+
+@dataclass
+class PhaseStats:
+    """
+    Μετρήσεις μιας φάσης της συγχώνευσης ή της ανάγνωσης ενός αρχείου.
+
+    Parameters:
+    - wall: πραγματικός χρόνος σε δευτερόλεπτα
+    - cpu: χρόνος CPU της διεργασίας σε δευτερόλεπτα
+    - peak_memory: μέγιστη επιπλέον μνήμη Python (bytes) κατά τη φάση, ή None αν δεν παρακολουθείται η μνήμη
+    """
+    wall: float = 0.0
+    cpu: float = 0.0
+    peak_memory: int = None
+
+
+# Οι μετρήσεις που είναι ανοιχτές αυτή τη στιγμή (η μία μέσα στην άλλη), ώστε ο μηδενισμός
+# του peak του tracemalloc από μια εσωτερική μέτρηση να μη χάνει το peak των εξωτερικών
+_open_measurements = []
+
+
+def _fold_peak():
+    # Καταχωρεί το τρέχον peak σε όλες τις ανοιχτές μετρήσεις πριν μηδενιστεί
+    peak = tracemalloc.get_traced_memory()[1]
+    for measurement in _open_measurements:
+        measurement.peak = max(measurement.peak, peak)
+
+
+class Measurement:
+    """
+    Μετρά χρόνο, CPU και (αν είναι ενεργό το tracemalloc) μέγιστη μνήμη, είτε ως context manager
+    είτε με start()/stop(). Μετά το τέλος, το αποτέλεσμα βρίσκεται στο πεδίο stats (PhaseStats).
+    """
+
+    def __init__(self):
+        self.stats = None
+        self.peak = 0
+        self._base = 0
+
+    def start(self):
+        """
+        Ξεκινά τη μέτρηση και επιστρέφει το ίδιο αντικείμενο.
+        """
+        self._tracing = tracemalloc.is_tracing()
+        if self._tracing:
+            _fold_peak()
+            tracemalloc.reset_peak()
+            self._base = tracemalloc.get_traced_memory()[0]
+            self.peak = self._base
+            _open_measurements.append(self)
+        self._wall = time.perf_counter()
+        self._cpu = time.process_time()
+        return self
+
+    def stop(self):
+        """
+        Σταματά τη μέτρηση και επιστρέφει το PhaseStats.
+        """
+        wall = time.perf_counter() - self._wall
+        cpu = time.process_time() - self._cpu
+        peak_memory = None
+        if self._tracing and tracemalloc.is_tracing():
+            _fold_peak()
+            _open_measurements.remove(self)
+            peak_memory = max(0, self.peak - self._base)
+        self.stats = PhaseStats(wall, cpu, peak_memory)
+        return self.stats
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc, tb):
+        self.stop()
+        return False
+
+
+# Ενεργοποιεί την παρακολούθηση μνήμης (tracemalloc) για όσο διαρκεί το block, αν ζητήθηκε
+
+@contextmanager
+def memory_tracing(enabled=True):
+    """
+    Ξεκινά το tracemalloc (αν δεν τρέχει ήδη) και το σταματά στο τέλος.
+    Το tracemalloc επιβραδύνει αισθητά την εκτέλεση, γι' αυτό είναι προαιρετικό.
+
+    Parameters:
+    - enabled: αν False, το block εκτελείται χωρίς παρακολούθηση μνήμης
+    """
+    started = enabled and not tracemalloc.is_tracing()
+    if started:
+        tracemalloc.start()
+    try:
+        yield
+    finally:
+        if started:
+            tracemalloc.stop()
+
+
+# Καταγράφει προφίλ cProfile του block και το αποθηκεύει σε αρχείο pstats
+
+@contextmanager
+def profiled(profile_path=None):
+    """
+    Εκτελεί το block με τον cProfile και γράφει τα αποτελέσματα στο profile_path
+    (ανοίγουν με `python -m pstats <αρχείο>` ή με εργαλεία όπως το snakeviz).
+
+    Parameters:
+    - profile_path: το αρχείο pstats· αν None, το block εκτελείται χωρίς profiling
+    """
+    if not profile_path:
+        yield
+        return
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(profile_path)
+
+
+def format_bytes(size):
+    """
+    Επιστρέφει ένα μέγεθος σε bytes σε αναγνώσιμη μορφή (π.χ. '12.3 MB').
+    """
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def format_stats(stats):
+    """
+    Επιστρέφει μια σύντομη περιγραφή ενός PhaseStats για το log.
+    """
+    text = f"{stats.wall:.2f} s (CPU {stats.cpu:.2f} s"
+    if stats.peak_memory is not None:
+        text += f", μέγιστη μνήμη {format_bytes(stats.peak_memory)}"
+    return text + ")"
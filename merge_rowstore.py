@@ -0,0 +1,364 @@
+from array import array
+from datetime import datetime, timedelta
+from itertools import compress, count, islice, repeat
+from operator import is_
+
+
+# Οι γραμμές προστίθενται στις στήλες σε μπλοκ, ώστε οι έλεγχοι τύπων να γίνονται ανά στήλη και όχι ανά κελί
+BLOCK_ROWS = 8192
+
+# Μια στήλη κειμένου με πάνω από τις μισές τιμές διαφορετικές (π.χ. ελεύθερο κείμενο) δεν ωφελείται από τον
+# κατάλογο μοναδικών τιμών· μετά από INTERN_MIN_ROWS γραμμές κρατιέται ως απλή λίστα
+INTERN_MIN_ROWS = 4096
+INTERN_MAX_RATIO = 0.5
+
+# Οι ημερομηνίες (χωρίς ζώνη ώρας) κρατιούνται ως μικροδευτερόλεπτα από το 1970, όπως το timestamp('us') του Arrow
+EPOCH = datetime(1970, 1, 1)
+MICROSECOND = timedelta(microseconds=1)
+INT64_MIN, INT64_MAX = -2 ** 63, 2 ** 63 - 1
+
+# Ο τύπος κάθε στήλης και το array που κρατά τις τιμές της. Οι τύποι ελέγχονται ακριβώς (όχι isinstance),
+# ώστε μια τιμή να επιστρέφεται πάντα ίδια (π.χ. ένα bool δεν γίνεται int, ένα numpy float δεν γίνεται float).
+# 'empty' = μόνο κενές τιμές ως τώρα, 'object' = ανάμεικτοι ή άλλοι τύποι, σε απλή λίστα.
+VALUE_KINDS = {int: 'int', float: 'float', bool: 'bool', datetime: 'datetime', str: 'string'}
+TYPECODES = {'int': 'q', 'float': 'd', 'bool': 'b', 'datetime': 'q', 'string': 'I'}
+PLACEHOLDERS = {'int': 0, 'float': 0.0, 'bool': False, 'datetime': EPOCH, 'string': ''}
+
+NONE_TYPE = type(None)
+
+
+def _datetime_micros(value):
+    return (value - EPOCH) // MICROSECOND
+
+
+def _micros_datetime(micros):
+    return EPOCH + timedelta(microseconds=micros)
+
+
+class Column:
+    """
+    Μια στήλη του ColumnarRows: οι τιμές σε typed array (ή λίστα) και οι κενές τιμές σε bitmap.
+
+    Το bitmap έχει τη μορφή του Arrow (ένα bit ανά γραμμή, το λιγότερο σημαντικό πρώτο, 1 = υπάρχει τιμή), ώστε
+    να περνά στο pyarrow χωρίς αντιγραφή· None όσο η στήλη δεν έχει καμία κενή τιμή.
+
+    Parameters:
+    - length: πόσες κενές τιμές έχει αρχικά η στήλη (μια στήλη που εμφανίζεται σε μια φαρδύτερη γραμμή)
+    """
+
+    def __init__(self, length=0):
+        self.kind = 'empty'
+        self.data = None
+        self.length = 0
+        self.null_count = 0
+        self.valid = None
+        self.values = None
+        self._index = None
+        if length:
+            self._add_bits(length, False)
+            self.length = self.null_count = length
+
+    def __len__(self):
+        return self.length
+
+    def _add_bits(self, n, valid):
+        # Προσθέτει n bits με την ίδια τιμή στο τέλος του bitmap
+        if self.valid is None:
+            self.valid = bytearray()
+            if self.length:
+                self._add_bits_from(0, self.length)
+        start, end = self.length, self.length + n
+        self.valid.extend(bytes((end + 7) // 8 - len(self.valid)))
+        if valid:
+            self._add_bits_from(start, end)
+
+    def _add_bits_from(self, start, end):
+        bitmap = self.valid
+        position = start
+        while position < end and position % 8:
+            bitmap[position >> 3] |= 1 << (position & 7)
+            position += 1
+        full = (end - position) // 8
+        bitmap[position >> 3:(position >> 3) + full] = b'\xff' * full
+        position += full * 8
+        while position < end:
+            bitmap[position >> 3] |= 1 << (position & 7)
+            position += 1
+
+    def _set_kind(self, kind):
+        # Η πρώτη τιμή μιας στήλης που είχε μόνο κενές τιμές ορίζει τον τύπο της
+        self.kind = kind
+        if kind == 'object':
+            self.data = [None] * self.length
+        else:
+            self.data = array(TYPECODES[kind], bytes(array(TYPECODES[kind]).itemsize * self.length))
+        if kind == 'string':
+            self.values, self._index = [''], {'': 0}
+
+    def _to_object(self):
+        # Ανάμεικτοι τύποι: η στήλη γίνεται απλή λίστα με τις τιμές της
+        self.data = self.slice(0, self.length)
+        self.kind = 'object'
+        self.values = self._index = None
+
+    def extend(self, values):
+        """
+        Προσθέτει τις τιμές μιας ομάδας γραμμών (sequence, None = κενή τιμή).
+        """
+        n = len(values)
+        types = set(map(type, values))
+        nulls = []
+        if NONE_TYPE in types:
+            types.discard(NONE_TYPE)
+            nulls = list(compress(range(n), map(is_, values, repeat(None))))
+        if not types:
+            kind = self.kind
+        elif len(types) == 1:
+            kind = VALUE_KINDS.get(types.pop(), 'object')
+        else:
+            kind = 'object'
+        if self.kind == 'empty' and kind != 'empty':
+            self._set_kind(kind)
+        elif kind != self.kind and self.kind != 'object':
+            self._to_object()
+
+        if self.kind == 'object':
+            self.data.extend(values)
+        elif self.kind != 'empty':
+            # Οι κενές τιμές παίρνουν μια τιμή του τύπου της στήλης, που δεν διαβάζεται ποτέ (βλ. bitmap)
+            typed = values
+            if nulls:
+                typed = list(values)
+                placeholder = PLACEHOLDERS[self.kind]
+                for position in nulls:
+                    typed[position] = placeholder
+            if not self._extend_typed(typed):
+                self._to_object()
+                self.data.extend(values)
+
+        if nulls or self.valid is not None:
+            self._add_bits(n, True)
+            for position in nulls:
+                row = self.length + position
+                self.valid[row >> 3] &= ~(1 << (row & 7)) & 0xff
+            self.null_count += len(nulls)
+        self.length += n
+        if (self.kind == 'string' and self.length >= INTERN_MIN_ROWS
+                and len(self.values) > self.length * INTERN_MAX_RATIO):
+            self._to_object()
+
+    def _extend_typed(self, values):
+        # False αν οι τιμές δεν χωρούν στο array (ακέραιος εκτός int64, ημερομηνία με ζώνη ώρας)
+        if self.kind == 'int':
+            if values and (min(values) < INT64_MIN or max(values) > INT64_MAX):
+                return False
+            self.data.extend(values)
+        elif self.kind == 'datetime':
+            try:
+                micros = list(map(_datetime_micros, values))
+            except TypeError:
+                return False
+            self.data.extend(micros)
+        elif self.kind == 'string':
+            index = self._index
+            new = list(set(values).difference(index))
+            index.update(zip(new, count(len(self.values))))
+            self.values.extend(new)
+            self.data.extend(map(index.__getitem__, values))
+        else:
+            self.data.extend(values)
+        return True
+
+    def slice(self, start, stop):
+        """
+        Επιστρέφει τις τιμές των γραμμών start έως stop ως λίστα (None για τις κενές τιμές).
+        """
+        if self.kind == 'empty':
+            return [None] * (stop - start)
+        if self.kind == 'object':
+            return self.data[start:stop]
+        data = self.data[start:stop]
+        if self.kind == 'bool':
+            values = list(map(bool, data))
+        elif self.kind == 'datetime':
+            values = list(map(_micros_datetime, data))
+        elif self.kind == 'string':
+            values = list(map(self.values.__getitem__, data))
+        else:
+            values = data.tolist()
+        if self.null_count:
+            bitmap = self.valid
+            for byte in range(start >> 3, (stop + 7) >> 3):
+                if bitmap[byte] == 0xff:
+                    continue
+                for row in range(max(start, byte << 3), min(stop, (byte + 1) << 3)):
+                    if not bitmap[row >> 3] >> (row & 7) & 1:
+                        values[row - start] = None
+        return values
+
+    def to_series(self):
+        """
+        Επιστρέφει τη στήλη ως pandas Series (βλ. ColumnarRows.to_dataframe). Τα δεδομένα αντιγράφονται, ώστε η
+        στήλη να μπορεί να συνεχίσει να μεγαλώνει.
+        """
+        import numpy as np
+        import pandas as pd
+
+        if self.kind in ('empty', 'object'):
+            values = np.empty(self.length, dtype=object)
+            values[:] = self.slice(0, self.length)
+            return pd.Series(values, dtype=object, copy=False)
+        data = np.frombuffer(self.data, dtype=self.data.typecode).copy()
+        missing = None
+        if self.null_count:
+            missing = np.unpackbits(np.frombuffer(self.valid, dtype=np.uint8), count=self.length,
+                                    bitorder='little') == 0
+        if self.kind == 'string':
+            values = np.array(self.values, dtype=object)[data]
+            if missing is not None:
+                values[missing] = None
+            return pd.Series(values, dtype=object, copy=False)
+        if self.kind == 'int':
+            values = data if missing is None else pd.arrays.IntegerArray(data, missing)
+        elif self.kind == 'bool':
+            values = data.astype(bool)
+            if missing is not None:
+                values = pd.arrays.BooleanArray(values, missing)
+        elif self.kind == 'datetime':
+            values = data.view('datetime64[us]')
+            if missing is not None:
+                values[missing] = np.datetime64('NaT')
+        else:
+            values = data
+            if missing is not None:
+                values[missing] = np.nan
+        return pd.Series(values, copy=False)
+
+
+class ColumnarRows:
+    """
+    Οι συγχωνευμένες γραμμές αποθηκευμένες ανά στήλη, για όσες κρατιούνται στη μνήμη ως το τέλος (χωρίς streaming
+    ή με αφαίρεση διπλών 'last'/'newest'). Μια λίστα από λίστες κρατά κάθε κελί ως ξεχωριστό αντικείμενο Python·
+    εδώ οι αριθμοί, τα bool και οι ημερομηνίες κάθε στήλης κρατιούνται σε typed array (8 bytes ή λιγότερο ανά
+    τιμή), το κείμενο που επαναλαμβάνεται (π.χ. σχολείο, περιφέρεια, κωδικός) μία φορά ανά διαφορετική τιμή και
+    οι κενές τιμές σε bitmap. Μια στήλη με ανάμεικτους ή άλλους τύπους κρατιέται ως απλή λίστα.
+
+    Συμπεριφέρεται σαν λίστα γραμμών (append, extend, len, επανάληψη, θέση/slice): κάθε γραμμή επιστρέφεται ως
+    νέα λίστα με τις ίδιες τιμές και το ίδιο μήκος που είχε. Τα αρχεία parquet/feather γράφονται απευθείας από
+    τα arrays των στηλών (βλ. ColumnarStreamWriter) και το DataFrame φτιάχνεται στήλη-στήλη (to_dataframe).
+
+    Parameters:
+    - rows: optional αρχικές γραμμές (iterable από list)
+    """
+
+    def __init__(self, rows=()):
+        self._columns = []
+        self._lengths = array('I')
+        self._pending = []
+        self.extend(rows)
+
+    def __len__(self):
+        return len(self._lengths) + len(self._pending)
+
+    def __bool__(self):
+        return len(self) > 0
+
+    def __repr__(self):
+        return f"ColumnarRows({len(self)} γραμμές, {self.width} στήλες)"
+
+    @property
+    def columns(self):
+        """
+        Οι στήλες (λίστα από Column), μία για κάθε θέση ως το πλάτος της φαρδύτερης γραμμής.
+        """
+        self._flush()
+        return self._columns
+
+    @property
+    def width(self):
+        return len(self.columns)
+
+    def append(self, row):
+        self._pending.append(row)
+        if len(self._pending) >= BLOCK_ROWS:
+            self._flush()
+
+    def extend(self, rows):
+        # Σε μπλοκ, ώστε ένας iterator (π.χ. οι γραμμές ενός άλλου ColumnarRows) να μη γίνεται ολόκληρος λίστα
+        rows = iter(rows)
+        while True:
+            self._pending.extend(islice(rows, BLOCK_ROWS - len(self._pending)))
+            if len(self._pending) < BLOCK_ROWS:
+                break
+            self._flush()
+
+    def _flush(self):
+        # Οι γραμμές σε αναμονή μεταφέρονται στις στήλες· οι στενότερες συμπληρώνονται με κενές τιμές
+        if not self._pending:
+            return
+        rows, self._pending = self._pending, []
+        lengths = array('I', map(len, rows))
+        width = max(lengths)
+        while len(self._columns) < width:
+            self._columns.append(Column(len(self._lengths)))
+        width = len(self._columns)
+        if min(lengths) < width:
+            rows = [row if len(row) == width else list(row) + [None] * (width - len(row)) for row in rows]
+        for column, values in zip(self._columns, zip(*rows)):
+            column.extend(values)
+        self._lengths.extend(lengths)
+
+    def _rows(self, start, stop):
+        # Οι γραμμές start έως stop, ως νέες λίστες με το αρχικό τους μήκος
+        if not self._columns:
+            return [[] for _ in range(stop - start)]
+        rows = list(map(list, zip(*[column.slice(start, stop) for column in self._columns])))
+        width = len(self._columns)
+        lengths = self._lengths[start:stop]
+        if lengths and min(lengths) < width:
+            for row, length in zip(rows, lengths):
+                if length < width:
+                    del row[length:]
+        return rows
+
+    def __iter__(self):
+        self._flush()
+        for start in range(0, len(self._lengths), BLOCK_ROWS):
+            yield from self._rows(start, min(start + BLOCK_ROWS, len(self._lengths)))
+
+    def __getitem__(self, key):
+        self._flush()
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self._lengths))
+            if step == 1:
+                return self._rows(start, max(start, stop))
+            return [self._rows(position, position + 1)[0] for position in range(start, stop, step)]
+        position = key + len(self._lengths) if key < 0 else key
+        if not 0 <= position < len(self._lengths):
+            raise IndexError("ColumnarRows index out of range")
+        return self._rows(position, position + 1)[0]
+
+    def to_dataframe(self, header_rows=()):
+        """
+        Επιστρέφει τις γραμμές ως pandas DataFrame, με μία στήλη ανά θέση (0, 1, ...).
+
+        Οι στήλες αριθμών, bool και ημερομηνιών φτιάχνονται απευθείας από τα typed arrays (int64/Int64, float64,
+        bool/boolean, datetime64[us]), με τις κενές τιμές από το bitmap (<NA>, NaN, NaT). Μόνο οι στήλες κειμένου
+        και οι ανάμεικτες είναι object, με None για τις κενές τιμές.
+
+        Parameters:
+        - header_rows: optional γραμμές επικεφαλίδας πριν από τις γραμμές· όπως στο pd.DataFrame(header_rows + rows),
+          οι στήλες όπου η επικεφαλίδα έχει κείμενο γίνονται object
+        """
+        import pandas as pd
+
+        self._flush()
+        header_rows = [list(row) for row in header_rows]
+        width = max([len(row) for row in header_rows] + [len(self._columns)])
+        frame = pd.DataFrame({position: column.to_series() for position, column in enumerate(self._columns)},
+                             index=pd.RangeIndex(len(self._lengths)), copy=False)
+        frame = frame.reindex(columns=pd.RangeIndex(width))
+        if header_rows:
+            header = pd.DataFrame(header_rows, dtype=object).reindex(columns=pd.RangeIndex(width))
+            frame = pd.concat([header, frame], ignore_index=True)
+        return frame
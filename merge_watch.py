@@ -0,0 +1,232 @@
+import ctypes
+import os
+import select
+import sys
+import threading
+import time
+from dataclasses import replace
+from datetime import datetime
+from merge_engine import iter_source_files, output_filenames, resolve_output_format, run_merge, supports_append
+
+
+DEFAULT_INTERVAL = 2.0
+DEFAULT_DEBOUNCE = 5.0
+
+# Γεγονότα inotify που σημαίνουν ότι ένα αρχείο του φακέλου άλλαξε, μετακινήθηκε ή διαγράφηκε
+IN_MODIFY = 0x00000002
+IN_ATTRIB = 0x00000004
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+WATCH_MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+
+
+# Η κατάσταση του φακέλου: mtime και μέγεθος κάθε αρχείου πηγής και του master
+
+def folder_snapshot(config):
+    """
+    Επιστρέφει {όνομα αρχείου: (mtime_ns, size)} για τα αρχεία που θα συγχωνευτούν και το master.
+    Το αρχείο εξόδου δεν μετρά, ώστε η ίδια η συγχώνευση να μην προκαλεί νέα συγχώνευση.
+    """
+    snapshot = {}
+    for source in iter_source_files(config.folder, [config.master_filename] + output_filenames(config),
+                                    config.include, config.exclude, config.recursive):
+        snapshot[source.name] = (source.stat.st_mtime_ns, source.stat.st_size)
+    try:
+        stat = os.stat(config.master_path)
+        snapshot[config.master_filename] = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        pass
+    return snapshot
+
+
+def describe_changes(previous, current):
+    """
+    Επιστρέφει (νέα, τροποποιημένα, διαγραμμένα) αρχεία ανάμεσα σε δύο καταστάσεις του φακέλου.
+    """
+    added = [name for name in current if name not in previous]
+    changed = [name for name in current if name in previous and current[name] != previous[name]]
+    removed = [name for name in previous if name not in current]
+    return added, changed, removed
+
+
+class _PollingWaiter:
+    # Χωρίς inotify: απλή αναμονή, και οι αλλαγές βρίσκονται συγκρίνοντας την κατάσταση του φακέλου
+
+    name = 'polling'
+
+    def __init__(self, stop_event):
+        self.stop_event = stop_event
+
+    def wait(self, timeout):
+        self.stop_event.wait(timeout)
+        return False
+
+    def close(self):
+        pass
+
+
+class _InotifyWaiter:
+    # Στο Linux, inotify μέσω ctypes (χωρίς εξάρτηση): η αναμονή τελειώνει μόλις αλλάξει κάτι στους φακέλους
+
+    name = 'inotify'
+
+    def __init__(self, stop_event, folders):
+        self.stop_event = stop_event
+        libc = ctypes.CDLL(None, use_errno=True)
+        self.fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1")
+        for folder in folders:
+            if libc.inotify_add_watch(self.fd, os.fsencode(folder), WATCH_MASK) < 0:
+                error = ctypes.get_errno()
+                self.close()
+                raise OSError(error, f"inotify_add_watch: {folder}")
+
+    def wait(self, timeout):
+        # Η αναμονή γίνεται σε μικρά διαστήματα, ώστε η διακοπή (stop_event) να γίνεται αμέσως αντιληπτή
+        remaining = timeout
+        while remaining > 0 and not self.stop_event.is_set():
+            step = min(remaining, 0.5)
+            readable, _, _ = select.select([self.fd], [], [], step)
+            if readable:
+                try:
+                    while os.read(self.fd, 65536):
+                        pass
+                except BlockingIOError:
+                    pass
+                return True
+            remaining -= step
+        return False
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def _open_waiter(config, snapshot, stop_event):
+    # Παρακολουθούνται ο φάκελος και οι υποφάκελοι που έχουν αρχεία· ένας νέος υποφάκελος βρίσκεται
+    # πάντως στην επόμενη σύγκριση της κατάστασης, αφού η αναμονή δεν ξεπερνά το interval
+    if sys.platform.startswith('linux'):
+        folders = {config.folder}
+        if config.recursive:
+            folders.update(os.path.join(config.folder, os.path.dirname(name)) for name in snapshot)
+        try:
+            return _InotifyWaiter(stop_event, sorted(folders))
+        except (OSError, AttributeError):
+            pass
+    return _PollingWaiter(stop_event)
+
+
+# Περιμένει μια αλλαγή στον φάκελο και μετά να σταματήσουν οι εγγραφές για debounce δευτερόλεπτα,
+# ώστε ένα αρχείο που αντιγράφεται ακόμη (ή πολλά αρχεία μαζί) να προκαλέσουν μία μόνο συγχώνευση
+
+def wait_for_changes(config, previous, stop_event, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE):
+    """
+    Επιστρέφει τη νέα κατάσταση του φακέλου όταν αλλάξει και σταθεροποιηθεί, ή None αν οριστεί το stop_event.
+
+    Parameters:
+    - config: MergeConfig (φάκελος, μοτίβα, master, αρχείο εξόδου)
+    - previous: η κατάσταση του φακέλου στην τελευταία συγχώνευση (βλ. folder_snapshot)
+    - stop_event: threading.Event που τερματίζει την αναμονή
+    - interval: κάθε πόσα δευτερόλεπτα συγκρίνεται η κατάσταση του φακέλου (και με inotify, ως δίχτυ ασφαλείας)
+    - debounce: πόσα δευτερόλεπτα χωρίς νέα αλλαγή πριν θεωρηθεί ο φάκελος σταθερός
+    """
+    waiter = _open_waiter(config, previous, stop_event)
+    try:
+        current = previous
+        while current == previous:
+            waiter.wait(interval)
+            if stop_event.is_set():
+                return None
+            current = folder_snapshot(config)
+
+        # Κάθε νέα αλλαγή (όχι κάθε γεγονός inotify, π.χ. του αρχείου log) ξεκινά από την αρχή τη σταθεροποίηση
+        stable_since = time.monotonic()
+        while True:
+            remaining = debounce - (time.monotonic() - stable_since)
+            if remaining <= 0:
+                return current
+            waiter.wait(remaining)
+            if stop_event.is_set():
+                return None
+            latest = folder_snapshot(config)
+            if latest != current:
+                current, stable_since = latest, time.monotonic()
+    finally:
+        waiter.close()
+
+
+# Λειτουργία παρακολούθησης: συγχωνεύει τον φάκελο και ξανά σε κάθε αλλαγή, ώσπου να οριστεί το stop_event.
+# Σε csv ενός φύλλου κάθε γύρος ενημερώνει το αρχείο εξόδου του προηγούμενου (βλ. MergeConfig.append)· στις
+# άλλες μορφές ξαναφτιάχνεται ολόκληρο, και με την cache ενεργή διαβάζονται μόνο τα νέα και τα τροποποιημένα αρχεία.
+
+def run_watch(config, log=None, stop_event=None, interval=DEFAULT_INTERVAL, debounce=DEFAULT_DEBOUNCE,
+              on_result=None, progress=None):
+    """
+    Παρακολουθεί τον φάκελο και ενημερώνει το αρχείο εξόδου κάθε φορά που προστίθεται, αλλάζει ή διαγράφεται
+    ένα αρχείο. Μετά από κάθε συγχώνευση καταγράφεται μια σύνοψη (συγχωνευμένα / προβληματικά αρχεία).
+
+    Parameters:
+    - config: MergeConfig με τις ρυθμίσεις της συγχώνευσης
+    - log: optional συνάρτηση που δέχεται ένα μήνυμα (str) για καταγραφή
+    - stop_event: optional threading.Event που τερματίζει την παρακολούθηση (και ακυρώνει μια συγχώνευση σε εξέλιξη)
+    - interval, debounce: βλ. wait_for_changes
+    - on_result: optional συνάρτηση που καλείται με το MergeResult κάθε συγχώνευσης
+    - progress: optional συνάρτηση που δέχεται το ποσοστό προόδου (0-100) κάθε συγχώνευσης
+
+    Returns:
+    - Το MergeResult της τελευταίας συγχώνευσης
+    """
+    stop_event = stop_event or threading.Event()
+
+    def log_message(message):
+        if log is not None:
+            log(message)
+
+    if supports_append(config):
+        # Ο πρώτος γύρος ενημερώνει ένα υπάρχον αρχείο εξόδου μόνο αν ζητήθηκε· ένα νέο γράφεται μαζί με το
+        # manifest του (εκτός αν συνεχίζει από checkpoint), ώστε ήδη ο δεύτερος γύρος να γράψει μόνο τις αλλαγές
+        if not (config.append or config.resume or any(os.path.exists(os.path.join(config.folder, filename))
+                                                      for filename in output_filenames(config))):
+            config = replace(config, append=True)
+    else:
+        output_format = resolve_output_format(config.output_filename, config.output_format)
+        log_message(f"ℹ️ Σε κάθε αλλαγή το αρχείο εξόδου ({output_format}) ξαναγράφεται ολόκληρο· μόνο σε csv ενός "
+                    f"φύλλου, με streaming και χωρίς αφαίρεση διπλών γραμμών γράφονται μόνο οι αλλαγές.")
+        if not config.use_cache:
+            log_message("⚠ Χωρίς cache κάθε αλλαγή διαβάζει ξανά όλα τα αρχεία του φακέλου.")
+
+    snapshot = folder_snapshot(config)
+    waiter = _open_waiter(config, snapshot, stop_event)
+    log_message(f"👀 Παρακολούθηση του φακέλου '{config.folder}' ({waiter.name}, σταθεροποίηση {debounce:g} s)")
+    waiter.close()
+
+    result = None
+    while True:
+        log_message(f"=== Συγχώνευση αρχείων Excel ({datetime.now().strftime('%Y-%m-%d %H:%M:%S')}) ===")
+        result = run_merge(config, log=log, progress=progress, cancel_event=stop_event)
+        if on_result is not None:
+            on_result(result)
+        if result.cancelled:
+            break
+        if result.error is None and supports_append(config) and (not config.append or config.resume):
+            # Οι επόμενοι γύροι ενημερώνουν το αρχείο εξόδου που μόλις γράφτηκε
+            config = replace(config, append=True, resume=False)
+        log_message(f"📋 {datetime.now().strftime('%H:%M:%S')}: {result.success_count} αρχεία συγχωνεύτηκαν, "
+                    f"{len(result.failed_files)} προβληματικά, {result.row_count} γραμμές")
+        log_message("👀 Αναμονή για αλλαγές...")
+
+        current = wait_for_changes(config, snapshot, stop_event, interval, debounce)
+        if current is None:
+            break
+        added, changed, removed = describe_changes(snapshot, current)
+        log_message(f"🔔 Αλλαγές στον φάκελο: {len(added)} νέα, {len(changed)} τροποποιημένα, "
+                    f"{len(removed)} διαγραμμένα αρχεία")
+        snapshot = current
+
+    log_message("⏹ Η παρακολούθηση του φακέλου σταμάτησε.")
+    return result
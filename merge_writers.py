@@ -0,0 +1,755 @@
+import io
+import os
+import csv
+import codecs
+from dataclasses import replace
+from datetime import datetime
+from merge_cache import file_digest
+from merge_manifest import ManifestEntry, OutputManifest
+from merge_rowstore import ColumnarRows
+
+# Το xlsxwriter (σε λειτουργία constant_memory) είναι ο γρηγορότερος τρόπος εγγραφής xlsx· αν δεν
+# είναι εγκατεστημένο χρησιμοποιείται το openpyxl σε λειτουργία write_only
+try:
+    import xlsxwriter
+except ImportError:
+    xlsxwriter = None
+
+# Οι μορφές Parquet και Feather (Arrow) απαιτούν το pyarrow, που φορτώνεται μόνο όταν χρειαστεί (βλ. _load_pyarrow)
+pyarrow = None
+
+
+DATETIME_FORMAT = 'yyyy-mm-dd hh:mm:ss'
+PARTIAL_SUFFIX = '.part'
+COLUMNAR_FORMATS = ('parquet', 'feather')
+DEFAULT_COMPRESSION = {'parquet': 'snappy', 'feather': 'lz4'}
+DEFAULT_CHUNK_ROWS = 50000
+DEFAULT_SHEET_TITLE = 'Sheet1'
+
+# Χαρακτήρες που επιτρέπονται σε όνομα φύλλου αλλά όχι σε όνομα αρχείου (Windows)
+UNSAFE_FILENAME_CHARS = '<>:"/\\|?*'
+
+
+class StreamingWriter:
+    """
+    Γράφει γραμμές σε αρχείο εξόδου καθώς εξάγονται, χωρίς να κρατά όλο το αποτέλεσμα στη μνήμη.
+
+    Τα δεδομένα γράφονται πρώτα σε προσωρινό αρχείο (<αρχείο εξόδου>.part) που μετονομάζεται
+    στο τελικό όνομα μόνο στο close(), ώστε μια ακύρωση ή ένα σφάλμα να μην αφήνει μισό αρχείο.
+
+    Parameters:
+    - output_path: η διαδρομή του αρχείου εξόδου
+    - sheet_titles: τα φύλλα του αρχείου εξόδου (μόνο το xlsx έχει περισσότερα από ένα)
+    """
+
+    def __init__(self, output_path, sheet_titles=(DEFAULT_SHEET_TITLE,)):
+        self.output_path = output_path
+        self.partial_path = output_path + PARTIAL_SUFFIX
+        self.sheet_titles = list(sheet_titles)
+        self.row_counts = [0] * len(self.sheet_titles)
+
+    @property
+    def row_count(self):
+        return sum(self.row_counts)
+
+    def write_header(self, header_rows, sheet=0):
+        """
+        Γράφει τις γραμμές επικεφαλίδας του master (στις μορφές xlsx και csv ως κανονικές γραμμές).
+        """
+        self.write_rows(header_rows, sheet)
+
+    def write_rows(self, rows, sheet=0):
+        """
+        Προσθέτει γραμμές (list of list) στο τέλος του φύλλου sheet (θέση στο sheet_titles).
+
+        Returns:
+        - Οι τιμές που δεν ταιριάζουν με τον τύπο της στήλης τους και γράφτηκαν κενές, ως (θέση γραμμής στο rows,
+          όνομα στήλης, τιμή)· μόνο στις μορφές με τύπους στηλών (parquet/feather), αλλιώς None
+        """
+        for row in rows:
+            self._write_row(row, sheet)
+            self.row_counts[sheet] += 1
+
+    def close(self):
+        """
+        Ολοκληρώνει το αρχείο και το μετονομάζει στο τελικό όνομα.
+        """
+        self._finish()
+        os.replace(self.partial_path, self.output_path)
+
+    def abort(self):
+        """
+        Εγκαταλείπει την εγγραφή και διαγράφει το προσωρινό αρχείο.
+        """
+        try:
+            self._discard()
+        except Exception:
+            pass
+        if os.path.exists(self.partial_path):
+            os.remove(self.partial_path)
+
+    def _write_row(self, row, sheet):
+        raise NotImplementedError
+
+    def _finish(self):
+        raise NotImplementedError
+
+    def _discard(self):
+        # Κλείνει τα ανοιχτά αρχεία πριν διαγραφεί το προσωρινό αρχείο
+        self._finish()
+
+
+class CsvStreamWriter(StreamingWriter):
+    """
+    Εγγραφή CSV σε utf-8-sig, ώστε το Excel να αναγνωρίζει σωστά τους ελληνικούς χαρακτήρες.
+    Οι γραμμές συμπληρώνονται με κενά πεδία ως το πλάτος της φαρδύτερης γραμμής που έχει γραφτεί,
+    όπως θα έκανε το pandas (που όμως γνωρίζει εκ των προτέρων όλες τις γραμμές).
+
+    Η θέση της εγγραφής (βλ. position) καταγράφεται στο checkpoint μιας συγχώνευσης· με resume το προσωρινό
+    αρχείο μιας συγχώνευσης που διακόπηκε (βλ. suspend) συνεχίζει από εκείνη τη θέση, χωρίς επικεφαλίδα.
+
+    Parameters:
+    - output_path: η διαδρομή του αρχείου εξόδου
+    - resume: η θέση (βλ. position) από την οποία συνεχίζει το υπάρχον προσωρινό αρχείο (None = νέο αρχείο)
+    """
+
+    def __init__(self, output_path, resume=None):
+        super().__init__(output_path)
+        self._width = 0
+        self._resumed = resume is not None
+        self._raw = open(self.partial_path, 'wb' if resume is None else 'r+b')
+        if resume is None:
+            self._raw.write(codecs.BOM_UTF8)
+        self._file = io.TextIOWrapper(self._raw, encoding='utf-8', newline='')
+        self._writer = csv.writer(self._file, lineterminator='\n')
+        if resume is not None:
+            self.rewind(resume)
+
+    def write_header(self, header_rows, sheet=0):
+        # Το προσωρινό αρχείο που συνεχίζει έχει ήδη την επικεφαλίδα
+        if not self._resumed:
+            super().write_header(header_rows, sheet)
+
+    def position(self, sync=False):
+        """
+        Επιστρέφει τη θέση της εγγραφής ως [bytes, πλάτος γραμμών, γραμμές], αφού ό,τι γράφτηκε φτάσει στο αρχείο.
+
+        Parameters:
+        - sync: αν True, το αρχείο γράφεται και οριστικά στον δίσκο (fsync)
+        """
+        self._file.flush()
+        if sync:
+            os.fsync(self._raw.fileno())
+        return [self._raw.tell(), self._width, self.row_counts[0]]
+
+    def rewind(self, position):
+        """
+        Επιστρέφει την εγγραφή σε μια προηγούμενη θέση (βλ. position)· ό,τι γράφτηκε μετά από αυτήν αφαιρείται.
+        """
+        offset, self._width, self.row_counts[0] = position
+        self._file.flush()
+        self._raw.seek(offset)
+        self._raw.truncate()
+
+    def suspend(self):
+        """
+        Κλείνει το αρχείο και κρατά το προσωρινό αρχείο, ώστε η συγχώνευση να συνεχίσει αργότερα (βλ. resume).
+        """
+        self._finish()
+
+    def _write_row(self, row, sheet):
+        self._width = max(self._width, len(row))
+        self._writer.writerow(list(row) + [None] * (self._width - len(row)))
+
+    def _finish(self):
+        if not self._file.closed:
+            self._file.close()
+
+
+class CsvAppendWriter(StreamingWriter):
+    """
+    Εγγραφή CSV με manifest (βλ. merge_manifest): καταγράφει πού βρίσκονται οι γραμμές κάθε αρχείου πηγής,
+    ώστε μια επόμενη συγχώνευση να ενημερώσει το αρχείο εξόδου αντί να το ξαναφτιάξει από την αρχή.
+
+    - Χωρίς previous γράφεται νέο αρχείο, όπως με το CsvStreamWriter.
+    - Με previous και in_place=True οι νέες γραμμές προστίθενται στο τέλος του υπάρχοντος αρχείου·
+      το abort() το επαναφέρει στο αρχικό του μέγεθος.
+    - Με previous και in_place=False γράφεται νέο αρχείο (.part), όπου οι γραμμές των αρχείων πηγής που δεν
+      άλλαξαν αντιγράφονται ως bytes από το υπάρχον αρχείο (copy_source), χωρίς να ξαναδιαβαστούν.
+
+    Οι γραμμές κάθε αρχείου πηγής που διαβάζεται γράφονται ανάμεσα σε begin_source() και end_source().
+
+    Parameters:
+    - output_path: η διαδρομή του αρχείου εξόδου
+    - signature: το αποτύπωμα των ρυθμίσεων (βλ. merge_signature)
+    - previous: το OutputManifest του υπάρχοντος αρχείου εξόδου (None = νέο αρχείο)
+    - in_place: βλ. παραπάνω
+    """
+
+    def __init__(self, output_path, signature, previous=None, in_place=False):
+        super().__init__(output_path)
+        self.previous = previous
+        self.in_place = previous is not None and in_place
+        self.manifest = OutputManifest(signature)
+        self._source = None
+        self._width = previous.width if previous is not None else 0
+        self._start = None
+        if self.in_place:
+            self._original = os.stat(output_path)
+            self._file = open(output_path, 'ab')
+        else:
+            if previous is not None:
+                self._source = open(output_path, 'rb')
+            self._file = open(self.partial_path, 'wb')
+        # Το BOM γράφεται μόνο στην αρχή ενός νέου αρχείου (βλ. write_header)
+        self._text = io.TextIOWrapper(self._file, encoding='utf-8', newline='')
+        self._writer = csv.writer(self._text, lineterminator='\n')
+
+    def _position(self):
+        self._text.flush()
+        return self._file.tell()
+
+    def write_header(self, header_rows, sheet=0):
+        if self.previous is None:
+            self._file.write(codecs.BOM_UTF8)
+            self.write_rows(header_rows, sheet)
+        elif self.in_place:
+            self.manifest.header_end = self.previous.header_end
+            return
+        else:
+            self._copy(0, self.previous.header_end)
+        self.manifest.header_end = self._position()
+
+    def _copy(self, start, end, block_size=1024 * 1024):
+        self._text.flush()
+        self._source.seek(start)
+        remaining = end - start
+        while remaining > 0:
+            block = self._source.read(min(block_size, remaining))
+            if not block:
+                raise ValueError(f"Το αρχείο εξόδου '{self.output_path}' είναι μικρότερο από όσο δηλώνει το manifest")
+            self._file.write(block)
+            remaining -= len(block)
+
+    def copy_source(self, entry):
+        """
+        Κρατά τις γραμμές ενός αρχείου πηγής που δεν άλλαξε, όπως βρίσκονται στο υπάρχον αρχείο εξόδου.
+
+        Parameters:
+        - entry: το ManifestEntry του αρχείου από το προηγούμενο manifest
+        """
+        if self.in_place:
+            self.manifest.entries.append(entry)
+            return
+        start = self._position()
+        self._copy(entry.start, entry.end)
+        self.manifest.entries.append(replace(entry, start=start, end=self._position()))
+
+    def begin_source(self):
+        """
+        Σημειώνει ότι οι επόμενες γραμμές ανήκουν σε νέο αρχείο πηγής.
+        """
+        self._start = self._position()
+
+    def end_source(self, source, rows, complete=True):
+        """
+        Καταγράφει στο manifest τις γραμμές που γράφτηκαν από το begin_source().
+
+        Parameters:
+        - source: το SourceFile του αρχείου
+        - rows: πλήθος γραμμών
+        - complete: False αν το αρχείο απέτυχε αφού γράφτηκαν ήδη κάποιες γραμμές του· τότε θα αντικατασταθούν
+          στην επόμενη συγχώνευση
+        """
+        end = self._position()
+        if end == self._start:
+            return
+        stat = source.stat or os.stat(source.path)
+        digest = None
+        if complete:
+            try:
+                digest = file_digest(source.path)
+            except OSError:
+                complete = False
+        self.manifest.entries.append(ManifestEntry(source.name, stat.st_size if complete else -1,
+                                                   stat.st_mtime_ns, digest, self._start, end, rows))
+
+    def _write_row(self, row, sheet):
+        self._width = max(self._width, len(row))
+        self._writer.writerow(list(row) + [None] * (self._width - len(row)))
+
+    def _finish(self):
+        if not self._text.closed:
+            self._text.close()
+        if self._source is not None:
+            self._source.close()
+
+    def close(self):
+        """
+        Ολοκληρώνει το αρχείο και αποθηκεύει το νέο manifest δίπλα του.
+        """
+        self._finish()
+        if not self.in_place:
+            os.replace(self.partial_path, self.output_path)
+        stat = os.stat(self.output_path)
+        self.manifest.width = self._width
+        self.manifest.output_size = stat.st_size
+        self.manifest.output_mtime_ns = stat.st_mtime_ns
+        self.manifest.save(self.output_path)
+
+    def abort(self):
+        """
+        Εγκαταλείπει την εγγραφή: διαγράφει το προσωρινό αρχείο ή, στην προσθήκη στη θέση του, επαναφέρει
+        το αρχείο εξόδου (μέγεθος και mtime), ώστε το προηγούμενο manifest να ισχύει ακόμη.
+        """
+        if not self.in_place:
+            super().abort()
+            return
+        try:
+            self._finish()
+        except Exception:
+            pass
+        os.truncate(self.output_path, self._original.st_size)
+        os.utime(self.output_path, ns=(self._original.st_atime_ns, self._original.st_mtime_ns))
+
+
+class XlsxwriterStreamWriter(StreamingWriter):
+    """
+    Εγγραφή xlsx με το xlsxwriter σε λειτουργία constant_memory: κάθε γραμμή γράφεται στον δίσκο
+    μόλις ξεκινήσει η επόμενη, άρα η μνήμη μένει σταθερή όσες γραμμές κι αν γραφτούν.
+    Κάθε φύλλο έχει το δικό του προσωρινό αρχείο, οπότε οι γραμμές των φύλλων μπορούν να γράφονται εναλλάξ.
+    """
+
+    def __init__(self, output_path, sheet_titles=(DEFAULT_SHEET_TITLE,)):
+        super().__init__(output_path, sheet_titles)
+        self._workbook = xlsxwriter.Workbook(self.partial_path, {
+            'constant_memory': True,
+            'default_date_format': DATETIME_FORMAT,
+            # Τα κείμενα γράφονται όπως είναι (όπως και με το pandas), όχι ως υπερσύνδεσμοι
+            'strings_to_urls': False,
+        })
+        self._sheets = [self._workbook.add_worksheet(title) for title in self.sheet_titles]
+        self._finished = False
+
+    def _write_row(self, row, sheet):
+        self._sheets[sheet].write_row(self.row_counts[sheet], 0, row)
+
+    def _finish(self):
+        if not self._finished:
+            self._finished = True
+            self._workbook.close()
+
+
+class OpenpyxlStreamWriter(StreamingWriter):
+    """
+    Εγγραφή xlsx με το openpyxl σε λειτουργία write_only (οι γραμμές γράφονται σε προσωρινό αρχείο
+    και όχι σε ένα πλήρες βιβλίο εργασίας στη μνήμη).
+    """
+
+    def __init__(self, output_path, sheet_titles=(DEFAULT_SHEET_TITLE,)):
+        super().__init__(output_path, sheet_titles)
+        from openpyxl import Workbook
+
+        self._workbook = Workbook(write_only=True)
+        self._sheets = [self._workbook.create_sheet(title) for title in self.sheet_titles]
+        self._finished = False
+
+    def _write_row(self, row, sheet):
+        self._sheets[sheet].append(row)
+
+    def _finish(self):
+        if not self._finished:
+            self._finished = True
+            self._workbook.save(self.partial_path)
+
+    def _discard(self):
+        # Δεν χρειάζεται να γραφτεί το βιβλίο εργασίας που θα διαγραφεί
+        self._finished = True
+
+
+# Ονόματα στηλών από τις γραμμές επικεφαλίδας του master: τα μη κενά κελιά κάθε στήλης ενώνονται με ' / '
+# (για επικεφαλίδες πολλών γραμμών), οι κενές στήλες παίρνουν όνομα «Στήλη N» και τα διπλότυπα αριθμούνται
+
+def column_names(header_rows, width):
+    """
+    Επιστρέφει width μοναδικά ονόματα στηλών από τις γραμμές επικεφαλίδας.
+
+    Parameters:
+    - header_rows: οι γραμμές επικεφαλίδας (list of list)
+    - width: πλήθος στηλών
+    """
+    names = []
+    seen = set()
+    for column in range(width):
+        parts = [str(row[column]).strip() for row in header_rows
+                 if column < len(row) and row[column] is not None and str(row[column]).strip()]
+        name = ' / '.join(parts) or f'Στήλη {column + 1}'
+        unique, number = name, 2
+        while unique in seen:
+            unique = f'{name} ({number})'
+            number += 1
+        seen.add(unique)
+        names.append(unique)
+    return names
+
+
+def _value_kind(value):
+    # Το bool ελέγχεται πριν από το int, γιατί στην Python το True είναι και int
+    if isinstance(value, bool):
+        return 'bool'
+    if isinstance(value, int):
+        return 'int'
+    if isinstance(value, float):
+        return 'float'
+    if isinstance(value, datetime):
+        return 'datetime'
+    return 'string'
+
+
+def _fits(kind, value):
+    # True αν η τιμή γράφεται σε στήλη του τύπου kind (σε στήλη κειμένου γράφεται κάθε τιμή ως κείμενο)
+    value_kind = _value_kind(value)
+    return kind == 'string' or value_kind == kind or (kind == 'float' and value_kind == 'int')
+
+
+# Βρίσκει τον τύπο κάθε στήλης από ένα δείγμα γραμμών: οι αριθμητικές στήλες γίνονται πάντα 'float',
+# κάθε άλλος συνδυασμός (ή στήλη χωρίς τιμές) γίνεται 'string'
+
+def infer_column_types(rows, width):
+    """
+    Επιστρέφει τον τύπο κάθε στήλης ('float', 'bool', 'datetime' ή 'string').
+
+    Parameters:
+    - rows: οι γραμμές του δείγματος (list of list)
+    - width: πλήθος στηλών
+    """
+    kinds = [set() for _ in range(width)]
+    for row in rows:
+        for column, value in enumerate(row):
+            if value is not None:
+                kinds[column].add(_value_kind(value))
+    return [_column_type(column_kinds) for column_kinds in kinds]
+
+
+def _column_type(kinds):
+    # Το Excel αποθηκεύει κάθε αριθμό ως δεκαδικό και το convert_cell κάνει int όσους έχουν ακέραια τιμή, άρα
+    # μια στήλη με ακέραιους στο πρώτο κομμάτι (π.χ. βαθμοί 10, 12) μπορεί να έχει δεκαδικούς σε επόμενο (9.5)
+    if kinds and kinds <= {'int', 'float'}:
+        return 'float'
+    if len(kinds) == 1:
+        return next(iter(kinds))
+    return 'string'
+
+
+# Ο τύπος μιας στήλης του ColumnarRows, με τους ίδιους κανόνες: οι στήλες με typed array έχουν ήδη έναν τύπο
+
+def _stored_column_type(column):
+    if column.kind == 'empty':
+        return 'string'
+    if column.kind != 'object':
+        return _column_type({column.kind})
+    return _column_type({_value_kind(value) for value in column.data if value is not None})
+
+
+# Φορτώνει το pyarrow την πρώτη φορά που ζητείται έξοδος parquet/feather· μαζί του φορτώνεται και το numpy,
+# άρα η εκκίνηση της γραμμής εντολών και του GUI δεν το πληρώνει για έξοδο xlsx/csv
+
+def _load_pyarrow():
+    """
+    Επιστρέφει True αν το pyarrow είναι διαθέσιμο (και φορτωμένο στο module).
+    """
+    global pyarrow
+    if pyarrow is None:
+        try:
+            import pyarrow as module
+            import pyarrow.ipc
+            import pyarrow.parquet
+        except ImportError:
+            return False
+        pyarrow = module
+    return True
+
+
+class ColumnarStreamWriter(StreamingWriter):
+    """
+    Εγγραφή Parquet ή Feather (Arrow IPC) σε κομμάτια των chunk_rows γραμμών.
+
+    Οι γραμμές επικεφαλίδας του master γίνονται ονόματα στηλών. Οι τύποι των στηλών βρίσκονται μία φορά,
+    από το πρώτο κομμάτι, και διατηρούνται σε όλο το αρχείο· οι αριθμοί γράφονται πάντα ως float64 (όπως
+    τους αποθηκεύει το Excel). Μια μεταγενέστερη τιμή άλλου είδους (π.χ. κείμενο σε αριθμητική στήλη) γράφεται
+    κενή, ώστε μια λάθος τιμή σε ένα αρχείο να μη χαλά όλη την έξοδο· το write_rows επιστρέφει τέτοιες τιμές
+    ως (θέση γραμμής στο rows, όνομα στήλης, τιμή), για να αναφερθούν στο αρχείο από το οποίο προήλθαν.
+
+    Parameters:
+    - output_path: η διαδρομή του αρχείου εξόδου
+    - output_format: 'parquet' ή 'feather'
+    - compression: συμπίεση ('snappy', 'zstd', 'gzip', 'lz4' ή 'none')· None = προεπιλογή της μορφής
+    - chunk_rows: πλήθος γραμμών ανά κομμάτι (row group / record batch)
+    """
+
+    ARROW_TYPES = {
+        'float': 'float64',
+        'bool': 'bool_',
+        'datetime': 'timestamp',
+        'string': 'string',
+    }
+
+    def __init__(self, output_path, output_format, compression=None, chunk_rows=DEFAULT_CHUNK_ROWS):
+        if not _load_pyarrow():
+            raise ValueError(f"Η μορφή '{output_format}' απαιτεί τη βιβλιοθήκη pyarrow")
+        super().__init__(output_path)
+        self.output_format = output_format
+        self.compression = compression or DEFAULT_COMPRESSION[output_format]
+        self.chunk_rows = max(1, chunk_rows)
+        self.names = None
+        self.types = None
+        self._header = []
+        self._buffer = []
+        self._conflicts = []
+        self._position = 0
+        self._schema = None
+        self._writer = None
+        self._finished = False
+
+    def write_header(self, header_rows, sheet=0):
+        self._header = [list(row) for row in header_rows]
+
+    def write_rows(self, rows, sheet=0):
+        self._conflicts = []
+        self._position = 0
+        if isinstance(rows, ColumnarRows):
+            self._write_columns(rows)
+        else:
+            super().write_rows(rows, sheet)
+        return self._conflicts
+
+    def _write_row(self, row, sheet):
+        # Μόλις οριστούν οι τύποι, κάθε γραμμή ελέγχεται όταν γράφεται, ώστε μια τιμή που δεν ταιριάζει να
+        # αναφερθεί στη γραμμή της (και όχι στο κομμάτι που θα γραφτεί αργότερα)
+        if self.types is not None:
+            conflicts = [column for column, (kind, value) in enumerate(zip(self.types, row))
+                         if value is not None and not _fits(kind, value)]
+            if conflicts:
+                row = list(row)
+                for column in conflicts:
+                    self._conflicts.append((self._position, self.names[column], row[column]))
+                    row[column] = None
+        self._position += 1
+        self._buffer.append(row)
+        if len(self._buffer) >= self.chunk_rows:
+            self._flush()
+
+    def _arrow_type(self, kind):
+        if kind == 'datetime':
+            return pyarrow.timestamp('us')
+        return getattr(pyarrow, self.ARROW_TYPES[kind])()
+
+    def _open(self, types=None):
+        # Οι τύποι βρίσκονται μόνο μία φορά, από το πρώτο κομμάτι γραμμών (ή από τις στήλες ενός ColumnarRows)
+        width = max([len(row) for row in self._header + self._buffer] + [len(types or ())])
+        self.names = column_names(self._header, width)
+        if types is None:
+            types = infer_column_types(self._buffer, width)
+        self.types = types + ['string'] * (width - len(types))
+        self._schema = pyarrow.schema([(name, self._arrow_type(kind)) for name, kind in zip(self.names, self.types)])
+        compression = None if self.compression == 'none' else self.compression
+        if self.output_format == 'parquet':
+            self._writer = pyarrow.parquet.ParquetWriter(self.partial_path, self._schema, compression=compression)
+        else:
+            options = pyarrow.ipc.IpcWriteOptions(compression=compression)
+            self._writer = pyarrow.ipc.new_file(self.partial_path, self._schema, options=options)
+
+    def _column_values(self, column):
+        return self._convert_values(column, (row[column] if column < len(row) else None for row in self._buffer))
+
+    def _convert_values(self, column, column_values):
+        name, kind = self.names[column], self.types[column]
+        values = []
+        for position, value in enumerate(column_values):
+            if value is not None:
+                if kind == 'string':
+                    value = value if isinstance(value, str) else str(value)
+                elif not _fits(kind, value):
+                    self._conflicts.append((position, name, value))
+                    value = None
+                elif kind == 'float':
+                    value = float(value)
+            values.append(value)
+        return values
+
+    def _flush(self):
+        if self._writer is None:
+            self._open()
+        width = len(self.names)
+        for row in self._buffer:
+            if len(row) > width:
+                raise ValueError(f"Βρέθηκε γραμμή με {len(row)} στήλες ενώ το αρχείο έχει {width}: {row}")
+        arrays = [pyarrow.array(self._column_values(column), type=self._schema.field(column).type)
+                  for column in range(width)]
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self._schema))
+        self._buffer = []
+
+    def _write_columns(self, rows):
+        # Οι γραμμές ενός ColumnarRows γράφονται ως ένας πίνακας, απευθείας από τα arrays των στηλών
+        if not rows:
+            return
+        if self._buffer:
+            self._flush()
+        if self._writer is None:
+            self._open([_stored_column_type(column) for column in rows.columns])
+        width = len(self.names)
+        if rows.width > width:
+            row = next(row for row in rows if len(row) > width)
+            raise ValueError(f"Βρέθηκε γραμμή με {len(row)} στήλες ενώ το αρχείο έχει {width}: {row}")
+        arrays = [self._stored_array(rows, column) for column in range(width)]
+        self._writer.write_table(pyarrow.Table.from_arrays(arrays, schema=self._schema))
+        self.row_counts[0] += len(rows)
+
+    def _stored_array(self, rows, column):
+        # Οι αριθμοί και οι ημερομηνίες έχουν ήδη τη μορφή του Arrow (ίδιο bitmap κενών τιμών), άρα περνούν
+        # χωρίς αντιγραφή· το κείμενο φτιάχνεται από τις μοναδικές τιμές και τους δείκτες τους
+        arrow_type = self._schema.field(column).type
+        length = len(rows)
+        if column >= len(rows.columns) or rows.columns[column].kind == 'empty':
+            return pyarrow.nulls(length, arrow_type)
+        stored = rows.columns[column]
+        kind = self.types[column]
+        validity = pyarrow.py_buffer(stored.valid) if stored.null_count else None
+        if stored.kind == kind and kind in ('float', 'datetime'):
+            return pyarrow.Array.from_buffers(arrow_type, length, [validity, pyarrow.py_buffer(stored.data)],
+                                              stored.null_count)
+        if stored.kind == 'int' and kind == 'float':
+            integers = pyarrow.Array.from_buffers(pyarrow.int64(), length,
+                                                  [validity, pyarrow.py_buffer(stored.data)], stored.null_count)
+            return integers.cast(arrow_type)
+        if stored.kind == kind == 'bool':
+            flags = pyarrow.Array.from_buffers(pyarrow.int8(), length, [validity, pyarrow.py_buffer(stored.data)],
+                                               stored.null_count)
+            return flags.cast(arrow_type)
+        if stored.kind == kind == 'string':
+            indices = pyarrow.Array.from_buffers(pyarrow.uint32(), length,
+                                                 [validity, pyarrow.py_buffer(stored.data)], stored.null_count)
+            return pyarrow.array(stored.values, arrow_type).take(indices)
+        return pyarrow.array(self._convert_values(column, stored.slice(0, length)), type=arrow_type)
+
+    def _finish(self):
+        if not self._finished:
+            self._finished = True
+            if self._buffer or self._writer is None:
+                self._flush()
+            self._writer.close()
+
+    def _discard(self):
+        self._finished = True
+        if self._writer is not None:
+            self._writer.close()
+
+
+class MultiFileWriter:
+    """
+    Ένα αρχείο εξόδου ανά φύλλο, για τις μορφές που δεν έχουν φύλλα (csv, parquet, feather).
+    Έχει την ίδια διεπαφή με τον StreamingWriter· το φύλλο sheet γράφεται στο writers[sheet].
+
+    Parameters:
+    - writers: ένας StreamingWriter για κάθε φύλλο
+    """
+
+    def __init__(self, writers):
+        self.writers = list(writers)
+
+    @property
+    def row_count(self):
+        return sum(writer.row_count for writer in self.writers)
+
+    @property
+    def output_paths(self):
+        return [writer.output_path for writer in self.writers]
+
+    def write_header(self, header_rows, sheet=0):
+        self.writers[sheet].write_header(header_rows)
+
+    def write_rows(self, rows, sheet=0):
+        return self.writers[sheet].write_rows(rows)
+
+    def close(self):
+        # Αν αποτύχει ένα αρχείο, τα υπόλοιπα εγκαταλείπονται ώστε να μη μείνει μισό αποτέλεσμα
+        for index, writer in enumerate(self.writers):
+            try:
+                writer.close()
+            except Exception:
+                for remaining in self.writers[index:]:
+                    remaining.abort()
+                raise
+
+    def abort(self):
+        for writer in self.writers:
+            writer.abort()
+
+    # Η θέση της εγγραφής (μόνο για csv, βλ. CsvStreamWriter) είναι η λίστα των θέσεων των αρχείων
+
+    def position(self, sync=False):
+        return [writer.position(sync) for writer in self.writers]
+
+    def rewind(self, position):
+        for writer, file_position in zip(self.writers, position):
+            writer.rewind(file_position)
+
+    def suspend(self):
+        for writer in self.writers:
+            writer.suspend()
+
+
+# Το αρχείο εξόδου ενός φύλλου όταν κάθε φύλλο γράφεται σε χωριστό αρχείο: <όνομα>_<φύλλο>.<κατάληξη>
+
+def sheet_output_path(output_path, sheet_title):
+    """
+    Επιστρέφει τη διαδρομή του αρχείου εξόδου για ένα φύλλο (π.χ. merged_Δημοτικά.csv).
+    """
+    stem, extension = os.path.splitext(output_path)
+    title = ''.join('_' if char in UNSAFE_FILENAME_CHARS else char for char in sheet_title).strip()
+    return f"{stem}_{title}{extension}"
+
+
+def _open_file_writer(output_path, output_format, compression, chunk_rows, resume=None):
+    if output_format in COLUMNAR_FORMATS:
+        return ColumnarStreamWriter(output_path, output_format, compression, chunk_rows)
+    return CsvStreamWriter(output_path, resume)
+
+
+# Επιστρέφει τον κατάλληλο streaming writer για τη μορφή εξόδου
+
+def open_writer(output_path, output_format='xlsx', compression=None, chunk_rows=DEFAULT_CHUNK_ROWS,
+                sheet_titles=None, resume=None):
+    """
+    Ανοίγει streaming writer για το αρχείο εξόδου.
+
+    Parameters:
+    - output_path: η διαδρομή του αρχείου εξόδου
+    - output_format: 'xlsx', 'csv', 'parquet' ή 'feather'
+    - compression: συμπίεση για τις μορφές parquet/feather (None = προεπιλογή της μορφής)
+    - chunk_rows: γραμμές ανά κομμάτι για τις μορφές parquet/feather
+    - sheet_titles: για έξοδο με πολλά φύλλα, τα ονόματά τους· στο xlsx γίνονται φύλλα του ίδιου αρχείου,
+      στις άλλες μορφές κάθε φύλλο γράφεται σε δικό του αρχείο (βλ. sheet_output_path)
+    - resume: μόνο για csv, η θέση (βλ. CsvStreamWriter.position) από την οποία συνεχίζει το προσωρινό αρχείο
+      μιας συγχώνευσης που διακόπηκε (None = νέο αρχείο)
+
+    Returns:
+    - StreamingWriter (ή MultiFileWriter για πολλά φύλλα σε μορφή χωρίς φύλλα)
+    """
+    if output_format in COLUMNAR_FORMATS or output_format == 'csv':
+        if not sheet_titles or len(sheet_titles) == 1:
+            return _open_file_writer(output_path, output_format, compression, chunk_rows, resume)
+        writers = []
+        try:
+            for index, title in enumerate(sheet_titles):
+                writers.append(_open_file_writer(sheet_output_path(output_path, title), output_format,
+                                                 compression, chunk_rows, resume[index] if resume else None))
+        except Exception:
+            for writer in writers:
+                writer.abort()
+            raise
+        return MultiFileWriter(writers)
+    sheet_titles = sheet_titles or (DEFAULT_SHEET_TITLE,)
+    if xlsxwriter is not None:
+        return XlsxwriterStreamWriter(output_path, sheet_titles)
+    return OpenpyxlStreamWriter(output_path, sheet_titles)
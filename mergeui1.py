@@ -1,7 +1,7 @@
 import os
-import pandas as pd
 from tkinter import Tk, Label, Entry, Button, Text, filedialog, messagebox, Scrollbar, END, font
 from datetime import datetime
+from merge_engine import MergeConfig, run_merge
 
 def merge_excel_rows(folder_path, master_filename, output_filename, sheet_name, log_widget):
     def log(message):
@@ -9,65 +9,8 @@ def merge_excel_rows(folder_path, master_filename, output_filename, sheet_name,
         log_widget.see(END)
         log_widget.update()
 
-    master_path = os.path.join(folder_path, master_filename)
-    output_path = os.path.join(folder_path, output_filename)
-    log_lines = []
-    timestamp = datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-    log_lines.append(f"=== Αναφορά συγχώνευσης αρχείων Excel ({timestamp}) ===\n")
-
-    try:
-        master_df = pd.read_excel(master_path, header=None, nrows=1, sheet_name=sheet_name, engine='openpyxl')
-    except Exception as e:
-        msg = f"❌ Σφάλμα στο master αρχείο: {e}"
-        log(msg)
-        return
-
-    merged_data = [master_df.iloc[0].tolist()]
-    total_files = 0
-    success_count = 0
-    failed_files = []
-
-    for filename in os.listdir(folder_path):
-        if not filename.endswith('.xlsx') or filename in [master_filename, output_filename]:
-            continue
-
-        total_files += 1
-        file_path = os.path.join(folder_path, filename)
-
-        try:
-            df = pd.read_excel(file_path, header=None, sheet_name=sheet_name, engine='openpyxl')
-
-            if len(df) >= 2:
-                row_data = df.iloc[1].tolist()
-                merged_data.append(row_data)
-                success_count += 1
-                log(f"✅ {filename}")
-                log(f"   ➤ 2η γραμμή: {row_data}")
-            else:
-                failed_files.append((filename, "Λιγότερες από 2 γραμμές"))
-                log(f"⚠ {filename}: Λιγότερες από 2 γραμμές")
-
-        except ValueError:
-            failed_files.append((filename, "Φύλλο δεν βρέθηκε"))
-            log(f"⚠ {filename}: Φύλλο '{sheet_name}' δεν βρέθηκε")
-        except Exception as e:
-            failed_files.append((filename, str(e)))
-            log(f"⚠ {filename}: {e}")
-
-    try:
-        merged_df = pd.DataFrame(merged_data)
-        merged_df.to_excel(output_path, header=False, index=False)
-        log(f"\n✅ Το αρχείο εξόδου δημιουργήθηκε: {output_path}")
-    except Exception as e:
-        log(f"❌ Σφάλμα αποθήκευσης εξόδου: {e}")
-        return
-
-    log("\n📊 Αναφορά:")
-    log(f"🔢 Συνολικά αρχεία (εκτός master): {total_files}")
-    log(f"✅ Επιτυχώς διαβασμένα: {success_count}")
-    log(f"❌ Προβληματικά: {len(failed_files)}")
-    for fname, reason in failed_files:
-        log(f" - {fname}: {reason}")
+    config = MergeConfig(folder_path, master_filename, output_filename, sheet_name)
+    run_merge(config, log=log)
 
 def save_log_to_file(folder_path, log_widget):
     # Παίρνει όλα τα περιεχόμενα του Text widget
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# Τα modules της εφαρμογής βρίσκονται στη ρίζα του αποθετηρίου (χωρίς πακέτο)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
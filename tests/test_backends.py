@@ -0,0 +1,131 @@
+import html
+import re
+import zipfile
+from datetime import date, datetime, time, timedelta
+from xml.sax.saxutils import escape
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+from openpyxl.styles import PatternFill
+
+from excel_reader import BACKENDS, NO_DATA_ERROR, available_backends, read_header_rows, read_source_rows, \
+    read_source_sheets
+
+FILL = PatternFill('solid', fgColor='FFFF00')
+HEADER = [['Στοιχεία σχολείου'], ['Σχολείο', 'Μαθητές', 'Ημερομηνία', 'Ενεργό', 'Ώρα', 'Διάρκεια', 'Μέσος όρος']]
+
+
+def backends():
+    # Όλα τα backends που υπάρχουν εδώ (το openpyxl είναι η αναφορά)
+    return [pytest.param(backend, marks=pytest.mark.skipif(backend not in available_backends(),
+                                                           reason=f"{backend} δεν είναι διαθέσιμο"))
+            for backend in BACKENDS]
+
+
+def make_workbook(path, rows, formatted_rows=0, formatted_columns=0):
+    # formatted_*: μορφοποίηση (χρώμα) χωρίς τιμή σε στήλες και γραμμές μετά τα δεδομένα
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Sheet1'
+    for row in rows:
+        sheet.append(row)
+    for row in range(len(HEADER) + 1, len(rows) + formatted_rows + 1):
+        for column in range(1, max(len(row) for row in rows) + formatted_columns + 1):
+            sheet.cell(row, column).fill = FILL
+    workbook.save(path)
+    return path
+
+
+def use_shared_strings(path):
+    """
+    Ξαναγράφει τα κείμενα (inlineStr, όπως τα γράφει το openpyxl) στο xl/sharedStrings.xml, όπως τα γράφει
+    το Excel. Το πρώτο κείμενο γράφεται ως rich text (σε δύο τμήματα <r>).
+    """
+    with zipfile.ZipFile(path) as archive:
+        parts = {name: archive.read(name) for name in archive.namelist()}
+    strings = []
+
+    def shared(match):
+        strings.append(html.unescape(match.group(2)))
+        return f'<c{match.group(1)} t="s"><v>{len(strings) - 1}</v></c>'
+
+    sheet = re.sub(r'<c([^>]*?) t="inlineStr"><is><t>(.*?)</t></is></c>', shared,
+                   parts['xl/worksheets/sheet1.xml'].decode('utf-8'))
+    parts['xl/worksheets/sheet1.xml'] = sheet.encode('utf-8')
+    first, rest = escape(strings[0][:1]), escape(strings[0][1:])
+    items = [f'<si><r><t>{first}</t></r><r><t xml:space="preserve">{rest}</t></r></si>']
+    items += [f'<si><t xml:space="preserve">{escape(text)}</t></si>' for text in strings[1:]]
+    parts['xl/sharedStrings.xml'] = (
+        '<sst xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+        f'count="{len(strings)}" uniqueCount="{len(strings)}">{"".join(items)}</sst>').encode('utf-8')
+    parts['[Content_Types].xml'] = parts['[Content_Types].xml'].replace(b'</Types>', (
+        b'<Override PartName="/xl/sharedStrings.xml" ContentType="application/'
+        b'vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/></Types>'))
+    parts['xl/_rels/workbook.xml.rels'] = parts['xl/_rels/workbook.xml.rels'].replace(b'</Relationships>', (
+        b'<Relationship Id="rIdShared" Type="http://schemas.openxmlformats.org/officeDocument/2006/'
+        b'relationships/sharedStrings" Target="sharedStrings.xml"/></Relationships>'))
+    with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as archive:
+        for name, data in parts.items():
+            archive.writestr(name, data)
+    return path
+
+
+DATA = [
+    ['Α', 10.0, datetime(2024, 9, 1, 8, 30), True, time(8, 0), timedelta(hours=1, minutes=30), 9.5],
+    ['Β & Γ', 3, date(2024, 9, 2), False, None, None, 1e20],
+    ['  κενά  '],
+    [None, 7, None, None, None, None, 0.5],
+]
+EXPECTED = [
+    (3, ['Α', 10, datetime(2024, 9, 1, 8, 30), True, time(8, 0), timedelta(hours=1, minutes=30), 9.5]),
+    (4, ['Β & Γ', 3, datetime(2024, 9, 2), False, None, None, 10 ** 20]),
+    (5, ['  κενά  ']),
+    (6, [None, 7, None, None, None, None, 0.5]),
+]
+
+
+@pytest.fixture(params=['inline', 'shared'])
+def workbook(request, tmp_path):
+    path = make_workbook(str(tmp_path / 'a.xlsx'), HEADER + DATA + [[None], ['Μετά την κενή γραμμή']],
+                         formatted_rows=4, formatted_columns=3)
+    return use_shared_strings(path) if request.param == 'shared' else path
+
+
+@pytest.mark.parametrize('backend', backends())
+def test_backends_give_identical_rows(workbook, backend):
+    # Ακέραιοι δεκαδικοί, ημερομηνίες, bool, κείμενα και μορφοποιημένα κενά κελιά στο τέλος κάθε γραμμής
+    assert read_source_rows(workbook, 'Sheet1', 2, backend) == (EXPECTED, None)
+    assert read_source_sheets(workbook, ['Sheet1', 'Λείπει'], 2, backend)[0] == (EXPECTED, None)
+
+
+@pytest.mark.parametrize('backend', backends())
+def test_value_types_match(workbook, backend):
+    rows, _ = read_source_rows(workbook, 'Sheet1', 2, backend)
+    assert [[type(value) for value in row] for _, row in rows] == \
+        [[type(value) for value in row] for _, row in EXPECTED]
+
+
+@pytest.mark.parametrize('backend', backends())
+def test_trailing_formatted_blank_rows_are_ignored(tmp_path, backend):
+    path = make_workbook(str(tmp_path / 'a.xlsx'), HEADER + DATA[:2], formatted_rows=50, formatted_columns=5)
+    assert read_source_rows(path, 'Sheet1', 2, backend) == (EXPECTED[:2], None)
+
+
+@pytest.mark.parametrize('backend', backends())
+def test_whitespace_only_row_ends_data(tmp_path, backend):
+    path = make_workbook(str(tmp_path / 'a.xlsx'), HEADER + DATA[:2] + [['   ', None, '\t'], ['Μετά']])
+    assert read_source_rows(path, 'Sheet1', 2, backend) == (EXPECTED[:2], None)
+
+    path = make_workbook(str(tmp_path / 'b.xlsx'), HEADER + [[' ', '\n']] + DATA)
+    assert read_source_rows(path, 'Sheet1', 2, backend) == ([], NO_DATA_ERROR)
+
+
+@pytest.mark.parametrize('backend', backends())
+def test_multi_row_header(workbook, backend):
+    # Με μία γραμμή επικεφαλίδας η 2η γραμμή του header διαβάζεται ως δεδομένα
+    rows, error = read_source_rows(workbook, 'Sheet1', 1, backend)
+    assert error is None
+    assert rows[0] == (2, HEADER[1])
+    assert rows[1:] == EXPECTED
+    assert read_header_rows(workbook, 'Sheet1', 2) == [HEADER[0], HEADER[1]]
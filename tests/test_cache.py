@@ -0,0 +1,110 @@
+import os
+import pickle
+from datetime import datetime, time, timedelta
+
+from merge_cache import CACHE_FILENAME, LEGACY_CACHE_FILENAME, MergeCache
+
+
+class _Exploit:
+    def __reduce__(self):
+        return (os.system, ('echo pwned',))
+
+
+def make_source(folder, name='a.xlsx'):
+    path = os.path.join(folder, name)
+    with open(path, 'wb') as f:
+        f.write(b'data')
+    return path
+
+
+def test_round_trip_keeps_values(tmp_path):
+    path = make_source(str(tmp_path))
+    rows = [(2, ['Σχολείο', 10, 9.5, True, None, datetime(2024, 9, 1, 8, 30), time(8, 0), timedelta(days=1)])]
+    cache = MergeCache(str(tmp_path)).load()
+    cache.store(path, 'a.xlsx', 'Sheet1', 1, rows)
+    cache.save()
+
+    loaded = MergeCache(str(tmp_path)).load()
+    assert loaded.lookup(path, 'a.xlsx', 'Sheet1', 1) == [[2, rows[0][1]]]
+    assert [type(value) for value in loaded.lookup(path, 'a.xlsx', 'Sheet1', 1)[0][1]] == \
+        [type(value) for value in rows[0][1]]
+
+
+def test_header_rows_are_stored_with_the_rows(tmp_path):
+    path = make_source(str(tmp_path))
+    cache = MergeCache(str(tmp_path)).load()
+    cache.store(path, 'a.xlsx', 'Sheet1', 1, [(2, ['Α', 1])], header=[['Σχολείο', 'Μαθητές']])
+    cache.store(path, 'a.xlsx', 'Sheet2', 1, [(2, ['Β', 2])])
+    cache.save()
+
+    loaded = MergeCache(str(tmp_path)).load()
+    assert loaded.read_sheet('a.xlsx', 'Sheet1', 1) == ([[2, ['Α', 1]]], [['Σχολείο', 'Μαθητές']])
+    assert loaded.read_sheet('a.xlsx', 'Sheet2', 1) == ([[2, ['Β', 2]]], None)
+
+
+def test_pickle_files_are_never_loaded(tmp_path):
+    with open(tmp_path / LEGACY_CACHE_FILENAME, 'wb') as f:
+        pickle.dump({'version': 1, 'entries': _Exploit()}, f)
+    with open(tmp_path / CACHE_FILENAME, 'wb') as f:
+        pickle.dump({'version': 2, 'entries': _Exploit()}, f)
+    cache = MergeCache(str(tmp_path)).load()
+    assert cache.entries == {}
+
+    cache.store(make_source(str(tmp_path)), 'a.xlsx', 'Sheet1', 1, [(2, [1])])
+    cache.save()
+    assert not (tmp_path / LEGACY_CACHE_FILENAME).exists()
+
+
+def test_malformed_entries_are_rejected(tmp_path):
+    (tmp_path / CACHE_FILENAME).write_text(
+        '{"version":3,"entries":[["a.xlsx","Sheet1",1,1,4,null,0,14],["b.xlsx","Sheet1",1,1,4,null,"0",14]]}\n'
+        '[[2,["x"]]]\n[[2,["y"]]]\n', encoding='utf-8')
+    assert MergeCache(str(tmp_path)).load().entries == {}
+
+
+def test_rows_stay_on_disk(tmp_path):
+    folder = str(tmp_path)
+    paths = [make_source(folder, name) for name in ('a.xlsx', 'b.xlsx')]
+    cache = MergeCache(folder).load()
+    cache.store(paths[0], 'a.xlsx', 'Sheet1', 1, [(2, ['Α', 1])])
+    cache.save()
+
+    # Μια παλιά και μια νέα εγγραφή· στη μνήμη κρατιέται μόνο η θέση των γραμμών τους
+    cache = MergeCache(folder).load()
+    cache.store(paths[1], 'b.xlsx', 'Sheet1', 1, [(2, ['Β', 2]), (3, ['Γ', 3])])
+    assert all('rows' not in entry for entry in cache.entries.values())
+    assert cache.lookup(paths[1], 'b.xlsx', 'Sheet1', 1) == [[2, ['Β', 2]], [3, ['Γ', 3]]]
+    cache.save()
+    assert not os.path.exists(cache.rows_path)
+
+    loaded = MergeCache(folder).load()
+    assert loaded.lookup(paths[0], 'a.xlsx', 'Sheet1', 1) == [[2, ['Α', 1]]]
+    assert loaded.lookup(paths[1], 'b.xlsx', 'Sheet1', 1) == [[2, ['Β', 2]], [3, ['Γ', 3]]]
+    loaded.close()
+
+
+def test_unreadable_rows_count_as_a_miss(tmp_path):
+    folder = str(tmp_path)
+    path = make_source(folder)
+    cache = MergeCache(folder).load()
+    cache.store(path, 'a.xlsx', 'Sheet1', 1, [(2, ['Α', 1])])
+    cache.save()
+    with open(cache.path, 'rb') as f:
+        data = f.read()
+    with open(cache.path, 'wb') as f:
+        f.write(data.replace(b'[[2,', b'[[x,'))
+
+    cache = MergeCache(folder).load()
+    assert cache.contains(path, 'a.xlsx', 'Sheet1', 1)
+    assert cache.read_rows('a.xlsx', 'Sheet1', 1) is None
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert cache.entries == {}
+    cache.close()
+
+
+def test_values_that_json_cannot_hold_are_not_cached(tmp_path):
+    path = make_source(str(tmp_path))
+    cache = MergeCache(str(tmp_path)).load()
+    cache.store(path, 'a.xlsx', 'Sheet1', 1, [(2, [object()])])
+    assert cache.entries == {}
+    cache.close()
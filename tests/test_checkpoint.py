@@ -0,0 +1,166 @@
+import json
+import os
+import pickle
+import threading
+from datetime import datetime
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from merge_checkpoint import MergeCheckpoint, checkpoint_path
+from merge_engine import MergeConfig, run_merge
+
+
+class _Exploit:
+    def __reduce__(self):
+        return (os.system, ('echo pwned',))
+
+
+def make_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Sheet1'
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def make_folder(folder):
+    make_workbook(os.path.join(folder, 'master.xlsx'), [['Σχολείο', 'Μαθητές', 'Ημερομηνία']])
+    for number in range(1, 5):
+        make_workbook(os.path.join(folder, f'school{number}.xlsx'), [
+            ['Σχολείο', 'Μαθητές', 'Ημερομηνία'],
+            [f'Σχολείο {number}', number * 10, datetime(2024, 9, number)],
+            [f'Σχολείο {number}β', number + 0.5, None],
+        ])
+
+
+def config(folder, **kwargs):
+    return MergeConfig(folder=folder, sheet_name='Sheet1', output_filename='out.csv', use_cache=False,
+                       log_rows=False, **kwargs)
+
+
+def read_output(folder):
+    with open(os.path.join(folder, 'out.csv'), 'rb') as f:
+        return f.read()
+
+
+def merge_and_cancel(folder, **kwargs):
+    # Ακύρωση μετά τα δύο πρώτα από τα τέσσερα αρχεία
+    cancel = threading.Event()
+    result = run_merge(config(folder, checkpoint=True, **kwargs),
+                       progress=lambda percent: cancel.set() if percent >= 50 else None, cancel_event=cancel)
+    assert result.cancelled
+    return result
+
+
+def expected_output(folder, **kwargs):
+    assert run_merge(config(folder, **kwargs)).error is None
+    expected = read_output(folder)
+    os.remove(os.path.join(folder, 'out.csv'))
+    return expected
+
+
+# Χωρίς αφαίρεση διπλών καταγράφεται η θέση του αρχείου εξόδου csv, με αφαίρεση διπλών οι γραμμές
+@pytest.mark.parametrize('dedup', [None, 'first'])
+def test_resume_after_cancel_gives_same_output(tmp_path, dedup):
+    folder = str(tmp_path)
+    make_folder(folder)
+    expected = expected_output(folder, dedup=dedup)
+
+    merge_and_cancel(folder, dedup=dedup)
+    assert os.path.exists(checkpoint_path(config(folder)))
+    assert os.path.exists(os.path.join(folder, 'out.csv.part')) == (dedup is None)
+
+    result = run_merge(config(folder, resume=True, dedup=dedup))
+    assert result.error is None
+    assert [f.filename for f in result.files] == [f'school{number}.xlsx' for number in range(1, 5)]
+    assert read_output(folder) == expected
+    assert not os.path.exists(checkpoint_path(config(folder)))
+    assert not os.path.exists(os.path.join(folder, 'out.csv.part'))
+
+
+def test_no_checkpoint_by_default(tmp_path):
+    folder = str(tmp_path)
+    make_folder(folder)
+    cancel = threading.Event()
+    result = run_merge(config(folder), progress=lambda percent: cancel.set() if percent >= 50 else None,
+                       cancel_event=cancel)
+    assert result.cancelled
+    assert sorted(os.listdir(folder)) == ['master.xlsx'] + [f'school{number}.xlsx' for number in range(1, 5)]
+
+
+def test_checkpoint_records_output_position_instead_of_rows(tmp_path):
+    folder = str(tmp_path)
+    make_folder(folder)
+    merge_and_cancel(folder)
+    with open(checkpoint_path(config(folder)), 'rb') as f:
+        records = [json.loads(line) for line in f]
+    assert [record[0] for record in records] == ['checkpoint', 'file', 'file']
+    part_size = os.path.getsize(os.path.join(folder, 'out.csv.part'))
+    assert records[-1][5][0] == part_size
+
+
+def test_resume_truncates_rows_written_after_the_checkpoint(tmp_path):
+    folder = str(tmp_path)
+    make_folder(folder)
+    expected = expected_output(folder)
+    merge_and_cancel(folder)
+    # Γραμμές που γράφτηκαν μετά το τελευταίο ολοκληρωμένο αρχείο (π.χ. τερματισμός στη μέση ενός αρχείου)
+    with open(os.path.join(folder, 'out.csv.part'), 'ab') as f:
+        f.write(b'half,written\n')
+
+    assert run_merge(config(folder, resume=True)).error is None
+    assert read_output(folder) == expected
+
+
+def test_resume_rewrites_from_first_changed_file(tmp_path):
+    folder = str(tmp_path)
+    make_folder(folder)
+    merge_and_cancel(folder)
+    # Ένα νέο αρχείο ανάμεσα στα ολοκληρωμένα: από εκεί και πέρα τα αρχεία ξαναγράφονται
+    make_workbook(os.path.join(folder, 'school1b.xlsx'), [['Σχολείο', 'Μαθητές', 'Ημερομηνία'], ['Νέο', 1, None]])
+    result = run_merge(config(folder, resume=True))
+    assert result.error is None
+    resumed = read_output(folder)
+    assert len(result.files) == 5
+
+    os.remove(os.path.join(folder, 'out.csv'))
+    assert run_merge(config(folder)).error is None
+    assert resumed == read_output(folder)
+
+
+def test_pickle_checkpoint_is_never_loaded(tmp_path, capfd):
+    path = str(tmp_path / 'out.csv.checkpoint')
+    with open(path, 'wb') as f:
+        pickle.dump(('checkpoint', 3, 'abc', None), f)
+        pickle.dump(('file', 'a.xlsx', 1, 1, [(0, _Exploit())]), f)
+
+    assert MergeCheckpoint(path, 'abc').load().entries == {}
+    assert 'pwned' not in capfd.readouterr().out
+
+
+def test_partial_and_malformed_records_are_ignored(tmp_path):
+    folder = str(tmp_path)
+    make_folder(folder)
+    merge_and_cancel(folder, dedup='first')
+    path = checkpoint_path(config(folder))
+    with open(path, 'rb') as f:
+        lines = f.read().splitlines(keepends=True)
+    fingerprint = json.loads(lines[0])[2]
+
+    def entries(data):
+        with open(path, 'wb') as f:
+            f.write(data)
+        return sorted(MergeCheckpoint(path, fingerprint).load().entries)
+
+    assert entries(b''.join(lines)) == ['school1.xlsx', 'school2.xlsx']
+    # Μια εγγραφή που έμεινε μισή αγνοείται· τα αρχεία που ολοκληρώθηκαν πριν από αυτήν ισχύουν
+    assert entries(b''.join(lines) + b'["rows",0,[[2,["x"') == ['school1.xlsx', 'school2.xlsx']
+    # Μια εγγραφή με λάθος μορφή ακυρώνει και όσες ακολουθούν
+    first_file = next(i for i, line in enumerate(lines) if line.startswith(b'["file"'))
+    broken = lines[:first_file] + [lines[first_file].replace(b'"school1.xlsx"', b'1')] + lines[first_file + 1:]
+    assert entries(b''.join(broken)) == []
+    # Άλλες ρυθμίσεις: το checkpoint δεν ισχύει
+    assert MergeCheckpoint(path, 'other').load().entries == {}
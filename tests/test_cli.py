@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+from merge_functions import EXIT_ERROR, EXIT_OK, confirm_overwrite, main
+
+
+def make_folder(folder):
+    for name in ('master.xlsx', 'a.xlsx'):
+        workbook = openpyxl.Workbook()
+        workbook.active.title = 'Α'
+        workbook.active.append(['Σχολείο'])
+        workbook.active.append(['Σχολείο 1'])
+        workbook.create_sheet('Β').append(['Τάξη'])
+        workbook['Β'].append(['Α1'])
+        workbook.save(os.path.join(folder, name))
+
+
+def test_confirm_overwrite_checks_every_path(tmp_path):
+    existing = tmp_path / 'out_Β.csv'
+    existing.write_text('')
+    paths = [str(tmp_path / 'out_Α.csv'), str(existing)]
+    assert not confirm_overwrite(paths, 'never')
+    assert confirm_overwrite(paths, 'always')
+    assert confirm_overwrite(paths[:1], 'never')
+
+
+def test_multi_sheet_output_is_not_overwritten(tmp_path, capsys):
+    folder = str(tmp_path)
+    make_folder(folder)
+    # Το out.csv δεν υπάρχει, αλλά υπάρχει το αρχείο ενός από τα φύλλα
+    (tmp_path / 'out_Β.csv').write_text('παλιό', encoding='utf-8')
+    argv = ['-f', folder, '-o', 'out.csv', '--all-sheets', '--no-cache', '-q']
+
+    assert main(argv + ['--overwrite', 'never']) == EXIT_ERROR
+    assert "'out_Β.csv'" in capsys.readouterr().out
+    assert (tmp_path / 'out_Β.csv').read_text(encoding='utf-8') == 'παλιό'
+    assert not (tmp_path / 'out_Α.csv').exists()
+
+    assert main(argv + ['--overwrite', 'always']) == EXIT_OK
+    assert (tmp_path / 'out_Β.csv').read_text(encoding='utf-8-sig').splitlines() == ['Τάξη', 'Α1']
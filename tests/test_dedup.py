@@ -0,0 +1,36 @@
+import os
+import subprocess
+import sys
+
+import merge_dedup
+from merge_dedup import KEEP_FIRST, KEEP_LAST, RowDeduplicator
+
+
+def test_keys_are_stable_digests():
+    deduplicator = RowDeduplicator()
+    key = deduplicator._key(['Α', 10, None])
+    assert isinstance(key, bytes) and len(key) == 16
+    assert key == deduplicator._key(['Α', 10])
+    # Τιμές που έχουν ίδια εμφάνιση αλλά διαφορετικό τύπο δεν θεωρούνται ίδιες
+    assert len({deduplicator._key(values) for values in (['1'], [1], [1.5], [True])}) == 4
+    assert deduplicator._key([None, None]) is None
+
+
+def test_keys_do_not_depend_on_hash_seed():
+    code = "from merge_dedup import RowDeduplicator; print(RowDeduplicator()._key(['Α', 1]).hex())"
+    keys = {subprocess.run([sys.executable, '-c', code], capture_output=True, text=True, check=True,
+                           env={'PYTHONHASHSEED': seed, 'PYTHONPATH': os.path.dirname(merge_dedup.__file__)}).stdout
+            for seed in ('1', '2')}
+    assert len(keys) == 1
+
+
+def test_filter_keeps_first_and_last():
+    rows = [(2, ['Α', 1]), (3, ['Β', 2]), (4, ['Α', 1])]
+    first = RowDeduplicator(policy=KEEP_FIRST)
+    first.start_file('a.xlsx')
+    assert first.filter(rows) == rows[:2]
+    assert first.duplicate_count == 1
+
+    last = RowDeduplicator(key_positions=(0,), policy=KEEP_LAST)
+    last.start_file('a.xlsx')
+    assert last.survivors([values for _, values in last.filter(rows)]) == [['Β', 2], ['Α', 1]]
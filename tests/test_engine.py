@@ -0,0 +1,178 @@
+import csv
+import os
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+import merge_engine
+from merge_engine import STATUS_CACHED, STATUS_MERGED, STATUS_REUSED, MergeConfig, iter_source_results, run_merge
+
+HEADER = ['Σχολείο', 'Μαθητές', 'Βαθμός']
+
+
+def make_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Sheet1'
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def make_folder(folder, files):
+    make_workbook(os.path.join(folder, 'master.xlsx'), [HEADER])
+    for name, rows in files.items():
+        make_workbook(os.path.join(folder, name), [HEADER] + rows)
+
+
+def merge(folder, output='out.csv', **kwargs):
+    config = MergeConfig(folder=str(folder), sheet_name='Sheet1', output_filename=output, use_cache=False,
+                         log_rows=False, **kwargs)
+    messages = []
+    result = run_merge(config, log=messages.append)
+    assert result.error is None, messages
+    return result
+
+
+def read_csv(folder, output='out.csv'):
+    with open(os.path.join(folder, output), newline='', encoding='utf-8-sig') as f:
+        return list(csv.reader(f))
+
+
+FILES = {
+    'a.xlsx': [['Α', 10, 9.5], ['Β', 20, 8]],
+    'b.xlsx': [['Α', 10, 9.5], ['Γ', 30, 7.25]],
+}
+
+
+def test_merge_writes_rows_in_file_order(tmp_path):
+    make_folder(str(tmp_path), FILES)
+    result = merge(tmp_path)
+    assert [f.status for f in result.files] == [STATUS_MERGED, STATUS_MERGED]
+    assert result.row_count == 4
+    assert read_csv(tmp_path) == [HEADER, ['Α', '10', '9.5'], ['Β', '20', '8'], ['Α', '10', '9.5'],
+                                  ['Γ', '30', '7.25']]
+
+
+@pytest.mark.parametrize('policy, expected', [
+    ('first', [['Α', '10', '9.5'], ['Β', '20', '8'], ['Γ', '30', '7.25']]),
+    ('last', [['Β', '20', '8'], ['Α', '10', '9.5'], ['Γ', '30', '7.25']]),
+])
+def test_dedup(tmp_path, policy, expected):
+    make_folder(str(tmp_path), FILES)
+    result = merge(tmp_path, dedup=policy)
+    assert result.duplicate_count == 1
+    assert read_csv(tmp_path) == [HEADER] + expected
+
+
+def test_dedup_by_key_columns(tmp_path):
+    make_folder(str(tmp_path), {'a.xlsx': [['Α', 10, 9.5]], 'b.xlsx': [['Α', 11, 6]]})
+    result = merge(tmp_path, dedup='first', dedup_columns=('Σχολείο',))
+    assert result.duplicate_count == 1
+    assert read_csv(tmp_path) == [HEADER, ['Α', '10', '9.5']]
+
+
+def test_align_columns_by_name(tmp_path):
+    make_workbook(os.path.join(tmp_path, 'master.xlsx'), [HEADER])
+    make_workbook(os.path.join(tmp_path, 'a.xlsx'), [['Βαθμός', 'Σχολείο', 'Άλλο'], [9.5, 'Α', 'x']])
+    result = merge(tmp_path, align_columns=True)
+    assert result.files[0].unknown_columns == ('Άλλο',)
+    assert result.files[0].missing_columns == ('Μαθητές',)
+    assert read_csv(tmp_path) == [HEADER, ['Α', '', '9.5']]
+
+
+@pytest.mark.parametrize('kwargs', [{}, {'memory_budget': 1}, {'use_cache': True}])
+def test_align_columns_uses_header_from_the_read(tmp_path, monkeypatch, kwargs):
+    make_workbook(os.path.join(tmp_path, 'master.xlsx'), [HEADER])
+    make_workbook(os.path.join(tmp_path, 'a.xlsx'), [['Βαθμός', 'Σχολείο'], [9.5, 'Α']])
+    config = MergeConfig(folder=str(tmp_path), sheet_name='Sheet1', output_filename='out.csv', log_rows=False,
+                         align_columns=True, **{'use_cache': False, **kwargs})
+    if config.use_cache:
+        # Η δεύτερη συγχώνευση παίρνει γραμμές και επικεφαλίδα από την cache
+        assert merge_engine.run_merge(config).error is None
+
+    def reopen(path):
+        raise AssertionError(f"το {path} ξανάνοιξε για την επικεφαλίδα")
+    monkeypatch.setattr(merge_engine, 'get_workbook_metadata', reopen)
+    result = merge_engine.run_merge(config)
+    assert result.error is None
+    assert result.files[0].status == (STATUS_CACHED if config.use_cache else STATUS_MERGED)
+    assert read_csv(tmp_path) == [HEADER, ['Α', '', '9.5']]
+
+
+def test_append_reads_only_new_files(tmp_path):
+    make_folder(str(tmp_path), FILES)
+    merge(tmp_path, append=True)
+    make_workbook(os.path.join(tmp_path, 'c.xlsx'), [HEADER, ['Δ', 40, 10]])
+
+    result = merge(tmp_path, append=True)
+    assert [f.status for f in result.files] == [STATUS_REUSED, STATUS_REUSED, STATUS_MERGED]
+    appended = read_csv(tmp_path)
+    merge(tmp_path, output='full.csv')
+    assert appended == read_csv(tmp_path, 'full.csv')
+
+
+@pytest.mark.parametrize('output_format', ['parquet', 'feather'])
+@pytest.mark.parametrize('memory_budget', [None, 1])
+def test_columnar_writers(tmp_path, output_format, memory_budget):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.feather
+    import pyarrow.parquet
+    make_folder(str(tmp_path), FILES)
+    merge(tmp_path, output=f'out.{output_format}', memory_budget=memory_budget)
+
+    path = os.path.join(tmp_path, f'out.{output_format}')
+    table = pyarrow.parquet.read_table(path) if output_format == 'parquet' else pyarrow.feather.read_table(path)
+    assert table.column_names == HEADER
+    assert table.schema.field('Μαθητές').type == pyarrow.float64()
+    assert table.to_pydict() == {'Σχολείο': ['Α', 'Β', 'Α', 'Γ'], 'Μαθητές': [10.0, 20.0, 10.0, 30.0],
+                                 'Βαθμός': [9.5, 8.0, 9.5, 7.25]}
+
+
+def test_memory_budget_and_no_streaming_give_same_output(tmp_path):
+    make_folder(str(tmp_path), FILES)
+    merge(tmp_path)
+    expected = read_csv(tmp_path)
+    merge(tmp_path, memory_budget=1)
+    assert read_csv(tmp_path) == expected
+    merge(tmp_path, streaming=False)
+    assert read_csv(tmp_path) == expected
+
+
+@pytest.mark.parametrize('prefetch, ahead', [(0, 1), (2, 3)])
+def test_serial_reading_consumes_sources_lazily(tmp_path, prefetch, ahead):
+    files = {f'{number}.xlsx': [['Α', number, 1]] for number in range(6)}
+    make_folder(str(tmp_path), files)
+    pulled = []
+
+    def sources():
+        for name in files:
+            pulled.append(name)
+            yield os.path.join(tmp_path, name), ('Sheet1',)
+
+    results = iter_source_results(sources(), prefetch=prefetch)
+    try:
+        sheet_reads, _ = next(results)
+        assert sheet_reads == [([(2, ['Α', 0, 1])], None)]
+        # Μόνο το αρχείο που διαβάστηκε και το παράθυρο της προφόρτωσης έχουν ζητηθεί από τη σάρωση
+        assert len(pulled) == ahead
+        assert [rows for (rows, _), in (reads for reads, _ in results)] == \
+            [[(2, ['Α', number, 1])] for number in range(1, 6)]
+    finally:
+        results.close()
+
+
+def test_text_in_numeric_column_does_not_fail_the_merge(tmp_path, monkeypatch):
+    pyarrow = pytest.importorskip('pyarrow')
+    import pyarrow.parquet
+    import merge_engine
+    monkeypatch.setattr(merge_engine, 'DEFAULT_CHUNK_ROWS', 2)
+    make_folder(str(tmp_path), {'a.xlsx': [['Α', 10, 9.5], ['Β', 20, 8]], 'b.xlsx': [['Γ', 'δεν ξέρω', 7]]})
+    result = merge(tmp_path, output='out.parquet')
+
+    assert [f.status for f in result.files] == [STATUS_MERGED, STATUS_MERGED]
+    assert result.files[1].conflict_count == 1
+    assert result.files[1].conflicts == ("γραμμή 2, στήλη 'Μαθητές': 'δεν ξέρω'",)
+    table = pyarrow.parquet.read_table(os.path.join(tmp_path, 'out.parquet'))
+    assert table.column('Μαθητές').to_pylist() == [10.0, 20.0, None]
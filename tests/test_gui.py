@@ -0,0 +1,74 @@
+import os
+import threading
+import time
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+ExcelMergeGUI = pytest.importorskip('ExcelMergeGUI')
+
+
+class FakeMenu:
+    # Αντικαθιστά το OptionMenu: το after εκτελείται από τον βρόχο του ελέγχου, όπως το mainloop
+    def __init__(self):
+        self.items = []
+        self.scheduled = []
+        self.threads = set()
+
+    def __getitem__(self, key):
+        return self
+
+    def delete(self, first, last):
+        self.items.clear()
+
+    def add_command(self, label, command):
+        self.items.append(label)
+
+    def after(self, ms, callback, *args):
+        self.threads.add(threading.current_thread())
+        self.scheduled.append((callback, args))
+
+    def run(self, timeout=5):
+        deadline = time.monotonic() + timeout
+        while self.scheduled and time.monotonic() < deadline:
+            callback, args = self.scheduled.pop(0)
+            callback(*args)
+            time.sleep(0.01)
+
+
+class FakeVar:
+    value = None
+
+    def set(self, value):
+        self.value = value
+
+
+def make_workbook(path, sheets):
+    workbook = openpyxl.Workbook()
+    workbook.active.title = sheets[0]
+    for sheet in sheets[1:]:
+        workbook.create_sheet(sheet)
+    workbook.save(path)
+
+
+def test_scan_counts_sheet_presence(tmp_path):
+    make_workbook(os.path.join(tmp_path, 'master.xlsx'), ['Α', 'Β'])
+    make_workbook(os.path.join(tmp_path, 'a.xlsx'), ['Α', 'Β'])
+    make_workbook(os.path.join(tmp_path, 'b.xlsx'), ['Α'])
+    assert ExcelMergeGUI.scan_sheet_list(str(tmp_path), 'master.xlsx') == [
+        ('Α', 'Α  ✔ σε όλα τα αρχεία (2)'), ('Β', 'Β  ⚠ σε 1 από 2 αρχεία')]
+
+
+def test_updater_scans_in_background_and_applies_latest(tmp_path):
+    make_workbook(os.path.join(tmp_path, 'master.xlsx'), ['Α', 'Β'])
+    make_workbook(os.path.join(tmp_path, 'other.xlsx'), ['Γ'])
+    menu, selected = FakeMenu(), FakeVar()
+    updater = ExcelMergeGUI.SheetListUpdater(selected, menu, poll_interval_ms=1)
+
+    updater.update(str(tmp_path), 'master.xlsx')
+    updater.update(str(tmp_path), 'other.xlsx')
+    menu.run()
+    # Η πρώτη σάρωση ξεπεράστηκε από τη δεύτερη· τα widgets αλλάζουν μόνο από το κύριο νήμα
+    assert selected.value == 'Γ'
+    assert menu.items == ['Γ  ⚠ σε 0 από 1 αρχεία']
+    assert menu.threads == {threading.current_thread()}
@@ -0,0 +1,39 @@
+from datetime import datetime
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+
+from merge_rowstore import ColumnarRows
+
+ROWS = [
+    ['Α', 10, 9.5, True, datetime(2024, 9, 1, 8, 30), 'x'],
+    ['Β', None, None, None, None, 3],
+    ['Α', 30, 7.25, False, datetime(2024, 9, 2)],
+]
+
+
+def test_to_dataframe_builds_typed_columns():
+    rows = ColumnarRows(ROWS)
+    frame = rows.to_dataframe()
+    assert [str(dtype) for dtype in frame.dtypes] == ['object', 'Int64', 'float64', 'boolean', 'datetime64[us]',
+                                                      'object']
+    assert frame[1].tolist() == [10, pd.NA, 30]
+    assert frame[2].isna().tolist() == [False, True, False]
+    assert frame[3].tolist() == [True, pd.NA, False]
+    assert frame[4].tolist() == [pd.Timestamp(2024, 9, 1, 8, 30), pd.NaT, pd.Timestamp(2024, 9, 2)]
+    assert frame[5].tolist() == ['x', 3, None]
+
+    # Τα δεδομένα έχουν αντιγραφεί: η στήλη συνεχίζει να δέχεται γραμμές
+    rows.append(['Γ', 40])
+    assert rows[-1] == ['Γ', 40]
+    assert len(frame) == 3
+
+
+def test_to_dataframe_with_header_matches_list_frame():
+    header = [['Σχολείο', 'Μαθητές', 'Βαθμός', 'Ενεργό', 'Ημερομηνία']]
+    frame = ColumnarRows(ROWS).to_dataframe(header)
+    expected = pd.DataFrame(header + ROWS)
+    assert frame.shape == expected.shape
+    assert frame.astype(object).where(frame.notna(), None).values.tolist() == \
+        expected.astype(object).where(expected.notna(), None).values.tolist()
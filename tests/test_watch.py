@@ -0,0 +1,68 @@
+import os
+
+import pytest
+
+openpyxl = pytest.importorskip('openpyxl')
+
+import merge_watch
+from merge_engine import STATUS_MERGED, STATUS_REUSED, MergeConfig
+from merge_watch import folder_snapshot, run_watch
+
+HEADER = ['Σχολείο', 'Μαθητές']
+
+
+def make_workbook(path, rows):
+    workbook = openpyxl.Workbook()
+    sheet = workbook.active
+    sheet.title = 'Sheet1'
+    for row in rows:
+        sheet.append(row)
+    workbook.save(path)
+
+
+def watch(monkeypatch, config, changes):
+    # Κάθε αναμονή εφαρμόζει την επόμενη αλλαγή στον φάκελο· όταν τελειώσουν, η παρακολούθηση σταματά
+    changes = list(changes)
+
+    def wait_for_changes(config, previous, stop_event, interval, debounce):
+        if not changes:
+            return None
+        changes.pop(0)()
+        return folder_snapshot(config)
+
+    monkeypatch.setattr(merge_watch, 'wait_for_changes', wait_for_changes)
+    messages, results = [], []
+    run_watch(config, log=messages.append, on_result=results.append)
+    return messages, results
+
+
+def config(folder, output):
+    return MergeConfig(folder=folder, sheet_name='Sheet1', output_filename=output, use_cache=False, log_rows=False)
+
+
+def test_csv_rounds_after_the_first_update_the_output(tmp_path, monkeypatch):
+    folder = str(tmp_path)
+    make_workbook(os.path.join(folder, 'master.xlsx'), [HEADER])
+    make_workbook(os.path.join(folder, 'a.xlsx'), [HEADER, ['Α', 1]])
+
+    messages, results = watch(monkeypatch, config(folder, 'out.csv'), [
+        lambda: make_workbook(os.path.join(folder, 'b.xlsx'), [HEADER, ['Β', 2]]),
+    ])
+    assert [f.status for f in results[0].files] == [STATUS_MERGED]
+    assert [(f.filename, f.status) for f in results[1].files] == [('a.xlsx', STATUS_REUSED),
+                                                                  ('b.xlsx', STATUS_MERGED)]
+    assert any('οι νέες γραμμές προστίθενται στο τέλος' in message for message in messages)
+    with open(os.path.join(folder, 'out.csv'), encoding='utf-8-sig') as f:
+        assert f.read() == 'Σχολείο,Μαθητές\nΑ,1\nΒ,2\n'
+
+
+def test_formats_that_cannot_be_updated_are_rebuilt_each_round(tmp_path, monkeypatch):
+    folder = str(tmp_path)
+    make_workbook(os.path.join(folder, 'master.xlsx'), [HEADER])
+    make_workbook(os.path.join(folder, 'a.xlsx'), [HEADER, ['Α', 1]])
+
+    messages, results = watch(monkeypatch, config(folder, 'out.xlsx'), [
+        lambda: make_workbook(os.path.join(folder, 'b.xlsx'), [HEADER, ['Β', 2]]),
+    ])
+    assert any('ξαναγράφεται ολόκληρο' in message for message in messages)
+    assert [f.status for f in results[1].files] == [STATUS_MERGED, STATUS_MERGED]
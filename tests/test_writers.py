@@ -0,0 +1,58 @@
+import pytest
+
+from merge_rowstore import ColumnarRows
+from merge_writers import ColumnarStreamWriter
+
+pyarrow = pytest.importorskip('pyarrow')
+import pyarrow.parquet  # noqa: E402
+
+
+def write_parquet(path, rows, chunk_rows):
+    writer = ColumnarStreamWriter(str(path), 'parquet', chunk_rows=chunk_rows)
+    try:
+        writer.write_header([['Σχολείο', 'Βαθμός']])
+        writer.write_rows(rows)
+        writer.close()
+    except Exception:
+        writer.abort()
+        raise
+    return pyarrow.parquet.read_table(str(path))
+
+
+def test_integral_first_chunk_then_fractional_value(tmp_path):
+    # Το πρώτο κομμάτι έχει μόνο ακέραιους βαθμούς (10.0 -> 10 από το convert_cell), το επόμενο 9.5
+    rows = [['Α', 10], ['Β', 12], ['Γ', 9.5], ['Δ', None]]
+    table = write_parquet(tmp_path / 'out.parquet', rows, chunk_rows=2)
+    assert table.schema.field('Βαθμός').type == pyarrow.float64()
+    assert table.column('Βαθμός').to_pylist() == [10.0, 12.0, 9.5, None]
+
+
+def test_columnar_rows_integer_column_is_float(tmp_path):
+    table = write_parquet(tmp_path / 'out.parquet', ColumnarRows([['Α', 10], ['Β', None], ['Γ', 7]]), chunk_rows=10)
+    assert table.schema.field('Βαθμός').type == pyarrow.float64()
+    assert table.column('Βαθμός').to_pylist() == [10.0, None, 7.0]
+
+
+def write_parquet_conflicts(path, rows, chunk_rows):
+    writer = ColumnarStreamWriter(str(path), 'parquet', chunk_rows=chunk_rows)
+    writer.write_header([['Σχολείο', 'Βαθμός']])
+    conflicts = [writer.write_rows(part) for part in rows]
+    writer.close()
+    return conflicts, pyarrow.parquet.read_table(str(path))
+
+
+def test_text_in_numeric_column_is_written_empty(tmp_path):
+    # Οι τύποι ορίζονται από το πρώτο κομμάτι· το κείμενο σε αριθμητική στήλη γράφεται κενό και επιστρέφεται
+    conflicts, table = write_parquet_conflicts(tmp_path / 'out.parquet',
+                                               [[['Α', 10], ['Β', 12]], [['Γ', 9], ['Δ', 'δέκα']]], chunk_rows=2)
+    assert conflicts == [[], [(1, 'Βαθμός', 'δέκα')]]
+    assert table.schema.field('Βαθμός').type == pyarrow.float64()
+    assert table.column('Βαθμός').to_pylist() == [10.0, 12.0, 9.0, None]
+    assert table.column('Σχολείο').to_pylist() == ['Α', 'Β', 'Γ', 'Δ']
+
+
+def test_mixed_values_in_first_chunk_make_a_text_column(tmp_path):
+    conflicts, table = write_parquet_conflicts(tmp_path / 'out.parquet', [[['Α', 10], ['Β', 'δέκα'], ['Γ', 9]]],
+                                               chunk_rows=2)
+    assert conflicts == [[]]
+    assert table.column('Βαθμός').to_pylist() == ['10', 'δέκα', '9']